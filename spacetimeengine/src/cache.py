@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+from sympy import srepr
+import hashlib
+import os
+import pickle
+
+# Bumped whenever the layout of a cache entry changes so stale entries are ignored.
+CACHE_FORMAT_VERSION = 2
+
+class TensorCache:
+
+    """
+    Description
+    ===========
+    Persists the computed coefficients of a SpaceTime object in a local directory. Entries are content addressed: the key is a hash of a canonical serialization of the metric, the coordinate set, the index configuration and the simplification policy, so equal metrics share an entry across processes.
+
+    Entries are read with pickle, which runs code stored in the cache directory. The directory, and with it $SPACETIMEENGINE_CACHE, must never point at a shared or untrusted location.
+
+    Example
+    =======
+    >> cache = TensorCache("/tmp/spacetimeengine")
+    >> black_hole = SpaceTime(Solution().schwarzschild(), True, cache=cache) # Computes and stores.
+    >> black_hole = SpaceTime(Solution().schwarzschild(), True, cache=cache) # Reads the stored coefficients.
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    def __init__(self, directory = None):
+        if directory is None:
+            directory = os.environ.get("SPACETIMEENGINE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "spacetimeengine"))
+        self.directory = directory
+
+    def key(self, metric, coordinate_set, index_config, policy = "simplify"):
+        """
+        Description
+        ===========
+        Returns the hexadecimal key of a metric solution. srepr gives an unambiguous serialization which does not depend on printing settings.
+        """
+
+        canonical_form = "\n".join([ str(CACHE_FORMAT_VERSION), srepr(metric), srepr(list(coordinate_set)), str(index_config), str(policy) ])
+        return hashlib.sha256(canonical_form.encode("utf-8")).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".pickle")
+
+    def load(self, key):
+        """
+        Description
+        ===========
+        Returns the stored entry for a key, or None when there is no usable entry, including when the stored file cannot be unpickled.
+        """
+
+        try:
+            with open(self.path(key), "rb") as cache_file:
+                entry = pickle.load(cache_file)
+        except Exception:
+            # A missing, truncated or corrupted entry can fail to unpickle in many ways; any of them is a cache miss.
+            return None
+        if not isinstance(entry, dict) or entry.get("version") != CACHE_FORMAT_VERSION:
+            return None
+        return entry
+
+    def store(self, key, entry):
+        """
+        Description
+        ===========
+        Writes an entry for a key. The file is written under a temporary name first so concurrent readers never see a partial entry.
+        """
+
+        os.makedirs(self.directory, exist_ok=True)
+        entry = dict(entry, version = CACHE_FORMAT_VERSION)
+        temporary_path = self.path(key) + ".%s.tmp" % os.getpid()
+        with open(temporary_path, "wb") as cache_file:
+            pickle.dump(entry, cache_file, protocol = pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_path, self.path(key))
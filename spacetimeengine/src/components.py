@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+
+class Components:
+
+    """
+    Description
+    ===========
+    Flat storage for the coefficients of a tensor of any rank over any number of dimensions. Coefficients are kept in a single list in row-major order and are addressed with a tuple holding one integer per index.
+
+    Example
+    =======
+    >> christoffel_symbols_udd = Components(4, 3)
+    >> christoffel_symbols_udd[1, 0, 1] = 1/r
+    >> christoffel_symbols_udd[1, 0, 1]
+    1/r
+    >> christoffel_symbols_udd[1, 0]
+    [0, 1/r, 0, 0]
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    __slots__ = ("dimension_count", "rank", "values")
+
+    def __init__(self, dimension_count, rank, fill = 0):
+        self.dimension_count = dimension_count
+        self.rank = rank
+        self.values = [ fill ] * dimension_count**rank
+
+    def offset(self, indices):
+        """
+        Description
+        ===========
+        Returns the position of a coefficient in the flat value list.
+
+        Example
+        =======
+        >> Components(4, 3).offset((1, 0, 1))
+        17
+        """
+
+        position = 0
+        for index in indices:
+            if index < 0 or index >= self.dimension_count:
+                raise IndexError("Index %s is out of range for %s dimensions." % (index, self.dimension_count))
+            position = position*self.dimension_count + index
+        return position
+
+    def __getitem__(self, indices):
+        if not isinstance(indices, tuple):
+            indices = (indices,)
+        if len(indices) == self.rank:
+            return self.values[self.offset(indices)]
+        if len(indices) > self.rank:
+            raise IndexError("Too many indices for a rank %s tensor." % self.rank)
+        # A partial index returns the remaining block as nested lists.
+        block_size = self.dimension_count**(self.rank - len(indices))
+        start = self.offset(indices)*block_size
+        return self.nest(self.values[start:start + block_size], self.rank - len(indices))
+
+    def __setitem__(self, indices, expression):
+        if not isinstance(indices, tuple):
+            indices = (indices,)
+        if len(indices) != self.rank:
+            raise IndexError("A rank %s tensor coefficient needs %s indices." % (self.rank, self.rank))
+        self.values[self.offset(indices)] = expression
+
+    def __eq__(self, other):
+        if isinstance(other, Components):
+            return self.dimension_count == other.dimension_count and self.rank == other.rank and self.values == other.values
+        if isinstance(other, list):
+            return self.tolist() == other
+        return NotImplemented
+
+    def __len__(self):
+        return len(self.values)
+
+    def __repr__(self):
+        return "Components(%s)" % self.tolist()
+
+    @property
+    def shape(self):
+        return (self.dimension_count,)*self.rank
+
+    def nest(self, values, rank):
+        """
+        Description
+        ===========
+        Folds a flat run of coefficients into nested lists of the given rank.
+        """
+
+        if rank <= 1:
+            return list(values)
+        block_size = self.dimension_count**(rank - 1)
+        return [ self.nest(values[start:start + block_size], rank - 1) for start in range(0, len(values), block_size) ]
+
+    def tolist(self):
+        """
+        Description
+        ===========
+        Returns every coefficient as nested lists, one level per index.
+
+        Example
+        =======
+        >> Components(2, 2).tolist()
+        [[0, 0], [0, 0]]
+        """
+
+        return self.nest(self.values, self.rank)
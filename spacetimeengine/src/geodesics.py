@@ -0,0 +1,787 @@
+#!/usr/bin/env python
+
+"""
+Geodesic integration functions
+==============================
+Integrates geodesics numerically. The geodesic equation is compiled from the connection coefficients into a first order system in the coordinates x^mu and the velocities u^mu = dx^mu/dtau, and integrated with the adaptive Dormand-Prince Runge-Kutta 5(4) method.
+"""
+
+from sympy import Dummy, Symbol, diff, lambdify
+from sympy.core.function import AppliedUndef
+import numpy as np
+from spacetimeengine.src.shared import SharedTensor
+
+# Dormand-Prince 5(4) tableau. The seventh stage is evaluated at the new solution and is reused as the first stage of the next step.
+dormand_prince_nodes = np.array([ 0, 1/5, 3/10, 4/5, 8/9, 1, 1 ])
+dormand_prince_coefficients = [
+    np.array([]),
+    np.array([ 1/5 ]),
+    np.array([ 3/40, 9/40 ]),
+    np.array([ 44/45, -56/15, 32/9 ]),
+    np.array([ 19372/6561, -25360/2187, 64448/6561, -212/729 ]),
+    np.array([ 9017/3168, -355/33, 46732/5247, 49/176, -5103/18656 ]),
+    np.array([ 35/384, 0, 500/1113, 125/192, -2187/6784, 11/84 ])
+]
+dormand_prince_weights = np.array([ 35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0 ])
+# Difference between the fifth and the embedded fourth order weights.
+dormand_prince_error_weights = np.array([ 71/57600, 0, -71/16695, 71/1920, -17253/339200, 22/525, -1/40 ])
+
+# Gauss-Legendre collocation tableaux (coefficients, weights) by order. Order 2 is the implicit midpoint rule.
+gauss_legendre_tableaux = {
+    2: (np.array([ [ 1/2 ] ]), np.array([ 1.0 ])),
+    4: (np.array([ [ 1/4, 1/4 - np.sqrt(3)/6 ], [ 1/4 + np.sqrt(3)/6, 1/4 ] ]), np.array([ 1/2, 1/2 ])),
+    6: (np.array([ [ 5/36, 2/9 - np.sqrt(15)/15, 5/36 - np.sqrt(15)/30 ], [ 5/36 + np.sqrt(15)/24, 2/9, 5/36 - np.sqrt(15)/24 ], [ 5/36 + np.sqrt(15)/30, 2/9 + np.sqrt(15)/15, 5/36 ] ]), np.array([ 5/18, 4/9, 5/18 ]))
+}
+
+def quadratic_form(matrix, vector):
+    """
+    Description
+    ===========
+    Returns the quadratic form matrix[alpha, beta] vector[alpha] vector[beta] summed over the nonzero coefficients.
+    """
+
+    form = 0
+    for alpha in range(len(vector)):
+        for beta in range(len(vector)):
+            if matrix[alpha, beta] != 0:
+                form = form + matrix[alpha, beta]*vector[alpha]*vector[beta]
+    return form
+
+class GeodesicEquations:
+
+    r"""
+    Description
+    ===========
+    Compiles the geodesic equation of a metric into numeric first order right hand sides. The state is (x^0, ..., x^{n-1}, u^0, ..., u^{n-1}); the right hand side is (u^mu, -Gamma^mu_{alpha beta} u^alpha u^beta), where the velocity symbols take the place of the Derivative(x, tau) placeholders of the symbolic geodesic stage. Vanishing connection coefficients are left out and the symmetric pairs are summed once. Subexpressions shared between the equations are computed once per evaluation (see SharedTensor).
+
+    Every free symbol which is not a coordinate is a parameter, given by symbol or by name.
+
+    Example
+    =======
+    >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+    >> equations = GeodesicEquations(black_hole.compute([ "connection_udd" ])["connection_udd"], black_hole.metric_tensor_dd, black_hole.coordinate_set)
+    >> equations.parameters
+    [G, M, c]
+
+    LaTeX representation
+    ====================
+    \frac{dx^{\mu}}{d\tau} = u^{\mu}, \quad \frac{du^{\mu}}{d\tau} = -\Gamma^{\mu}_{\alpha\beta} u^{\alpha} u^{\beta}
+
+    URL Reference
+    =============
+    https://en.wikipedia.org/wiki/Geodesics_in_general_relativity
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    def __init__(self, connection, metric, coordinate_set):
+        self.connection = connection
+        self.metric = metric
+        self.coordinate_set = list(coordinate_set)
+        dimension_count = len(self.coordinate_set)
+        self.dimension_count = dimension_count
+        # Dummy symbols never clash with the coordinates or parameters of a metric.
+        self.velocity_set = [ Dummy("u_%s" % coordinate) for coordinate in self.coordinate_set ]
+        accelerations = []
+        for mu in range(dimension_count):
+            acceleration = 0
+            for alpha in range(dimension_count):
+                for beta in range(alpha, dimension_count):
+                    coefficient = connection[mu, alpha, beta]
+                    if coefficient == 0:
+                        continue
+                    multiplicity = 1 if alpha == beta else 2
+                    acceleration = acceleration - multiplicity*coefficient*self.velocity_set[alpha]*self.velocity_set[beta]
+            accelerations.append(acceleration)
+        self.compile(self.velocity_set, self.velocity_set + accelerations, quadratic_form(metric, self.velocity_set))
+
+    def compile(self, conjugate_set, derivatives, norm):
+        """
+        Description
+        ===========
+        Compiles the right hand sides derivatives and the norm, both functions of the coordinates and of the conjugate symbols (velocities or momenta), into numeric kernels.
+        """
+
+        self.equations = SharedTensor(derivatives)
+        self.norm_equation = SharedTensor(norm)
+        expressions = [ value for symbol, value in self.equations.replacements + self.norm_equation.replacements ] + list(self.equations.reduced) + list(self.norm_equation.reduced)
+        undefined = set().union(*[ expression.atoms(AppliedUndef) for expression in expressions ])
+        if len(undefined) > 0:
+            raise ValueError("Cannot integrate geodesics through undefined functions %s." % ", ".join(sorted(str(function) for function in undefined)))
+        shared_symbols = set(symbol for symbol, value in self.equations.replacements + self.norm_equation.replacements)
+        free_symbols = set().union(*[ expression.free_symbols for expression in expressions ]) - shared_symbols
+        # Parameters are every free symbol which is not a coordinate or a conjugate symbol, in name order.
+        self.parameters = sorted(free_symbols - set(self.coordinate_set) - set(conjugate_set), key = str)
+        arguments = self.coordinate_set + list(conjugate_set) + self.parameters
+        # The scalar kernel works on floats with the math module, which is much faster than NumPy for a single state.
+        self.scalar_function = lambdify(arguments, list(self.equations.reduced), modules = "math", cse = lambda reduced: (self.equations.replacements, reduced))
+        self.vector_function = lambdify(arguments, list(self.equations.reduced), modules = "numpy", cse = lambda reduced: (self.equations.replacements, reduced))
+        self.norm_function = lambdify(arguments, self.norm_equation.reduced[0], modules = "numpy", cse = lambda reduced: (self.norm_equation.replacements, reduced))
+
+    def __reduce__(self):
+        # The compiled kernels cannot be pickled; worker processes compile the equations again from the connection and the metric.
+        return (GeodesicEquations, (self.connection, self.metric, self.coordinate_set))
+
+    def parameter_values(self, params):
+        """
+        Description
+        ===========
+        Returns the values of the parameters in kernel argument order from a dictionary keyed by symbol or by name.
+        """
+
+        params = { (key if isinstance(key, Symbol) else Symbol(str(key))): value for key, value in (params or {}).items() }
+        missing = [ str(parameter) for parameter in self.parameters if parameter not in params ]
+        if len(missing) > 0:
+            raise ValueError("Missing numeric values for the parameters %s." % ", ".join(missing))
+        return [ params[parameter] for parameter in self.parameters ]
+
+    def rhs(self, state, parameter_values):
+        """
+        Description
+        ===========
+        Returns the derivative of a single state with respect to the affine parameter. Points where the equations cannot be evaluated give nan.
+        """
+
+        try:
+            return np.array(self.scalar_function(*state, *parameter_values), dtype = float)
+        except (ArithmeticError, ValueError):
+            return np.full(2*self.dimension_count, np.nan)
+
+    def batch_rhs(self, states, parameter_values):
+        """
+        Description
+        ===========
+        Returns the derivatives of a batch of states of shape (N, 2n) in one NumPy call. Parameter values may be scalars or arrays of shape (N,). Points where the equations cannot be evaluated give nan.
+        """
+
+        derivatives = np.empty(states.shape)
+        try:
+            with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+                values = self.vector_function(*states.T, *parameter_values)
+        except (ArithmeticError, ValueError):
+            derivatives[:] = np.nan
+            return derivatives
+        for position, value in enumerate(values):
+            derivatives[:, position] = value
+        return derivatives
+
+    def norm(self, positions, velocities, parameter_values):
+        """
+        Description
+        ===========
+        Returns the norm g_{mu nu} u^mu u^nu for arrays of positions and velocities of shape (..., n).
+        """
+
+        positions = np.asarray(positions, dtype = float)
+        velocities = np.asarray(velocities, dtype = float)
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            norm = self.norm_function(*np.moveaxis(positions, -1, 0), *np.moveaxis(velocities, -1, 0), *parameter_values)
+        return np.broadcast_to(norm, positions.shape[:-1]).astype(float)
+
+class HamiltonianEquations(GeodesicEquations):
+
+    r"""
+    Description
+    ===========
+    Compiles Hamilton's equations of the geodesic Hamiltonian H = g^{mu nu} p_mu p_nu/2 from the inverse metric into numeric right hand sides. The state is (x^0, ..., x^{n-1}, p_0, ..., p_{n-1}) with the covariant momenta p_mu = g_{mu nu} u^nu, and norm evaluates 2H = g^{mu nu} p_mu p_nu, the same mass shell constraint as for GeodesicEquations. Only the metric derivatives which do not vanish are built.
+
+    LaTeX representation
+    ====================
+    \frac{dx^{\mu}}{d\tau} = g^{\mu\nu} p_{\nu}, \quad \frac{dp_{\mu}}{d\tau} = -\frac{1}{2} \partial_{\mu} g^{\alpha\beta} p_{\alpha} p_{\beta}
+
+    URL Reference
+    =============
+    https://en.wikipedia.org/wiki/Hamiltonian_mechanics
+    """
+
+    def __init__(self, metric_uu, coordinate_set):
+        self.metric = metric_uu
+        self.coordinate_set = list(coordinate_set)
+        dimension_count = len(self.coordinate_set)
+        self.dimension_count = dimension_count
+        self.momentum_set = [ Dummy("p_%s" % coordinate) for coordinate in self.coordinate_set ]
+        velocities = [ sum(metric_uu[mu, nu]*self.momentum_set[nu] for nu in range(dimension_count) if metric_uu[mu, nu] != 0) for mu in range(dimension_count) ]
+        forces = []
+        for coordinate in self.coordinate_set:
+            force = 0
+            for alpha in range(dimension_count):
+                for beta in range(alpha, dimension_count):
+                    if metric_uu[alpha, beta] == 0:
+                        continue
+                    derivative = diff(metric_uu[alpha, beta], coordinate)
+                    if derivative == 0:
+                        continue
+                    multiplicity = 1 if alpha == beta else 2
+                    force = force - multiplicity*derivative*self.momentum_set[alpha]*self.momentum_set[beta]/2
+            forces.append(force)
+        self.compile(self.momentum_set, velocities + forces, quadratic_form(metric_uu, self.momentum_set))
+
+    def __reduce__(self):
+        return (HamiltonianEquations, (self.metric, self.coordinate_set))
+
+class Geodesic:
+
+    """
+    Description
+    ===========
+    A numerically integrated geodesic. tau holds the affine parameter at every accepted step, positions and velocities the state there with shape (steps, n), and norm the constraint g_{mu nu} u^mu u^nu, which stays at its initial value (the mass shell) up to the integration error. status is "success", "max_steps", "step_size" when the step size fell below the resolution of tau, usually at a singularity, or the name of the terminal event which stopped the geodesic. events maps the name of every requested event to its EventRecord.
+    """
+
+    def __init__(self, tau, positions, velocities, norm, status, evaluations, events = None):
+        self.tau = tau
+        self.positions = positions
+        self.velocities = velocities
+        self.norm = norm
+        self.status = status
+        self.evaluations = evaluations
+        self.events = events if events is not None else {}
+
+    def __len__(self):
+        return len(self.tau)
+
+class HamiltonianGeodesic(Geodesic):
+
+    """
+    Description
+    ===========
+    A geodesic integrated in Hamiltonian form (see integrate_hamiltonian). Besides the attributes of Geodesic it holds the covariant momenta p_mu and the Hamiltonian H = g^{mu nu} p_mu p_nu/2, which is half the norm. For a batch every array has a leading axis of N geodesics and status holds one entry per geodesic.
+    """
+
+    def __init__(self, tau, positions, velocities, momenta, norm, status, evaluations, iterations):
+        Geodesic.__init__(self, tau, positions, velocities, norm, status, evaluations)
+        self.momenta = momenta
+        self.hamiltonian = norm/2
+        self.iterations = iterations
+
+class GeodesicBatch:
+
+    """
+    Description
+    ===========
+    A batch of N numerically integrated geodesics. tau, positions, velocities and norm hold the final state of every geodesic with shapes (N,), (N, n), (N, n) and (N,); status holds "success", "max_steps", "step_size" or a terminal event name per geodesic (see Geodesic) and steps the number of accepted steps. events maps the name of every requested event to its EventRecord. When sample points were requested, sample_tau has shape (M,) and sample_positions, sample_velocities and sample_norm hold the interpolated states with shapes (N, M, n) and (N, M); samples past the point where a geodesic stopped are nan.
+    """
+
+    def __init__(self, tau, positions, velocities, norm, status, steps, evaluations, events = None, sample_tau = None, sample_positions = None, sample_velocities = None, sample_norm = None):
+        self.tau = tau
+        self.positions = positions
+        self.velocities = velocities
+        self.norm = norm
+        self.status = status
+        self.steps = steps
+        self.evaluations = evaluations
+        self.events = events if events is not None else {}
+        self.sample_tau = sample_tau
+        self.sample_positions = sample_positions
+        self.sample_velocities = sample_velocities
+        self.sample_norm = sample_norm
+
+    def __len__(self):
+        return len(self.tau)
+
+class GeodesicEvent:
+
+    """
+    Description
+    ===========
+    An event on a geodesic: a zero crossing of function(tau, positions, velocities). The function works on arrays, with the components along the last axis of positions and velocities, and returns one value per state. direction keeps only rising (+1) or falling (-1) crossings, and 0 keeps both. A terminal event stops the geodesic at the crossing and becomes its status; other events are only recorded. Crossings are checked once per accepted step, so an event costs one function evaluation per step until it is found, and are then located by bisection on the cubic Hermite interpolant of the step.
+
+    See horizon_event, escape_event, plane_event and proper_time_event for the built in events.
+
+    Example
+    =======
+    >> GeodesicEvent("inner_orbit", lambda tau, positions, velocities: positions[..., 1] - 6, terminal=False, direction=-1)
+    """
+
+    def __init__(self, name, function, terminal = True, direction = 0):
+        self.name = name
+        self.function = function
+        self.terminal = terminal
+        self.direction = direction
+
+class EventRecord:
+
+    """
+    Description
+    ===========
+    The crossings of one event, in the order they were found. geodesic holds the index of the geodesic of every crossing within its batch (0 for a single geodesic), tau the affine parameter and positions and velocities the state at the crossing.
+    """
+
+    def __init__(self, geodesic, tau, positions, velocities):
+        self.geodesic = geodesic
+        self.tau = tau
+        self.positions = positions
+        self.velocities = velocities
+
+    def __len__(self):
+        return len(self.tau)
+
+def horizon_event(radius, margin = 0.01, radial_index = 1):
+    """
+    Description
+    ===========
+    Returns a terminal event named "horizon" which stops geodesics falling below (1 + margin)*radius in the radial coordinate, before the step size collapses at the horizon (see SpaceTime.horizon_radius).
+    """
+
+    return GeodesicEvent("horizon", lambda tau, positions, velocities: positions[..., radial_index] - (1 + margin)*radius, terminal = True, direction = -1)
+
+def escape_event(radius, radial_index = 1):
+    """
+    Description
+    ===========
+    Returns a terminal event named "escape" which stops geodesics leaving the sphere of the given radius.
+    """
+
+    return GeodesicEvent("escape", lambda tau, positions, velocities: positions[..., radial_index] - radius, terminal = True, direction = 1)
+
+def plane_event(angle = np.pi/2, polar_index = 2, terminal = False):
+    """
+    Description
+    ===========
+    Returns an event named "plane" at every crossing of the polar angle, by default the equatorial plane. The crossings are recorded without stopping the geodesic unless terminal is set.
+    """
+
+    return GeodesicEvent("plane", lambda tau, positions, velocities: positions[..., polar_index] - angle, terminal = terminal, direction = 0)
+
+def proper_time_event(limit):
+    """
+    Description
+    ===========
+    Returns a terminal event named "proper_time" which stops geodesics when the affine parameter, the proper time of timelike geodesics, reaches the limit.
+    """
+
+    return GeodesicEvent("proper_time", lambda tau, positions, velocities: tau - limit, terminal = True, direction = 0)
+
+def error_norm(error, state, new_state, rtol, atol):
+    """
+    Description
+    ===========
+    Returns the root mean square of an error estimate scaled by atol + rtol*|state|.
+    """
+
+    scaled = error/(atol + rtol*np.maximum(np.abs(state), np.abs(new_state)))
+    return np.sqrt(scaled @ scaled/len(scaled))
+
+def initial_step(rhs, state, derivative, direction, rtol, atol):
+    """
+    Description
+    ===========
+    Estimates a first step size from the size of the state and of its first two derivatives, for a single state or along the last axis of a batch of states.
+
+    URL Reference
+    =============
+    Hairer, Norsett and Wanner, Solving Ordinary Differential Equations I, section II.4.
+    """
+
+    scale = atol + rtol*np.abs(state)
+    state_size = np.sqrt(np.mean((state/scale)**2, axis = -1))
+    derivative_size = np.sqrt(np.mean((derivative/scale)**2, axis = -1))
+    with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+        first_guess = np.where((state_size < 1e-5) | (derivative_size < 1e-5), 1e-6, 0.01*state_size/derivative_size)
+        second_derivative = (rhs(state + direction*first_guess[..., None]*derivative) - derivative)/first_guess[..., None]
+        second_derivative_size = np.sqrt(np.mean((second_derivative/scale)**2, axis = -1))
+        largest_size = np.maximum(derivative_size, second_derivative_size)
+        second_guess = np.where(largest_size <= 1e-15, np.maximum(1e-6, first_guess*1e-3), (0.01/largest_size)**(1/5))
+    return np.where(np.isfinite(second_derivative_size), np.minimum(100*first_guess, second_guess), first_guess)
+
+def integrate_geodesic(equations, x0, u0, tau_span, params = None, events = None, rtol = 1e-9, atol = 1e-12, first_step = None, max_step = np.inf, max_steps = 10**6):
+    """
+    Description
+    ===========
+    Integrates the geodesic through the position x0 with velocity u0 over the affine parameter interval tau_span = (tau_start, tau_end), which may run backwards, with the adaptive Dormand-Prince 5(4) method. The local error of every step is kept below atol + rtol*|state| in the root mean square norm. events is a list of GeodesicEvent checked on every accepted step; the first terminal event reached ends the geodesic at the crossing. Returns a Geodesic holding every accepted step.
+
+    Example
+    =======
+    >> geodesic = integrate_geodesic(equations, [ 0, 10, pi/2, 0 ], [ 1.2, 0, 0, 0.035 ], (0, 1000), params={ "G": 1, "M": 1, "c": 1 })
+    >> geodesic.positions[-1]
+
+    URL Reference
+    =============
+    https://en.wikipedia.org/wiki/Dormand%E2%80%93Prince_method
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    dimension_count = equations.dimension_count
+    if len(x0) != dimension_count or len(u0) != dimension_count:
+        raise ValueError("Expected %s position and velocity components." % dimension_count)
+    parameter_values = equations.parameter_values(params)
+    rhs = lambda state: equations.rhs(state, parameter_values)
+    tau, tau_end = float(tau_span[0]), float(tau_span[1])
+    direction = 1.0 if tau_end >= tau else -1.0
+    state = np.array(list(x0) + list(u0), dtype = float)
+    derivative = rhs(state)
+    evaluations = 1
+    taus = [ tau ]
+    states = [ state ]
+    status = "success"
+    events, records = event_setup(events)
+    geodesics = np.zeros(1, dtype = int)
+    values = [ evaluate_event(event, np.array([ tau ]), state[None, :], dimension_count) for event in events ]
+    if not np.all(np.isfinite(derivative)):
+        status = "step_size"
+    elif tau != tau_end:
+        if first_step is None:
+            step = float(initial_step(rhs, state, derivative, direction, rtol, atol))
+            evaluations = evaluations + 1
+        else:
+            step = abs(first_step)
+        stages = np.empty((7, 2*dimension_count))
+        accepted = 0
+        while direction*(tau_end - tau) > 0:
+            if accepted >= max_steps:
+                status = "max_steps"
+                break
+            step = min(step, max_step, abs(tau_end - tau))
+            if step <= 10*np.spacing(max(abs(tau), 1.0)):
+                status = "step_size"
+                break
+            signed_step = direction*step
+            stages[0] = derivative
+            for stage in range(1, 7):
+                stages[stage] = rhs(state + signed_step*(dormand_prince_coefficients[stage] @ stages[:stage]))
+            evaluations = evaluations + 6
+            new_state = state + signed_step*(dormand_prince_weights[:6] @ stages[:6])
+            error = error_norm(signed_step*(dormand_prince_error_weights @ stages), state, new_state, rtol, atol)
+            if np.isfinite(error) and np.all(np.isfinite(new_state)) and error <= 1:
+                # Accept; the last stage was evaluated at the new solution.
+                new_tau = tau_end if step == abs(tau_end - tau) else tau + signed_step
+                if len(events) > 0:
+                    values, end_theta, terminal_names = step_events(events, records, geodesics, np.array([ tau ]), np.array([ new_tau ]), state[None, :], new_state[None, :], stages[0][None, :], stages[6][None, :], values, dimension_count)
+                    if terminal_names[0] is not None:
+                        # Stop at the crossing of the terminal event.
+                        states.append(hermite_interpolation(end_theta[0], new_tau - tau, state, new_state, stages[0], stages[6]))
+                        taus.append(tau + end_theta[0]*(new_tau - tau))
+                        status = terminal_names[0]
+                        break
+                tau = new_tau
+                state = new_state
+                derivative = stages[6].copy()
+                taus.append(tau)
+                states.append(state)
+                accepted = accepted + 1
+                step = step*(10.0 if error == 0 else min(10.0, 0.9*error**-0.2))
+            else:
+                step = step*(0.2 if not np.isfinite(error) else max(0.2, 0.9*error**-0.2))
+    states = np.array(states)
+    positions = states[:, :dimension_count]
+    velocities = states[:, dimension_count:]
+    return Geodesic(np.array(taus), positions, velocities, equations.norm(positions, velocities, parameter_values), status, evaluations, event_records(records, dimension_count))
+
+def hermite_interpolation(theta, step, state, new_state, derivative, new_derivative):
+    """
+    Description
+    ===========
+    Interpolates between two accepted states with the cubic Hermite polynomial through the states and their derivatives, at the fractions theta of a step.
+    """
+
+    theta_squared = theta*theta
+    theta_cubed = theta_squared*theta
+    return (2*theta_cubed - 3*theta_squared + 1)*state + (theta_cubed - 2*theta_squared + theta)*step*derivative + (-2*theta_cubed + 3*theta_squared)*new_state + (theta_cubed - theta_squared)*step*new_derivative
+
+def evaluate_event(event, tau, states, dimension_count):
+    """
+    Description
+    ===========
+    Returns the values of an event function for k states of shape (k, 2n) at the affine parameters tau of shape (k,).
+    """
+
+    with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+        values = event.function(tau, states[:, :dimension_count], states[:, dimension_count:])
+    return np.broadcast_to(np.asarray(values, dtype = float), tau.shape)
+
+def locate_event(event, tau, step, state, new_state, derivative, new_derivative, value, dimension_count):
+    """
+    Description
+    ===========
+    Locates the crossings of an event within k steps by bisection on the cubic Hermite interpolant of each step. Returns the fractions of the steps just past the crossings.
+    """
+
+    lower = np.zeros(len(tau))
+    upper = np.ones(len(tau))
+    lower_value = value
+    while np.any(upper - lower > 1e-13):
+        middle = (lower + upper)/2
+        middle_value = evaluate_event(event, tau + middle*step, hermite_interpolation(middle[:, None], step[:, None], state, new_state, derivative, new_derivative), dimension_count)
+        before = (np.sign(middle_value) == np.sign(lower_value)) & (middle_value != 0)
+        lower = np.where(before, middle, lower)
+        lower_value = np.where(before, middle_value, lower_value)
+        upper = np.where(before, upper, middle)
+    return upper
+
+def step_events(events, records, geodesics, tau, new_tau, state, new_state, derivative, new_derivative, values, dimension_count):
+    """
+    Description
+    ===========
+    Finds the event crossings within k accepted steps of the geodesics with the given indices and appends them to records. Crossings after a terminal event in the same step are dropped. Returns the event values at the new states, the fraction of every step at which its geodesic ends (1 unless a terminal event stops it) and the name of that terminal event (None).
+    """
+
+    step = new_tau - tau
+    new_values = [ evaluate_event(event, new_tau, new_state, dimension_count) for event in events ]
+    end_theta = np.ones(len(tau))
+    terminal_names = np.full(len(tau), None, dtype = object)
+    crossings = []
+    for event, value, new_value in zip(events, values, new_values):
+        rising = (value < 0) & (new_value >= 0)
+        falling = (value > 0) & (new_value <= 0)
+        crossed = rising if event.direction > 0 else falling if event.direction < 0 else rising | falling
+        rows = np.flatnonzero(crossed)
+        theta = locate_event(event, tau[rows], step[rows], state[rows], new_state[rows], derivative[rows], new_derivative[rows], value[rows], dimension_count)
+        crossings.append((event, rows, theta))
+        if event.terminal and len(rows) > 0:
+            earlier = theta < end_theta[rows]
+            end_theta[rows[earlier]] = theta[earlier]
+            terminal_names[rows[earlier]] = event.name
+    for event, rows, theta in crossings:
+        kept = theta <= end_theta[rows]
+        if event.terminal:
+            kept = kept & (terminal_names[rows] == event.name)
+        rows = rows[kept]
+        theta = theta[kept]
+        if len(rows) > 0:
+            crossing_states = hermite_interpolation(theta[:, None], step[rows, None], state[rows], new_state[rows], derivative[rows], new_derivative[rows])
+            records[event.name].append((geodesics[rows], tau[rows] + theta*step[rows], crossing_states))
+    return new_values, end_theta, terminal_names
+
+def event_records(records, dimension_count):
+    """
+    Description
+    ===========
+    Collects the crossings appended by step_events into an EventRecord per event.
+    """
+
+    collected = {}
+    for name, crossings in records.items():
+        geodesics = np.concatenate([ crossing[0] for crossing in crossings ]) if len(crossings) > 0 else np.zeros(0, dtype = int)
+        tau = np.concatenate([ crossing[1] for crossing in crossings ]) if len(crossings) > 0 else np.zeros(0)
+        states = np.concatenate([ crossing[2] for crossing in crossings ]) if len(crossings) > 0 else np.zeros((0, 2*dimension_count))
+        collected[name] = EventRecord(geodesics, tau, states[:, :dimension_count], states[:, dimension_count:])
+    return collected
+
+def event_setup(events):
+    """
+    Description
+    ===========
+    Checks that event names are unique and returns an empty crossing list per event.
+    """
+
+    events = list(events or [])
+    names = [ event.name for event in events ]
+    if len(set(names)) != len(names):
+        raise ValueError("Event names must be unique, got %s." % ", ".join(names))
+    return events, { name: [] for name in names }
+
+def integrate_geodesics(equations, x0, u0, tau_span, params = None, tau_eval = None, events = None, rtol = 1e-9, atol = 1e-12, first_step = None, max_step = np.inf, max_steps = 10**6):
+    """
+    Description
+    ===========
+    Integrates a batch of geodesics through the positions x0 with velocities u0, both of shape (N, n), over the common affine parameter interval tau_span with the adaptive Dormand-Prince 5(4) method. Every stage evaluates the right hand side of all running geodesics at once on an (N, 2n) state array. Each geodesic keeps its own step size, error control and step count as in integrate_geodesic, and finished or failed geodesics are masked out of later steps. Parameter values may be scalars or arrays of shape (N,), one per geodesic.
+
+    Only the final states are kept, unless tau_eval lists affine parameter values at which the states are sampled by cubic Hermite interpolation within the accepted steps. events is a list of GeodesicEvent checked on every accepted step; a terminal event stops only the geodesics which reach it, so doomed rays stop costing steps early. Returns a GeodesicBatch.
+
+    Example
+    =======
+    >> radii = np.linspace(6, 20, 10000)
+    >> x0 = np.stack([ np.zeros_like(radii), radii, np.full_like(radii, pi/2), np.zeros_like(radii) ], axis=-1)
+    >> batch = integrate_geodesics(equations, x0, u0, (0, 1000), params={ "G": 1, "M": 1, "c": 1 }, tau_eval=np.linspace(0, 1000, 101))
+    >> batch.sample_positions.shape
+    (10000, 101, 4)
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    dimension_count = equations.dimension_count
+    x0 = np.atleast_2d(np.asarray(x0, dtype = float))
+    u0 = np.atleast_2d(np.asarray(u0, dtype = float))
+    if x0.shape[-1] != dimension_count or u0.shape[-1] != dimension_count:
+        raise ValueError("Expected %s position and velocity components." % dimension_count)
+    x0, u0 = np.broadcast_arrays(x0, u0)
+    geodesic_count = len(x0)
+    parameter_values = [ np.broadcast_to(np.asarray(value, dtype = float), (geodesic_count,)) if np.ndim(value) > 0 else value for value in equations.parameter_values(params) ]
+    select = lambda rows: [ value[rows] if np.ndim(value) > 0 else value for value in parameter_values ]
+    tau_start, tau_end = float(tau_span[0]), float(tau_span[1])
+    direction = 1.0 if tau_end >= tau_start else -1.0
+    tau = np.full(geodesic_count, tau_start)
+    states = np.concatenate([ x0, u0 ], axis = 1)
+    derivatives = equations.batch_rhs(states, parameter_values)
+    evaluations = geodesic_count
+    status = np.full(geodesic_count, "success", dtype = object)
+    steps = np.zeros(geodesic_count, dtype = int)
+    running = np.all(np.isfinite(derivatives), axis = 1)
+    status[~running] = "step_size"
+    running = running & (tau_start != tau_end)
+    events, records = event_setup(events)
+    values = [ evaluate_event(event, tau, states, dimension_count).copy() for event in events ]
+    samples = None
+    if tau_eval is not None:
+        tau_eval = np.asarray(tau_eval, dtype = float)
+        samples = np.full((geodesic_count, len(tau_eval), 2*dimension_count), np.nan)
+        samples[:, tau_eval == tau_start] = states[:, None, :]
+    step_sizes = np.full(geodesic_count, np.inf)
+    rows = np.flatnonzero(running)
+    if len(rows) > 0:
+        if first_step is None:
+            step_sizes[rows] = initial_step(lambda trial: equations.batch_rhs(trial, select(rows)), states[rows], derivatives[rows], direction, rtol, atol)
+            evaluations = evaluations + len(rows)
+        else:
+            step_sizes[rows] = abs(first_step)
+    while True:
+        running = running & (steps < max_steps)
+        status[(status == "success") & (steps >= max_steps) & (direction*(tau_end - tau) > 0)] = "max_steps"
+        rows = np.flatnonzero(running)
+        if len(rows) == 0:
+            break
+        remaining = np.abs(tau_end - tau[rows])
+        step = np.minimum(np.minimum(step_sizes[rows], max_step), remaining)
+        too_small = step <= 10*np.spacing(np.maximum(np.abs(tau[rows]), 1.0))
+        if np.any(too_small):
+            status[rows[too_small]] = "step_size"
+            running[rows[too_small]] = False
+            rows, step, remaining = rows[~too_small], step[~too_small], remaining[~too_small]
+            if len(rows) == 0:
+                break
+        signed_step = (direction*step)[:, None]
+        state = states[rows]
+        row_parameters = select(rows)
+        stages = np.empty((7, len(rows), 2*dimension_count))
+        stages[0] = derivatives[rows]
+        for stage in range(1, 7):
+            stages[stage] = equations.batch_rhs(state + signed_step*np.tensordot(dormand_prince_coefficients[stage], stages[:stage], axes = 1), row_parameters)
+        evaluations = evaluations + 6*len(rows)
+        new_state = state + signed_step*np.tensordot(dormand_prince_weights[:6], stages[:6], axes = 1)
+        scaled = signed_step*np.tensordot(dormand_prince_error_weights, stages, axes = 1)/(atol + rtol*np.maximum(np.abs(state), np.abs(new_state)))
+        error = np.sqrt(np.mean(scaled**2, axis = 1))
+        accepted = np.isfinite(error) & np.all(np.isfinite(new_state), axis = 1) & (error <= 1)
+        with np.errstate(divide = "ignore"):
+            growth = np.where(error == 0, 10.0, np.minimum(10.0, 0.9*error**-0.2))
+            shrink = np.where(np.isfinite(error), np.maximum(0.2, 0.9*error**-0.2), 0.2)
+        step_sizes[rows] = step*np.where(accepted, growth, shrink)
+        done = rows[accepted]
+        old_tau = tau[done]
+        new_tau = np.where(step[accepted] == remaining[accepted], tau_end, old_tau + direction*step[accepted])
+        end_tau = new_tau
+        # The end states of the accepted steps, kept for the interpolation of samples when a terminal event cuts a step short.
+        step_end = new_state[accepted]
+        if len(events) > 0 and len(done) > 0:
+            new_values, end_theta, terminal_names = step_events(events, records, done, old_tau, new_tau, state[accepted], new_state[accepted], stages[0][accepted], stages[6][accepted], [ value[done] for value in values ], dimension_count)
+            for value, new_value in zip(values, new_values):
+                value[done] = new_value
+            stopped = np.flatnonzero(terminal_names != None)
+            if len(stopped) > 0:
+                # Geodesics stopped by a terminal event end at the crossing.
+                end_tau = np.where(terminal_names != None, old_tau + end_theta*(new_tau - old_tau), new_tau)
+                new_state[np.flatnonzero(accepted)[stopped]] = hermite_interpolation(end_theta[stopped, None], (new_tau - old_tau)[stopped, None], state[accepted][stopped], new_state[accepted][stopped], stages[0][accepted][stopped], stages[6][accepted][stopped])
+                status[done[stopped]] = terminal_names[stopped]
+                running[done[stopped]] = False
+        if samples is not None and len(done) > 0:
+            # Sample points passed by the accepted steps, interpolated within each step.
+            passed = (direction*(tau_eval[None, :] - old_tau[:, None]) > 0) & (direction*(tau_eval[None, :] - end_tau[:, None]) <= 0)
+            row, column = np.nonzero(passed)
+            if len(row) > 0:
+                theta = ((tau_eval[column] - old_tau[row])/(new_tau[row] - old_tau[row]))[:, None]
+                samples[done[row], column] = hermite_interpolation(theta, (new_tau - old_tau)[row, None], state[accepted][row], step_end[row], stages[0][accepted][row], stages[6][accepted][row])
+        tau[done] = end_tau
+        states[done] = new_state[accepted]
+        derivatives[done] = stages[6][accepted]
+        steps[done] = steps[done] + 1
+        running[done[new_tau == tau_end]] = False
+    positions = states[:, :dimension_count]
+    velocities = states[:, dimension_count:]
+    batch = GeodesicBatch(tau, positions, velocities, equations.norm(positions, velocities, parameter_values), status, steps, evaluations, event_records(records, dimension_count))
+    if samples is not None:
+        batch.sample_tau = tau_eval
+        batch.sample_positions = samples[:, :, :dimension_count]
+        batch.sample_velocities = samples[:, :, dimension_count:]
+        batch.sample_norm = equations.norm(batch.sample_positions, batch.sample_velocities, [ value[:, None] if np.ndim(value) > 0 else value for value in parameter_values ])
+    return batch
+
+def integrate_hamiltonian(equations, x0, p0, tau_span, step, params = None, order = 4, save_every = 1, tol = 1e-14, max_iterations = 50):
+    r"""
+    Description
+    ===========
+    Integrates geodesics in Hamiltonian form (see HamiltonianEquations) with a symplectic Gauss-Legendre collocation method of order 2 (the implicit midpoint rule), 4 or 6 and a fixed step. Symplectic methods keep the Hamiltonian, and so the mass shell constraint, bounded over arbitrarily long runs instead of drifting, which allows much larger steps than an explicit Runge-Kutta method for long orbit integrations.
+
+    x0 and p0 hold the positions and covariant momenta of one geodesic with shape (n,) or of a batch with shape (N, n); every step solves the implicit stage equations of the whole batch by fixed point iteration, stopping once the stages change by less than tol*(1 + |state|). The interval tau_span is covered by equal steps no longer than step, and every save_every-th step is kept, together with the last one. Geodesics whose iteration did not converge within max_iterations in some step get the status "iteration". Returns a HamiltonianGeodesic.
+
+    Example
+    =======
+    >> orbit = integrate_hamiltonian(equations, [ 0, 10, pi/2, 0 ], p0, (0, 1e6), 5.0, params={ "G": 1, "M": 1, "c": 1 }, save_every=1000)
+    >> abs(orbit.hamiltonian - orbit.hamiltonian[0]).max()
+
+    LaTeX representation
+    ====================
+    Y_i = y + h \sum_j a_{ij} f(Y_j), \quad y' = y + h \sum_i b_i f(Y_i)
+
+    URL Reference
+    =============
+    https://en.wikipedia.org/wiki/Gauss%E2%80%93Legendre_method
+    Hairer, Lubich and Wanner, Geometric Numerical Integration, sections II.1 and VIII.6.
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    if order not in gauss_legendre_tableaux:
+        raise ValueError("Gauss-Legendre order must be one of %s." % ", ".join(str(key) for key in sorted(gauss_legendre_tableaux)))
+    if not np.isfinite(step) or step <= 0:
+        raise ValueError("The step must be positive and finite, got %s." % step)
+    if save_every < 1:
+        raise ValueError("save_every must be at least 1, got %s." % save_every)
+    coefficients, weights = gauss_legendre_tableaux[order]
+    stage_count = len(weights)
+    dimension_count = equations.dimension_count
+    single = np.ndim(x0) == 1 and np.ndim(p0) == 1
+    x0 = np.atleast_2d(np.asarray(x0, dtype = float))
+    p0 = np.atleast_2d(np.asarray(p0, dtype = float))
+    if x0.shape[-1] != dimension_count or p0.shape[-1] != dimension_count:
+        raise ValueError("Expected %s position and momentum components." % dimension_count)
+    x0, p0 = np.broadcast_arrays(x0, p0)
+    geodesic_count = len(x0)
+    parameter_values = [ np.broadcast_to(np.asarray(value, dtype = float), (geodesic_count,)) if np.ndim(value) > 0 else value for value in equations.parameter_values(params) ]
+    # The stages of all geodesics are evaluated together, so array parameters repeat once per stage.
+    stage_parameters = [ np.tile(value, stage_count) if np.ndim(value) > 0 else value for value in parameter_values ]
+    tau_start, tau_end = float(tau_span[0]), float(tau_span[1])
+    step_count = int(np.ceil(abs(tau_end - tau_start)/step))
+    signed_step = (tau_end - tau_start)/max(step_count, 1)
+    states = np.concatenate([ x0, p0 ], axis = 1)
+    status = np.full(geodesic_count, "success", dtype = object)
+    saved_tau = [ tau_start ]
+    saved_states = [ states.copy() ]
+    evaluations = 0
+    iteration_count = 0
+    if step_count > 0:
+        # The first iteration starts from the derivative at the initial state, later ones from the stages of the previous step.
+        stages = np.broadcast_to(equations.batch_rhs(states, parameter_values), (stage_count,) + states.shape).copy()
+        evaluations = evaluations + geodesic_count
+    for step_index in range(1, step_count + 1):
+        converged = np.zeros(geodesic_count, dtype = bool)
+        for iteration in range(max_iterations):
+            stage_states = states[None, :, :] + signed_step*(coefficients @ stages.reshape(stage_count, -1)).reshape(stages.shape)
+            new_stages = equations.batch_rhs(stage_states.reshape(-1, 2*dimension_count), stage_parameters).reshape(stages.shape)
+            evaluations = evaluations + stage_count*geodesic_count
+            iteration_count = iteration_count + 1
+            change = np.max(np.abs(signed_step*(new_stages - stages))/(1 + np.abs(states)[None, :, :]), axis = (0, 2))
+            stages = new_stages
+            converged = change <= tol
+            if np.all(converged | ~np.isfinite(change)):
+                break
+        status[~converged & (status == "success")] = "iteration"
+        states = states + signed_step*(weights @ stages.reshape(stage_count, -1)).reshape(states.shape)
+        if step_index % save_every == 0 or step_index == step_count:
+            saved_tau.append(tau_start + step_index*signed_step)
+            saved_states.append(states.copy())
+    saved_states = np.stack(saved_states, axis = 1)
+    positions = saved_states[:, :, :dimension_count]
+    momenta = saved_states[:, :, dimension_count:]
+    velocities = np.stack([ equations.batch_rhs(saved, parameter_values)[:, :dimension_count] for saved in np.moveaxis(saved_states, 1, 0) ], axis = 1)
+    norm = equations.norm(positions, momenta, [ value[:, None] if np.ndim(value) > 0 else value for value in parameter_values ])
+    tau = np.array(saved_tau)
+    if single:
+        return HamiltonianGeodesic(tau, positions[0], velocities[0], momenta[0], norm[0], status[0], evaluations, iteration_count)
+    return HamiltonianGeodesic(tau, positions, velocities, momenta, norm, status, evaluations, iteration_count)
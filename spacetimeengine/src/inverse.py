@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+
+"""
+Inverse metric functions
+========================
+Inverts a metric block by block. The coordinates are split into the connected groups of the nonzero pattern of the metric, which covers diagonal metrics (one coordinate per group), block diagonal metrics and metrics whose blocks are spread over non-adjacent coordinates, such as the t-phi block of a rotating metric.
+"""
+
+from sympy import zeros
+
+def metric_blocks(metric):
+    """
+    Description
+    ===========
+    Returns the groups of coordinate indices which are coupled by nonzero off diagonal coefficients, each sorted, in order of their smallest index.
+
+    Example
+    =======
+    >> metric_blocks(Matrix([ [ A, 0, 0, B ], [ 0, C, 0, 0 ], [ 0, 0, D, 0 ], [ B, 0, 0, E ] ]))
+    [[0, 3], [1], [2]]
+    """
+
+    dimension_count = metric.rows
+    blocks = []
+    assigned = [ False ] * dimension_count
+    for start in range(dimension_count):
+        if assigned[start]:
+            continue
+        block = [ start ]
+        assigned[start] = True
+        position = 0
+        while position < len(block):
+            mu = block[position]
+            for nu in range(dimension_count):
+                if assigned[nu] == False and (metric[mu, nu] != 0 or metric[nu, mu] != 0):
+                    block.append(nu)
+                    assigned[nu] = True
+            position = position + 1
+        blocks.append(sorted(block))
+    return blocks
+
+def block_determinant(block):
+    """
+    Description
+    ===========
+    Returns the determinant of a small symbolic block, written out for 1x1 and 2x2 blocks.
+    """
+
+    if block.rows == 1:
+        return block[0, 0]
+    if block.rows == 2:
+        return block[0, 0]*block[1, 1] - block[0, 1]*block[1, 0]
+    return block.det(method = "berkowitz")
+
+def block_adjugate(block):
+    """
+    Description
+    ===========
+    Returns the adjugate of a small symbolic block, written out for 1x1 and 2x2 blocks.
+    """
+
+    if block.rows == 1:
+        return block.ones(1, 1)
+    if block.rows == 2:
+        return block.__class__([ [ block[1, 1], -block[0, 1] ], [ -block[1, 0], block[0, 0] ] ])
+    return block.adjugate(method = "berkowitz")
+
+def inverse_metric(metric, simplify_determinant = None, simplify_coefficient = None):
+    r"""
+    Description
+    ===========
+    Inverts a metric block by block with the adjugate/determinant formula. Returns (inverse, determinant) where determinant is the determinant of the given metric, the product of the block determinants. Coefficients outside the blocks are zero and are never built.
+
+    The optional simplify_determinant is applied to each block determinant before it is used as a denominator, and simplify_coefficient to every nonzero coefficient of the inverse.
+
+    Example
+    =======
+    >> inverse, determinant = inverse_metric(Solution().schwarzschild()[0])
+    >> determinant
+    -c**2*r**4*sin(theta)**2
+
+    LaTeX representation
+    ====================
+    g^{-1} = \frac{\operatorname{adj}(g)}{\det g}
+
+    URL Reference
+    =============
+    https://en.wikipedia.org/wiki/Adjugate_matrix
+    https://en.wikipedia.org/wiki/Block_matrix#Block_diagonal_matrices
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    if simplify_determinant is None:
+        simplify_determinant = lambda expression: expression
+    if simplify_coefficient is None:
+        simplify_coefficient = lambda expression: expression
+    inverse = zeros(metric.rows)
+    determinant = 1
+    for block_indices in metric_blocks(metric):
+        determinant = determinant*invert_block(metric, inverse, block_indices, simplify_determinant, simplify_coefficient)
+    return inverse, determinant
+
+def metric_determinant(metric, simplify_determinant = None):
+    """
+    Description
+    ===========
+    Returns the determinant of a metric as the product of the determinants of its blocks, without inverting it.
+
+    Example
+    =======
+    >> metric_determinant(Solution().schwarzschild()[0])
+    -c**2*r**4*sin(theta)**2
+    """
+
+    if simplify_determinant is None:
+        simplify_determinant = lambda expression: expression
+    determinant = 1
+    for block_indices in metric_blocks(metric):
+        determinant = determinant*simplify_determinant(block_determinant(metric.extract(block_indices, block_indices)))
+    return determinant
+
+def invert_block(metric, inverse, block_indices, simplify_determinant, simplify_coefficient):
+    """
+    Description
+    ===========
+    Writes the inverse of the block of metric spanned by block_indices into the same coefficients of inverse and returns the determinant of the block.
+    """
+
+    block = metric.extract(block_indices, block_indices)
+    determinant = simplify_determinant(block_determinant(block))
+    if determinant == 0:
+        raise ValueError("The metric is singular in the coordinates %s." % block_indices)
+    adjugate = block_adjugate(block)
+    for row, mu in enumerate(block_indices):
+        for column, nu in enumerate(block_indices):
+            inverse[mu, nu] = 0
+            if adjugate[row, column] != 0:
+                inverse[mu, nu] = simplify_coefficient(adjugate[row, column]/determinant)
+    return determinant
+
+def update_inverse_metric(metric, inverse, coordinates, simplify_determinant = None, simplify_coefficient = None):
+    """
+    Description
+    ===========
+    Updates an inverse metric after the coefficients of metric involving the given coordinate indices have changed. Only the blocks of the changed metric which contain those coordinates are inverted again; coefficients which coupled them to other blocks before the change are cleared. Returns the updated inverse as a new matrix.
+
+    Example
+    =======
+    >> metric[1, 1] = -1/(1 - 2*G*M/(c**2*r))**2
+    >> inverse = update_inverse_metric(metric, inverse, [ 1 ])
+    """
+
+    if simplify_determinant is None:
+        simplify_determinant = lambda expression: expression
+    if simplify_coefficient is None:
+        simplify_coefficient = lambda expression: expression
+    inverse = inverse.copy()
+    blocks = [ block_indices for block_indices in metric_blocks(metric) if any(coordinate in block_indices for coordinate in coordinates) ]
+    for block_indices in blocks:
+        for mu in block_indices:
+            for nu in range(metric.rows):
+                inverse[mu, nu] = 0
+                inverse[nu, mu] = 0
+    for block_indices in blocks:
+        invert_block(metric, inverse, block_indices, simplify_determinant, simplify_coefficient)
+    return inverse
@@ -0,0 +1,64 @@
+#!/usr/bin/env python
+from sympy import Symbol, lambdify
+from sympy.core.function import AppliedUndef
+import numpy as np
+
+class NumericTensor:
+
+    """
+    Description
+    ===========
+    Compiles every coefficient of a tensor in shared form (see SharedTensor) into a single NumPy kernel. The shared subexpressions are evaluated once per call for the whole tensor, and the coefficients are returned together as one array of shape broadcast(coordinates) + tensor shape. Coordinates and parameter values may be scalars or arrays of any broadcastable shapes.
+
+    The kernel takes the coordinates in the order of the coordinate set. Every other free symbol of the tensor is a parameter whose value has to be given by symbol or by name. Singular points evaluate to inf or nan without warnings.
+
+    Example
+    =======
+    >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+    >> metric = NumericTensor(black_hole.get_shared_tensor("metric_dd"), black_hole.coordinate_set)
+    >> r = np.linspace(3, 10, 1000)
+    >> metric(0, r, np.pi/2, 0, params={ "G": 1, "M": 1, "c": 1 }).shape
+    (1000, 4, 4)
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    def __init__(self, shared, coordinate_set):
+        self.shape = shared.shape
+        self.coordinate_set = list(coordinate_set)
+        expressions = [ value for symbol, value in shared.replacements ] + list(shared.reduced)
+        undefined = set().union(*[ expression.atoms(AppliedUndef) for expression in expressions ])
+        if len(undefined) > 0:
+            raise ValueError("Cannot evaluate undefined functions %s numerically." % ", ".join(sorted(str(function) for function in undefined)))
+        shared_symbols = set(symbol for symbol, value in shared.replacements)
+        free_symbols = set().union(*[ expression.free_symbols for expression in expressions ]) - shared_symbols
+        # Parameters are every free symbol which is not a coordinate, in name order.
+        self.parameters = sorted(free_symbols - set(self.coordinate_set), key = str)
+        self.function = lambdify(self.coordinate_set + self.parameters, list(shared.reduced), modules = "numpy", cse = lambda reduced: (shared.replacements, reduced))
+
+    def parameter_values(self, params):
+        """
+        Description
+        ===========
+        Returns the values of the parameters in kernel argument order from a dictionary keyed by symbol or by name.
+        """
+
+        params = { (key if isinstance(key, Symbol) else Symbol(str(key))): value for key, value in (params or {}).items() }
+        missing = [ str(parameter) for parameter in self.parameters if parameter not in params ]
+        if len(missing) > 0:
+            raise ValueError("Missing numeric values for the parameters %s." % ", ".join(missing))
+        return [ params[parameter] for parameter in self.parameters ]
+
+    def __call__(self, *coordinates, params = None):
+        if len(coordinates) != len(self.coordinate_set):
+            raise ValueError("Expected %s coordinate values, got %s." % (len(self.coordinate_set), len(coordinates)))
+        arguments = [ np.asarray(value) for value in coordinates ] + [ np.asarray(value) for value in self.parameter_values(params) ]
+        with np.errstate(divide = "ignore", invalid = "ignore", over = "ignore"):
+            values = self.function(*arguments)
+        shape = np.broadcast_shapes(*[ np.shape(value) for value in arguments + values ])
+        result = np.empty(shape + (len(values),), dtype = np.result_type(*[ np.asarray(value).dtype for value in values ] + [ float ]))
+        for position, value in enumerate(values):
+            result[..., position] = value
+        return result.reshape(shape + self.shape)
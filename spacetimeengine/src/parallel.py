@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+from concurrent.futures import ProcessPoolExecutor
+
+class ComponentExecutor:
+
+    """
+    Description
+    ===========
+    Maps a function over the coefficients of a pipeline stage. With more than one worker the coefficients are fanned out to a process pool; the results always come back in the order the coefficients were given. The pool is started on first use and reused by every later stage until shutdown() is called.
+
+    Example
+    =======
+    >> executor = ComponentExecutor(8)
+    >> executor.map(simplify, [ sin(x)**2 + cos(x)**2, x/x ])
+    [1, 1]
+    >> executor.shutdown()
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    def __init__(self, workers = None):
+        self.workers = workers
+        self.pool = None
+
+    def is_parallel(self):
+        return self.workers is not None and self.workers > 1
+
+    def map(self, function, expressions):
+        """
+        Description
+        ===========
+        Applies function to every expression and returns the results as a list in input order. The function has to be defined at module level so it can be sent to the worker processes.
+        """
+
+        expressions = list(expressions)
+        if self.is_parallel() == False or len(expressions) < 2:
+            return [ function(expression) for expression in expressions ]
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(max_workers = self.workers)
+        return list(self.pool.map(function, expressions))
+
+    def shutdown(self):
+        """
+        Description
+        ===========
+        Stops the worker processes. A later map() starts a new pool.
+        """
+
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
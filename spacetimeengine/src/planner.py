@@ -0,0 +1,104 @@
+#!/usr/bin/env python
+
+"""
+Pipeline planning functions
+===========================
+Describes the pipeline stages of a SpaceTime object as a dependency graph and picks the cheapest set of stages which produces a requested list of outputs.
+"""
+
+import itertools
+
+# Coefficients stored by each stage as (tensor, index_config, rank), keyed as in SpaceTime.evaluated_coefficients.
+stage_coefficients = {
+    "connection_udd" : ("connection", "udd", 3),
+    "connection_ddd" : ("connection", "ddd", 3),
+    "riemann_dddd" : ("riemann", "dddd", 4),
+    "riemann_uddd" : ("riemann", "uddd", 4),
+    "ricci_dd" : ("ricci", "dd", 2),
+    "ricci_scalar" : ("ricci_scalar", "", 0),
+    "einstein_dd" : ("einstein", "dd", 2),
+    "stress_energy_dd" : ("stress_energy", "dd", 2),
+    "schouten_dd" : ("schouten", "dd", 2),
+    "weyl_dddd" : ("weyl", "dddd", 4),
+    "proper_time_geodesic_acceleration" : ("proper_time_geodesic_acceleration", "", 1),
+    "coordinate_time_geodesic_acceleration" : ("coordinate_time_geodesic_acceleration", "", 1),
+    "geodesic_deviation_acceleration" : ("geodesic_deviation_acceleration", "", 1)
+}
+
+# Alternative routes to each stage as (prerequisite stages, cost). The cost estimates the number of terms built for a metric of n dimensions.
+stage_routes = {
+    "connection_udd" : [ ((), lambda n: n**3*(n + 1)//2) ],
+    "connection_ddd" : [ ((), lambda n: 3*n**2*(n + 1)//2) ],
+    "riemann_dddd" : [ (("connection_udd",), lambda n: n**2*(n**2 - 1)//12*(2*n**2 + 4)) ],
+    "riemann_uddd" : [ (("riemann_dddd",), lambda n: n**4*(n - 1)//2) ],
+    "ricci_dd" : [ (("riemann_uddd",), lambda n: n**3), (("connection_udd",), lambda n: n**4 + 2*n**3) ],
+    "ricci_scalar" : [ (("ricci_dd",), lambda n: n**2) ],
+    "einstein_dd" : [ (("ricci_dd", "ricci_scalar"), lambda n: n**2) ],
+    "stress_energy_dd" : [ (("einstein_dd",), lambda n: n**2) ],
+    "schouten_dd" : [ (("connection_udd",), lambda n: n**3) ],
+    "weyl_dddd" : [ (("riemann_dddd", "ricci_dd", "ricci_scalar"), lambda n: 9*n**4) ],
+    "proper_time_geodesic_acceleration" : [ (("connection_udd",), lambda n: n**3) ],
+    "coordinate_time_geodesic_acceleration" : [ (("connection_udd",), lambda n: 2*n**3) ],
+    "geodesic_deviation_acceleration" : [ (("riemann_uddd",), lambda n: n**5) ]
+}
+
+# Stages in pipeline order. Every stage comes after all of its prerequisites.
+stage_order = [ "connection_udd", "connection_ddd", "riemann_dddd", "riemann_uddd", "ricci_dd", "schouten_dd", "ricci_scalar", "einstein_dd", "stress_energy_dd", "weyl_dddd", "proper_time_geodesic_acceleration", "coordinate_time_geodesic_acceleration", "geodesic_deviation_acceleration" ]
+
+def stage_keys(stage, dimension_count):
+    """
+    Description
+    ===========
+    Returns the keys of every coefficient stored by a stage.
+
+    Example
+    =======
+    >> stage_keys("ricci_scalar", 4)
+    [('ricci_scalar', '')]
+    """
+
+    tensor, index_config, rank = stage_coefficients[stage]
+    return [ (tensor, index_config) + indices for indices in itertools.product(range(dimension_count), repeat = rank) ]
+
+def plan_stages(outputs, dimension_count, evaluated_stages = ()):
+    """
+    Description
+    ===========
+    Returns the stages to run, in pipeline order, to produce every stage listed in outputs. Stages in evaluated_stages are free and their prerequisites are not needed. Where a stage can be reached in more than one way (the Ricci tensor from the Riemann tensor or directly from the connection), every combination of routes is costed and the cheapest is kept, counting stages shared by several outputs once.
+
+    Example
+    =======
+    >> plan_stages([ "ricci_scalar" ], 4)
+    ['connection_udd', 'ricci_dd', 'ricci_scalar']
+    >> plan_stages([ "ricci_scalar", "riemann_uddd" ], 4)
+    ['connection_udd', 'riemann_dddd', 'riemann_uddd', 'ricci_dd', 'ricci_scalar']
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    for stage in outputs:
+        if stage not in stage_routes:
+            raise ValueError("Invalid pipeline output %r. Expected one of %s." % (stage, ", ".join(stage_order)))
+    evaluated_stages = set(evaluated_stages)
+    choice_stages = [ stage for stage in stage_order if len(stage_routes[stage]) > 1 ]
+    best_plan = None
+    best_cost = None
+    for choices in itertools.product(*[ range(len(stage_routes[stage])) for stage in choice_stages ]):
+        routes = dict(zip(choice_stages, choices))
+        planned = set()
+        cost = 0
+        pending = [ stage for stage in outputs if stage not in evaluated_stages ]
+        while len(pending) > 0:
+            stage = pending.pop()
+            if stage in planned:
+                continue
+            planned.add(stage)
+            prerequisites, stage_cost = stage_routes[stage][routes.get(stage, 0)]
+            cost = cost + stage_cost(dimension_count)
+            pending.extend(prerequisite for prerequisite in prerequisites if prerequisite not in evaluated_stages)
+        if best_cost is None or cost < best_cost:
+            best_plan = planned
+            best_cost = cost
+    return [ stage for stage in stage_order if stage in best_plan ]
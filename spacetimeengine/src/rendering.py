@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+
+"""
+Shadow rendering functions
+==========================
+Renders the shadow and the lensed sky of a black hole by backward ray tracing: one null geodesic per pixel is launched from a static camera into the direction the pixel looks at, and integrated until it falls through the horizon (captured) or leaves an escape sphere (escaped), whose final angles give the point of the sky the pixel sees. The image is split into tiles which are traced in batches (see integrate_geodesics) on a process pool, and every worker writes its tile straight into a shared memory image.
+
+The coordinates are assumed to be (t, r, theta, phi) with signature (+, -, -, -), as in the Schwarzschild solution.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+from spacetimeengine.src.geodesics import escape_event, horizon_event, integrate_geodesics
+
+# Classification codes of the rays in a ShadowImage.
+ray_classes = { "unresolved": 0, "captured": 1, "escaped": 2 }
+
+# Tracing state of the current process, set by initialize_tracer.
+tracer_state = {}
+
+class ShadowImage:
+
+    """
+    Description
+    ===========
+    A rendered black hole image. classification holds the ray class of every pixel with shape (height, width), coded as in ray_classes: captured rays make up the shadow, escaped rays see the sky at the angles theta (in [0, pi]) and phi (in [0, 2 pi)), and unresolved rays ran out of affine parameter or steps. theta and phi are nan where the ray did not escape.
+
+    Example
+    =======
+    >> image = black_hole.render_shadow((30, pi/2, 0), 256, 256, pi/4, params={ "G": 1, "M": 1, "c": 1 }, workers=8)
+    >> plt.imsave("shadow.png", image.rgb())
+    """
+
+    def __init__(self, classification, theta, phi):
+        self.classification = classification
+        self.theta = theta
+        self.phi = phi
+
+    def rgb(self, cells = 12):
+        """
+        Description
+        ===========
+        Returns an RGB image of shape (height, width, 3) which shows the lensing of the sky: escaped rays are colored by a checkerboard of cells x 2 cells squares in (theta, phi), in different hues on the two hemispheres, captured rays are black and unresolved rays gray.
+        """
+
+        image = np.full(self.classification.shape + (3,), 0.5)
+        image[self.classification == ray_classes["captured"]] = 0.0
+        escaped = self.classification == ray_classes["escaped"]
+        theta = self.theta[escaped]
+        phi = self.phi[escaped]
+        checker = (np.floor(theta/np.pi*cells) + np.floor(phi/(2*np.pi)*2*cells)) % 2
+        northern = theta < np.pi/2
+        colors = np.where(northern[:, None], np.array([ 0.95, 0.75, 0.3 ]), np.array([ 0.3, 0.55, 0.95 ]))
+        image[escaped] = colors*np.where(checker[:, None] == 0, 1.0, 0.45)
+        return image
+
+def camera_frame(metric):
+    """
+    Description
+    ===========
+    Returns the orthonormal frame of a static observer as rows of coordinate components (e_t, e_r, e_theta, e_phi), built by Gram-Schmidt from the coordinate basis with the numeric metric at the camera. Raises ValueError where the observer cannot be static, such as inside an ergoregion or a horizon.
+    """
+
+    metric = np.asarray(metric, dtype = float)
+    frame = []
+    for position in range(len(metric)):
+        vector = np.zeros(len(metric))
+        vector[position] = 1.0
+        for previous in frame:
+            vector = vector - (vector @ metric @ previous)/(previous @ metric @ previous)*previous
+        norm = vector @ metric @ vector
+        if not np.isfinite(norm) or (position == 0 and norm <= 0) or (position > 0 and norm >= 0):
+            raise ValueError("No static observer frame at the camera position.")
+        frame.append(vector/np.sqrt(abs(norm)))
+    return np.array(frame)
+
+def pixel_velocities(frame, width, height, fov, rows, columns):
+    r"""
+    Description
+    ===========
+    Returns the initial null velocities of the backward rays of the given pixels, with shape (k, 4). A pinhole camera looks towards decreasing r with a horizontal field of view fov; image right is +phi and image up is -theta.
+
+    LaTeX representation
+    ====================
+    u = e_t + \frac{-e_r + x e_\phi - y e_\theta}{\sqrt{1 + x^2 + y^2}}
+    """
+
+    scale = np.tan(fov/2)
+    x = (2*(columns + 0.5)/width - 1)*scale
+    y = (1 - 2*(rows + 0.5)/height)*scale*height/width
+    length = np.sqrt(1 + x**2 + y**2)
+    return frame[0][None, :] + (-frame[1][None, :] + x[:, None]*frame[3][None, :] - y[:, None]*frame[2][None, :])/length[:, None]
+
+def image_tiles(width, height, tile_size):
+    """
+    Description
+    ===========
+    Splits an image into tiles of at most tile_size x tile_size pixels, as (row_start, row_end, column_start, column_end).
+    """
+
+    return [ (row, min(row + tile_size, height), column, min(column + tile_size, width)) for row in range(0, height, tile_size) for column in range(0, width, tile_size) ]
+
+def initialize_tracer(equations, camera, frame, width, height, fov, params, horizon_radius, margin, escape_radius, tau_end, rtol, atol):
+    """
+    Description
+    ===========
+    Stores the tracing state in the current process. Used as the initializer of the worker processes; the events are built here because their functions cannot be pickled.
+    """
+
+    events = [ horizon_event(horizon_radius, margin), escape_event(escape_radius) ]
+    tracer_state.update(equations = equations, camera = camera, frame = frame, width = width, height = height, fov = fov, params = params, events = events, tau_end = tau_end, rtol = rtol, atol = atol)
+
+def trace_tile(memory_name, tile):
+    """
+    Description
+    ===========
+    Traces the rays of one tile and writes their classification and final angles into the shared memory image of shape (3, height, width).
+    """
+
+    state = tracer_state
+    row_start, row_end, column_start, column_end = tile
+    rows, columns = np.meshgrid(np.arange(row_start, row_end), np.arange(column_start, column_end), indexing = "ij")
+    rows = rows.ravel()
+    columns = columns.ravel()
+    u0 = pixel_velocities(state["frame"], state["width"], state["height"], state["fov"], rows, columns)
+    x0 = np.broadcast_to(np.array([ 0.0 ] + list(state["camera"])), u0.shape)
+    batch = integrate_geodesics(state["equations"], x0, u0, (0, state["tau_end"]), state["params"], events = state["events"], rtol = state["rtol"], atol = state["atol"])
+    classification = np.where(batch.status == "horizon", ray_classes["captured"], np.where(batch.status == "escape", ray_classes["escaped"], ray_classes["unresolved"]))
+    # Fold the polar angle back into [0, pi] for rays which crossed the coordinate poles.
+    theta = np.mod(batch.positions[:, 2], 2*np.pi)
+    flipped = theta > np.pi
+    theta = np.where(flipped, 2*np.pi - theta, theta)
+    phi = np.mod(batch.positions[:, 3] + np.where(flipped, np.pi, 0.0), 2*np.pi)
+    escaped = classification == ray_classes["escaped"]
+    memory = shared_memory.SharedMemory(name = memory_name)
+    try:
+        image = np.ndarray((3, state["height"], state["width"]), dtype = float, buffer = memory.buf)
+        image[0, rows, columns] = classification
+        image[1, rows, columns] = np.where(escaped, theta, np.nan)
+        image[2, rows, columns] = np.where(escaped, phi, np.nan)
+        del image
+    finally:
+        memory.close()
+    return len(rows)
+
+def render_shadow(equations, camera, metric, horizon_radius, width, height, fov, params = None, escape_radius = None, margin = 0.01, tau_end = None, workers = None, tile_size = 32, rtol = 1e-8, atol = 1e-10):
+    """
+    Description
+    ===========
+    Renders the image seen by a static camera at camera = (r, theta, phi) through the compiled GeodesicEquations of a metric. metric is the numeric covariant metric at the camera, horizon_radius the outer horizon at which rays count as captured (stopped at (1 + margin) times the radius) and escape_radius the sphere beyond which they count as escaped, twice the camera radius by default. Rays still running at the affine parameter tau_end, ten times the escape radius by default, are unresolved.
+
+    The image is split into tiles of tile_size x tile_size pixels. With more than one worker the tiles are traced on a process pool, every tile as one batch of geodesics, and the workers write their results into a shared memory image. Returns a ShadowImage.
+
+    Example
+    =======
+    >> image = render_shadow(equations, (30, pi/2, 0), metric, 2, 1024, 1024, pi/4, params={ "G": 1, "M": 1, "c": 1 }, workers=16)
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    camera = tuple(float(value) for value in camera)
+    if escape_radius is None:
+        escape_radius = 2*camera[0]
+    if escape_radius <= camera[0]:
+        raise ValueError("The escape radius must lie outside the camera.")
+    if tau_end is None:
+        tau_end = 10*escape_radius
+    frame = camera_frame(metric)
+    tiles = image_tiles(width, height, tile_size)
+    state = (equations, camera, frame, width, height, fov, params, horizon_radius, margin, escape_radius, tau_end, rtol, atol)
+    memory = shared_memory.SharedMemory(create = True, size = 3*height*width*np.dtype(float).itemsize)
+    try:
+        if workers is not None and workers > 1:
+            with ProcessPoolExecutor(max_workers = workers, initializer = initialize_tracer, initargs = state) as pool:
+                list(pool.map(trace_tile, [ memory.name ]*len(tiles), tiles))
+        else:
+            initialize_tracer(*state)
+            for tile in tiles:
+                trace_tile(memory.name, tile)
+        image = np.ndarray((3, height, width), dtype = float, buffer = memory.buf).copy()
+    finally:
+        memory.close()
+        memory.unlink()
+    return ShadowImage(image[0].astype(np.int8), image[1], image[2])
@@ -0,0 +1,91 @@
+#!/usr/bin/env python
+from sympy import Dummy, Matrix, cse, count_ops, numbered_symbols, sympify
+from spacetimeengine.src.components import Components
+
+class SharedTensor:
+
+    """
+    Description
+    ===========
+    Keeps every coefficient of a tensor as a single shared expression graph. Subexpressions which occur more than once anywhere in the tensor are extracted once by common subexpression elimination (sympy cse) into an ordered list of replacements, and each coefficient only refers to them. The form is smaller to store than the separate coefficient trees and is what the numeric kernels are compiled from.
+
+    Accepts Components, a sympy Matrix, a (nested) list of coefficients or a single expression.
+
+    Example
+    =======
+    >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+    >> riemann = SharedTensor(black_hole.riemann_tensor_uddd)
+    >> len(riemann.replacements), riemann.shape
+    (19, (4, 4, 4, 4))
+    >> simplify(riemann[0, 1, 0, 1] - black_hole.riemann_tensor_uddd[0, 1, 0, 1])
+    0
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    def __init__(self, tensor):
+        if isinstance(tensor, Components):
+            self.shape = tensor.shape
+            values = list(tensor.values)
+        elif isinstance(tensor, Matrix):
+            self.shape = tensor.shape
+            values = list(tensor)
+        elif isinstance(tensor, list):
+            self.shape = (len(tensor),)
+            values = list(tensor)
+            while len(values) > 0 and isinstance(values[0], list):
+                self.shape = self.shape + (len(values[0]),)
+                values = [ value for row in values for value in row ]
+        else:
+            self.shape = ()
+            values = [ tensor ]
+        values = [ sympify(value) for value in values ]
+        # Dummy symbols never clash with the coordinates or parameters of a metric.
+        self.replacements, self.reduced = cse(values, symbols = numbered_symbols("shared", cls = Dummy), order = "none")
+
+    def __len__(self):
+        return len(self.reduced)
+
+    def __getitem__(self, indices):
+        if not isinstance(indices, tuple):
+            indices = (indices,)
+        position = 0
+        for index, size in zip(indices, self.shape):
+            position = position*size + index
+        return self.expand(self.reduced[position])
+
+    def expand(self, expression):
+        """
+        Description
+        ===========
+        Substitutes the shared subexpressions back into an expression of the shared form.
+        """
+
+        for symbol, value in reversed(self.replacements):
+            expression = expression.xreplace({ symbol: value })
+        return expression
+
+    def values(self):
+        """
+        Description
+        ===========
+        Returns every coefficient in full, in row-major order.
+        """
+
+        return [ self.expand(expression) for expression in self.reduced ]
+
+    def operation_count(self):
+        """
+        Description
+        ===========
+        Returns the number of operations (sympy count_ops) in the shared form, counting every shared subexpression once.
+
+        Example
+        =======
+        >> riemann.operation_count() < sum(count_ops(value) for value in riemann.values())
+        True
+        """
+
+        return sum(count_ops(value) for symbol, value in self.replacements) + sum(count_ops(expression) for expression in self.reduced)
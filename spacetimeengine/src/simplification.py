@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+from sympy import cancel, count_ops, simplify, together, trigsimp
+import signal
+import threading
+
+def no_simplification(expression):
+    """
+    Description
+    ===========
+    Returns the expression as it was built.
+    """
+
+    return expression
+
+def canonical_simplification(expression):
+    """
+    Description
+    ===========
+    Brings the expression onto a single cancelled fraction. Cheap, and enough to make most rational coefficients which vanish identically reduce to 0.
+    """
+
+    return cancel(together(expression))
+
+def trigonometric_simplification(expression):
+    """
+    Description
+    ===========
+    Canonical simplification followed by trigsimp, for metrics in angular coordinates.
+    """
+
+    return trigsimp(cancel(together(expression)))
+
+def full_simplification(expression):
+    """
+    Description
+    ===========
+    Sympy's general purpose simplify. The most expensive mode and the default for every stage.
+    """
+
+    return simplify(expression)
+
+# Simplification functions by mode name, cheapest first.
+simplification_modes = {
+    "none" : no_simplification,
+    "canonical" : canonical_simplification,
+    "trigonometric" : trigonometric_simplification,
+    "full" : full_simplification
+}
+
+class SimplificationTimeout(Exception):
+    """
+    Raised inside a simplification which has used up its time budget.
+    """
+
+def run_with_time_limit(function, expression, seconds):
+    """
+    Description
+    ===========
+    Calls function(expression) and raises SimplificationTimeout once it has run for the given number of seconds. The limit uses a SIGALRM interval timer, so it is only enforced on platforms which have one and in the main thread of a process (which includes the worker processes of the executor); elsewhere the function runs without a limit.
+
+    Example
+    =======
+    >> run_with_time_limit(simplify, expression, 2.5)
+    """
+
+    if seconds is None or not hasattr(signal, "setitimer") or threading.current_thread() is not threading.main_thread():
+        return function(expression)
+    def interrupt(signal_number, frame):
+        raise SimplificationTimeout()
+    previous_handler = signal.signal(signal.SIGALRM, interrupt)
+    signal.setitimer(signal.ITIMER_REAL, seconds)
+    try:
+        return function(expression)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous_handler)
+
+class BudgetedSimplifier:
+
+    """
+    Description
+    ===========
+    Simplifies an expression within a time and complexity budget. Expressions with more than max_operations operations (sympy count_ops) skip the simplification, and simplifications running longer than seconds are interrupted. In both cases the cheaper fallback is applied instead (under the same time limit, keeping the expression as built if that runs out too). Calling the object returns (expression, exceeded).
+
+    Example
+    =======
+    >> budgeted = BudgetedSimplifier(full_simplification, canonical_simplification, seconds = 5)
+    >> budgeted(sin(x)**2 + cos(x)**2)
+    (1, False)
+    """
+
+    def __init__(self, function, fallback, seconds = None, max_operations = None):
+        self.function = function
+        self.fallback = fallback
+        self.seconds = seconds
+        self.max_operations = max_operations
+
+    def __call__(self, expression):
+        if self.max_operations is None or count_ops(expression) <= self.max_operations:
+            try:
+                return run_with_time_limit(self.function, expression, self.seconds), False
+            except SimplificationTimeout:
+                pass
+        try:
+            return run_with_time_limit(self.fallback, expression, self.seconds), True
+        except SimplificationTimeout:
+            return expression, True
+
+class SimplificationPolicy:
+
+    """
+    Description
+    ===========
+    Chooses how the coefficients of each pipeline stage are simplified. Every stage uses the default mode unless it is given its own, and with final_only=True only the stages listed in final_stages are simplified at all; intermediate stages keep the expressions as they were built.
+
+    Modes: "none", "canonical" (cancel/together), "trigonometric" (canonical + trigsimp), "full" (simplify).
+    Stages: metric, connection, riemann, ricci, ricci_scalar, einstein, stress_energy, weyl, schouten, geodesic.
+
+    A per-coefficient budget bounds the time spent on any single coefficient: time_budget in seconds and complexity_budget in operations (sympy count_ops). Coefficients exceeding it are simplified with the fallback mode instead and reported by the SpaceTime object in budget_exceeded.
+
+    Example
+    =======
+    >> policy = SimplificationPolicy("canonical", riemann = "trigonometric")
+    >> black_hole = SpaceTime(Solution().schwarzschild(), True, simplification = policy)
+    >> numeric = SpaceTime(Solution().schwarzschild(), True, simplification = SimplificationPolicy(final_only = True))
+    >> untrusted = SpaceTime(user_solution, True, simplification = SimplificationPolicy(time_budget = 10, complexity_budget = 5000))
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    stages = ( "metric", "connection", "riemann", "ricci", "ricci_scalar", "einstein", "stress_energy", "weyl", "schouten", "geodesic" )
+
+    def __init__(self, default = "full", final_only = False, final_stages = ( "ricci_scalar", "einstein", "stress_energy", "weyl" ), time_budget = None, complexity_budget = None, fallback = "canonical", **stage_modes):
+        for mode in [ default, fallback ] + list(stage_modes.values()):
+            if mode not in simplification_modes:
+                raise ValueError("Invalid simplification mode %r. Expected one of %s." % (mode, ", ".join(simplification_modes)))
+        for stage in list(stage_modes) + list(final_stages):
+            if stage not in self.stages:
+                raise ValueError("Invalid pipeline stage %r. Expected one of %s." % (stage, ", ".join(self.stages)))
+        self.default = default
+        self.final_only = final_only
+        self.final_stages = tuple(final_stages)
+        self.stage_modes = dict(stage_modes)
+        self.time_budget = time_budget
+        self.complexity_budget = complexity_budget
+        self.fallback = fallback
+
+    def mode(self, stage):
+        """
+        Description
+        ===========
+        Returns the simplification mode name used for a stage.
+        """
+
+        if self.final_only and stage not in self.final_stages:
+            return "none"
+        return self.stage_modes.get(stage, self.default)
+
+    def simplifier(self, stage):
+        """
+        Description
+        ===========
+        Returns the simplification function of a stage. The functions are defined at module level so they can be sent to worker processes.
+        """
+
+        return simplification_modes[self.mode(stage)]
+
+    def simplify(self, stage, expression):
+        return self.simplifier(stage)(expression)
+
+    def budgeted_simplifier(self, stage):
+        """
+        Description
+        ===========
+        Returns a BudgetedSimplifier for a stage, which returns (expression, exceeded) when called. Stages left unsimplified need no budget.
+        """
+
+        if self.mode(stage) == "none":
+            return BudgetedSimplifier(no_simplification, no_simplification)
+        return BudgetedSimplifier(self.simplifier(stage), simplification_modes[self.fallback], self.time_budget, self.complexity_budget)
+
+    def __repr__(self):
+        # Also serves as the policy part of the cache key, so it lists the resolved mode of every stage and any budget.
+        settings = [ "%s=%s" % (stage, self.mode(stage)) for stage in self.stages ]
+        if self.time_budget is not None or self.complexity_budget is not None:
+            settings = settings + [ "time_budget=%s" % self.time_budget, "complexity_budget=%s" % self.complexity_budget, "fallback=%s" % self.fallback ]
+        return "SimplificationPolicy(%s)" % ", ".join(settings)
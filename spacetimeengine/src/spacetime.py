@@ -1,6 +1,18 @@
 #!/usr/bin/env python
 from sympy import *
 from spacetimeengine.src.solutions import Solution  # Adjust the import path as needed
+from spacetimeengine.src.cache import TensorCache
+from spacetimeengine.src.components import Components
+from spacetimeengine.src.geodesics import GeodesicEquations, HamiltonianEquations, horizon_event, integrate_geodesic, integrate_geodesics, integrate_hamiltonian
+from spacetimeengine.src.inverse import inverse_metric, metric_determinant, update_inverse_metric
+from spacetimeengine.src.numeric import NumericTensor
+from spacetimeengine.src.parallel import ComponentExecutor
+from spacetimeengine.src.planner import plan_stages, stage_coefficients, stage_keys, stage_order
+from spacetimeengine.src.rendering import render_shadow
+from spacetimeengine.src.shared import SharedTensor
+from spacetimeengine.src.simplification import SimplificationPolicy
+from spacetimeengine.src.sparsity import DependencyIndex, affected_coefficients
+from spacetimeengine.src.symmetries import independent_riemann_indices, riemann_symmetry_terms
 import matplotlib.pyplot as plt
 import numpy as np
 import os
@@ -40,7 +52,7 @@ def trace_calls(frame, event, arg):
 class SpaceTime:
 
     # Run at object creation.
-    def __init__(self, solution, suppress_printing = False):
+    def __init__(self, solution, suppress_printing = False, lazy = False, workers = None, cache = None, simplification = None, outputs = None):
             
         # Initializes coordinate set class object.
         self.coordinate_set = solution[1]
@@ -50,781 +62,871 @@ class SpaceTime:
         self.dimensions = range(len(self.coordinate_set))
         # Upon a SpaceTime object creation, the user may choose to print the terms as they are computed.
         self.suppress_printing = suppress_printing
+        # Upon a SpaceTime object creation, the user may choose to defer every computation until a coefficient is requested.
+        self.lazy = lazy
+        # Keys of the coefficients which have already been computed and stored. Consulted by the getters when lazy.
+        self.evaluated_coefficients = set()
+        # Simplifies the coefficients of each stage, optionally across a pool of worker processes.
+        self.executor = ComponentExecutor(workers)
+        # Chooses how each pipeline stage is simplified. Accepts a SimplificationPolicy or a mode name applied to every stage.
+        if simplification is None:
+            self.simplification_policy = SimplificationPolicy()
+        elif isinstance(simplification, SimplificationPolicy):
+            self.simplification_policy = simplification
+        else:
+            self.simplification_policy = SimplificationPolicy(simplification)
+        # Coefficients whose simplification ran over the budget of the policy and fell back to a cheaper form.
+        self.budget_exceeded = []
+        # Memoized partial derivatives of the metric and connection coefficients, shared by every pipeline stage.
+        self.derivative_cache = {}
+        # Whole tensors in common subexpression form, built on request by get_shared_tensor, and the numeric kernels compiled from them by numeric.
+        self.shared_tensors = {}
+        self.numeric_tensors = {}
+        # Numeric kernels of single expressions compiled by evaluate_grid for plotting.
+        self.grid_kernels = {}
+        # Compiled numeric geodesic equations and Hamilton's equations, built on request by get_geodesic_equations and get_hamiltonian_equations.
+        self.geodesic_equations = None
+        self.hamiltonian_equations = None
+        # Optional on-disk cache of computed coefficients. Accepts True (default directory), a directory path or a TensorCache.
+        if cache is None or cache is False:
+            self.cache = None
+        elif cache is True:
+            self.cache = TensorCache()
+        elif isinstance(cache, TensorCache):
+            self.cache = cache
+        else:
+            self.cache = TensorCache(cache)
+        cached_entry = None
+        if self.cache is not None:
+            self.cache_key = self.cache.key(solution[0], self.coordinate_set, solution[2], self.simplification_policy)
+            cached_entry = self.cache.load(self.cache_key)
+        # Whether the coefficients of this object were read from the cache.
+        self.cache_hit = cached_entry is not None
         
-        # Sets the metric tensor and its inverse.
+        # Sets the metric tensor, its inverse and the determinant of the covariant metric.
         self.metric_index_config = solution[2]
-        if (self.metric_index_config == "uu"):
+        if (self.cache_hit == True):
+            self.metric_tensor_dd = cached_entry["metric_tensor_dd"]
+            self.metric_tensor_uu = cached_entry["metric_tensor_uu"]
+            self.metric_determinant = cached_entry["metric_determinant"]
+        elif (self.metric_index_config == "uu"):
             self.metric_tensor_uu = solution[0]
-            self.metric_tensor_dd = simplify(solution[0].inv())
+            self.metric_tensor_dd, determinant = self.compute_inverse_metric(solution[0])
+            self.metric_determinant = 1/determinant
         elif(self.metric_index_config == "dd"):
             self.metric_tensor_dd = solution[0]
-            self.metric_tensor_uu = simplify(solution[0].inv())
+            self.metric_tensor_uu, self.metric_determinant = self.compute_inverse_metric(solution[0])
         else:
             print("Invalid index_config string.")
+        # Records which coefficients vanish identically and which coordinates they depend on, so provably zero terms are skipped.
+        self.dependency_index = DependencyIndex(self.metric_tensor_dd, self.metric_tensor_uu, self.coordinate_set)
         
         # Declares ( gravitational field ) connection class object.
-        self.christoffel_symbols_udd = Matrix([
-                                                 [
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ],
-                                                 [
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ],
-                                                 [
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ],
-                                                 [
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ]
-                                             ])
+        self.christoffel_symbols_udd = Components(self.dimension_count, 3)
         # Declares the Christoffel symbols of the first kind class object.
-        self.christoffel_symbols_ddd = Matrix([
-                                                 [
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ],
-                                                 [
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ],
-                                                 [
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ],
-                                                 [
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ]
-                                             ])
+        self.christoffel_symbols_ddd = Components(self.dimension_count, 3)
         
         # Declares Riemann curvature tensor class object.
-        self.riemann_tensor_uddd = Matrix([    
-                                               [    
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ]
-                                               ],
-                                               [    
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ]
-                                               ],
-                                               [    
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ]
-                                               ],
-                                               [    
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ],
-                                                    [
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ], 
-                                                        [ 0, 0, 0, 0 ]
-                                                    ]
-                                               ]    
-                                           ])  
-
+        self.riemann_tensor_uddd = Components(self.dimension_count, 4)
         # Declares Riemann curvature tensor "dddd" type class object.
-        self.riemann_tensor_dddd = Matrix([    
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ]    
-                                               ])  
-
-        # Declares Weyl curvature tensor "dddd" type class object.
-        self.weyl_tensor_dddd = Matrix([    
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ]    
-                                               ])
-        
-        # Declares Riemann curvature tensor "uddd" type class object.
-        self.weyl_tensor_uddd = Matrix([    
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ]    
-                                               ])  
+        self.riemann_tensor_dddd = Components(self.dimension_count, 4)
         
-        # Declares Riemann curvature tensor "dduu" type class object.        
-        self.weyl_tensor_dduu = Matrix([    
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [  0, 0, 0, 0 ]
-                                                        ]
-                                                   ],
-                                                   [    
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ],
-                                                        [
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ], 
-                                                            [ 0, 0, 0, 0 ]
-                                                        ]
-                                                   ]    
-                                               ])          
+        # Declares Weyl curvature tensor "dddd" type class object.
+        self.weyl_tensor_dddd = Components(self.dimension_count, 4)
+        # Declares Weyl curvature tensor "uddd" type class object.
+        self.weyl_tensor_uddd = Components(self.dimension_count, 4)
+        # Declares Weyl curvature tensor "dduu" type class object.        
+        self.weyl_tensor_dduu = Components(self.dimension_count, 4)
         
         # Declares the covariant Ricci curvature tensor class object.
-        self.ricci_tensor_dd = Matrix([
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ]
-                                        ])
-        
+        self.ricci_tensor_dd = zeros(self.dimension_count)
         # Declares the contravariant Ricci curvature tensor class object.
-        self.ricci_tensor_uu = Matrix([
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ]
-                                        ])
-        
+        self.ricci_tensor_uu = zeros(self.dimension_count)
         # Declares the mixed Ricci curvature tensor class object.
-        self.ricci_tensor_ud = Matrix([
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ], 
-                                            [ 0, 0, 0, 0 ]
-                                        ])
+        self.ricci_tensor_ud = zeros(self.dimension_count)
         
-        # Declares Ricci curvature tensor class object.
-        self.ricci_scalar = sin(self.coordinate_set[1]) * cos(self.coordinate_set[2])
+        # Declares Ricci curvature scalar class object.
+        self.ricci_scalar = 0
         
         # Declares the covariant Einstein curvature tensor class object.
-        self.einstein_tensor_dd = Matrix([    
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ]
-                                           ])
-        
+        self.einstein_tensor_dd = zeros(self.dimension_count)
         # Declares the contravariant Einstein curvature tensor class object.
-        self.einstein_tensor_uu = Matrix([    
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ]
-                                           ])
-        
+        self.einstein_tensor_uu = zeros(self.dimension_count)
         # Declares the mixed Einstein curvature tensor class object.
-        self.einstein_tensor_ud = Matrix([    
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ]
-                                           ])
+        self.einstein_tensor_ud = zeros(self.dimension_count)
         
         # Declares the covariant stress-energy tensor class object.
-        self.stress_energy_tensor_dd = Matrix([
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ])
-        
+        self.stress_energy_tensor_dd = zeros(self.dimension_count)
         # Declares the contravariant stress-energy tensor class object.
-        self.stress_energy_tensor_uu = Matrix([
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ])
-        
+        self.stress_energy_tensor_uu = zeros(self.dimension_count)
         # Declares the mixed stress-energy tensor class object.
-        self.stress_energy_tensor_ud = Matrix([
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ], 
-                                                     [ 0, 0, 0, 0 ]
-                                                 ])
+        self.stress_energy_tensor_ud = zeros(self.dimension_count)
+
+        # Declares the contravariant Schouten tensor class object.
+        self.schouten_tensor_uu = zeros(self.dimension_count)
+        # Declares the covariant Schouten tensor class object.
+        self.schouten_tensor_dd = zeros(self.dimension_count)
+
+        # Declares cosmological constant class object.
+        self.cosmological_constant = 0
+        
+        # Acceleration vectors.
+        self.proper_acceleration = [ 0 ] * self.dimension_count
+        self.coordinate_acceleration = [ 0 ] * self.dimension_count
+        self.geodesic_deviation_acceleration = [ 0 ] * self.dimension_count
+
+        # Velocity vectors.
+        self.proper_velocity = [ 0 ] * self.dimension_count
+        self.coordinate_velocity = [ 0 ] * self.dimension_count
+        self.geodesic_velocity= [ 0 ] * self.dimension_count
+
+        # Position vectors.
+        self.proper_position = [ 0 ] * self.dimension_count
+        self.coordinate_position = [ 0 ] * self.dimension_count
+        self.geodesic_deviation_position = [ 0 ] * self.dimension_count
+
+        """
+        Initializing object functions
+        =============================
+        """
+
+        # TODO
+        # finish all of these functions.
+
+        self.set_all_metric_coefficients("dd")
+        if(self.cache_hit == True):
+            self.restore_cached_coefficients(cached_entry)
+            return
+        if(outputs is not None):
+            # Only the stages needed for the requested outputs are run (see compute).
+            self.compute(outputs)
+            return
+        if(self.lazy == True):
+            # Every other coefficient is computed (with its upstream dependencies) on first access.
+            return
+        #self.set_all_metric_coefficients("uu")
+        self.set_all_connection_coefficients("udd")
+        #self.set_all_connection_coefficients("ddd")
+        self.set_all_riemann_coefficients("uddd")
+        #self.set_all_riemann_coefficients("dddd")
+        self.set_all_ricci_coefficients("dd")
+        #self.set_all_weyl_coefficients("dddd")
+        #self.set_all_weyl_coefficients("uddd")
+        self.set_all_schouten_coefficients("dd")
+        #self.set_all_cotton_coefficients("ddd")
+        #self.set_all_ricci_coefficients("uu")
+        #self.set_all_ricci_coefficients("ud")
+        self.set_ricci_scalar()
+        self.set_all_einstein_coefficients("dd")
+        #self.set_all_einstein_coefficients("uu")
+        #self.set_all_einstein_coefficients("ud")
+        self.set_all_stress_energy_coefficients("dd")
+        #self.set_all_stress_energy_coefficients("uu")
+        #self.set_all_stress_energy_coefficients("ud")
+        #self.set_cosmological_constant(solution[3])
+        self.set_all_proper_time_geodesic_accelerations()
+        self.set_all_coordinate_time_geodesic_accelerations()
+        self.set_all_geodesic_deviation_accelerations()
+        self.executor.shutdown()
+        if self.cache is not None:
+            self.cache.store(self.cache_key, self.cached_coefficients())
+        
+    """
+    Lazy evaluation functions
+    =========================
+    """
+
+    def is_evaluated(self, tensor, index_config, *indices):
+        """
+        Description
+        ===========
+        Returns whether a single coefficient has already been computed and stored. Objects created eagerly (the default) store every coefficient of the default pipeline at creation; any other coefficient is computed on first access, as it is for lazy objects.
+
+        Example
+        =======
+        >> newtonian = SpaceTime(Solution().weak_field_approximation(), True, lazy=True)
+        >> newtonian.is_evaluated("ricci", "dd", 0, 0)
+        False
+        >> newtonian.get_ricci_coefficient("dd", 0, 0)
+        >> newtonian.is_evaluated("ricci", "dd", 0, 0)
+        True
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        return (tensor, index_config) + indices in self.evaluated_coefficients
+
+    def mark_evaluated(self, tensor, index_config, *indices):
+        """
+        Description
+        ===========
+        Records that a single coefficient has been stored so lazy getters stop recomputing it. Called by every setter.
+
+        Example
+        =======
+        >> newtonian = SpaceTime(Solution().weak_field_approximation(), True, lazy=True)
+        >> newtonian.mark_evaluated("ricci", "dd", 0, 0)
+        """
+
+        self.evaluated_coefficients.add((tensor, index_config) + indices)
+
+    """
+    Cache functions
+    ===============
+    """
+
+    # Class objects written to and read from the on-disk cache.
+    cached_attributes = [ "metric_tensor_dd", "metric_tensor_uu", "metric_determinant", "christoffel_symbols_udd", "christoffel_symbols_ddd", "riemann_tensor_uddd", "riemann_tensor_dddd", "ricci_tensor_dd", "ricci_scalar", "einstein_tensor_dd", "stress_energy_tensor_dd", "schouten_tensor_dd", "proper_acceleration", "coordinate_acceleration", "geodesic_deviation_acceleration", "evaluated_coefficients", "budget_exceeded" ]
+
+    def cached_coefficients(self):
+        """
+        Description
+        ===========
+        Returns the computed class objects as a cache entry.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+        >> black_hole.cached_coefficients()["ricci_scalar"]
+        0
+        """
+
+        return { attribute: getattr(self, attribute) for attribute in self.cached_attributes }
+
+    def restore_cached_coefficients(self, entry):
+        """
+        Description
+        ===========
+        Sets the class objects from a cache entry instead of computing them.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, cache=True)
+        >> black_hole.restore_cached_coefficients(black_hole.cache.load(black_hole.cache_key))
+        """
+
+        for attribute in self.cached_attributes:
+            setattr(self, attribute, entry[attribute])
+        if(self.suppress_printing == False):
+            self.print_all_connection_coefficients("udd")
+            self.print_all_riemann_coefficients("uddd")
+            self.print_all_ricci_coefficients("dd")
+            self.print_ricci_scalar()
+            self.print_all_einstein_coefficients("dd")
+            self.print_all_stress_energy_coefficients("dd")
+
+    """
+    Planning functions
+    ==================
+    """
+
+    # Class objects holding the coefficients of each pipeline stage.
+    stage_attributes = { "connection_udd": "christoffel_symbols_udd", "connection_ddd": "christoffel_symbols_ddd", "riemann_dddd": "riemann_tensor_dddd", "riemann_uddd": "riemann_tensor_uddd", "ricci_dd": "ricci_tensor_dd", "ricci_scalar": "ricci_scalar", "einstein_dd": "einstein_tensor_dd", "stress_energy_dd": "stress_energy_tensor_dd", "schouten_dd": "schouten_tensor_dd", "weyl_dddd": "weyl_tensor_dddd", "proper_time_geodesic_acceleration": "proper_acceleration", "coordinate_time_geodesic_acceleration": "coordinate_acceleration", "geodesic_deviation_acceleration": "geodesic_deviation_acceleration" }
+
+    def compute(self, outputs):
+        """
+        Description
+        ===========
+        Computes only what the requested pipeline stages need and returns their coefficients by stage name. The stages to run are chosen by plan_stages, which takes the cheapest route through the stage dependency graph and skips stages which are already stored; for instance the Ricci tensor is built from the connection unless the Riemann tensor is requested as well.
+
+        Stages: connection_udd, connection_ddd, riemann_dddd, riemann_uddd, ricci_dd, ricci_scalar, einstein_dd, stress_energy_dd, schouten_dd, weyl_dddd, proper_time_geodesic_acceleration, coordinate_time_geodesic_acceleration, geodesic_deviation_acceleration.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> black_hole.compute([ "ricci_scalar", "einstein_dd" ])["ricci_scalar"]
+        0
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, outputs=[ "ricci_dd" ])
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        for stage in plan_stages(outputs, self.dimension_count, self.evaluated_stages()):
+            self.run_stage(stage)
+        self.executor.shutdown()
+        return { stage: getattr(self, self.stage_attributes[stage]) for stage in outputs }
+
+    def evaluated_stages(self):
+        """
+        Description
+        ===========
+        Returns the pipeline stages whose coefficients are all stored.
+        """
+
+        return [ stage for stage in stage_order if self.is_stage_evaluated(stage) ]
+
+    def is_stage_evaluated(self, stage):
+        return all(key in self.evaluated_coefficients for key in stage_keys(stage, self.dimension_count))
+
+    def run_stage(self, stage):
+        """
+        Description
+        ===========
+        Computes and stores every coefficient of a single pipeline stage. Upstream coefficients which are missing are computed on demand by the getters.
+        """
+
+        if(stage == "connection_udd"):
+            self.set_all_connection_coefficients("udd")
+        elif(stage == "connection_ddd"):
+            self.set_all_connection_coefficients("ddd")
+        elif(stage == "riemann_dddd"):
+            self.set_all_riemann_coefficients("dddd")
+        elif(stage == "riemann_uddd"):
+            self.set_all_riemann_coefficients("uddd")
+        elif(stage == "ricci_dd"):
+            self.set_all_ricci_coefficients("dd")
+        elif(stage == "ricci_scalar"):
+            self.set_ricci_scalar()
+        elif(stage == "einstein_dd"):
+            self.set_all_einstein_coefficients("dd")
+        elif(stage == "stress_energy_dd"):
+            self.set_all_stress_energy_coefficients("dd")
+        elif(stage == "schouten_dd"):
+            self.set_all_schouten_coefficients("dd")
+        elif(stage == "weyl_dddd"):
+            self.set_all_weyl_coefficients("dddd")
+        elif(stage == "proper_time_geodesic_acceleration"):
+            self.set_all_proper_time_geodesic_accelerations()
+        elif(stage == "coordinate_time_geodesic_acceleration"):
+            self.set_all_coordinate_time_geodesic_accelerations()
+        elif(stage == "geodesic_deviation_acceleration"):
+            self.set_all_geodesic_deviation_accelerations()
+        else:
+            raise ValueError("Invalid pipeline stage %r." % stage)
+
+    """
+    Shared expression functions
+    ===========================
+    """
+
+    def get_shared_tensor(self, stage):
+        """
+        Description
+        ===========
+        Gets the coefficients of a pipeline stage (see compute), or of the metric with "metric_dd" or "metric_uu", as a SharedTensor: a single expression graph in which subexpressions shared between coefficients are stored once. Stages which have not been computed yet are computed first. The shared form is kept until the metric changes.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+        >> einstein = black_hole.get_shared_tensor("einstein_dd")
+        >> einstein.replacements
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        if stage not in self.shared_tensors:
+            if(stage == "metric_dd"):
+                tensor = self.metric_tensor_dd
+            elif(stage == "metric_uu"):
+                tensor = self.metric_tensor_uu
+            else:
+                tensor = self.compute([ stage ])[stage]
+            self.shared_tensors[stage] = SharedTensor(tensor)
+        return self.shared_tensors[stage]
+
+    def numeric(self, tensor_name, params = None):
+        """
+        Description
+        ===========
+        Returns a vectorized NumPy function of the coordinates which evaluates every coefficient of a tensor at once (see NumericTensor). The tensor is compiled once from its shared form (see get_shared_tensor) into a single kernel, which is kept until the metric changes. params binds the values of the remaining symbols, keyed by symbol or by name, as scalars or broadcastable arrays. Accepts the same tensor names as get_shared_tensor.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+        >> riemann = black_hole.numeric("riemann_uddd", params={ "G": 1, "M": 1, "c": 1 })
+        >> r, theta = np.meshgrid(np.linspace(3, 10, 1000), np.linspace(0.1, 3, 1000))
+        >> riemann(0, r, theta, 0).shape
+        (1000, 1000, 4, 4, 4, 4)
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        if tensor_name not in self.numeric_tensors:
+            self.numeric_tensors[tensor_name] = NumericTensor(self.get_shared_tensor(tensor_name), self.coordinate_set)
+        kernel = self.numeric_tensors[tensor_name]
+        return lambda *coordinates: kernel(*coordinates, params = params)
+
+    """
+    Geodesic integration functions
+    ==============================
+    """
+
+    def get_geodesic_equations(self):
+        """
+        Description
+        ===========
+        Gets the geodesic equation compiled into numeric first order right hand sides (see GeodesicEquations). The connection is computed first if needed, and the compiled equations are kept until the metric changes.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> black_hole.get_geodesic_equations().parameters
+        [G, M, c]
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        if self.geodesic_equations is None:
+            connection = self.compute([ "connection_udd" ])["connection_udd"]
+            self.geodesic_equations = GeodesicEquations(connection, self.metric_tensor_dd, self.coordinate_set)
+        return self.geodesic_equations
+
+    def integrate_geodesic(self, x0, u0, tau_span, params = None, events = None, rtol = 1e-9, atol = 1e-12, first_step = None, max_step = np.inf, max_steps = 10**6):
+        """
+        Description
+        ===========
+        Integrates the geodesic through the position x0 with velocity u0 = dx/dtau over tau_span = (tau_start, tau_end) with adaptive Dormand-Prince Runge-Kutta (see integrate_geodesic in geodesics). params binds the remaining symbols of the metric by symbol or by name. events lists GeodesicEvent objects to stop at or record, such as horizon_event. Returns a Geodesic with the affine parameter, positions, velocities and the norm constraint g_{mu nu} u^mu u^nu at every accepted step.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> orbit = black_hole.integrate_geodesic([ 0, 10, np.pi/2, 0 ], [ 1.2, 0, 0, 0.035 ], (0, 1000), params={ "G": 1, "M": 1, "c": 1 })
+        >> orbit.positions[-1], orbit.norm[-1] - orbit.norm[0]
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        return integrate_geodesic(self.get_geodesic_equations(), x0, u0, tau_span, params, events, rtol, atol, first_step, max_step, max_steps)
+
+    def integrate_geodesics(self, x0, u0, tau_span, params = None, tau_eval = None, events = None, rtol = 1e-9, atol = 1e-12, first_step = None, max_step = np.inf, max_steps = 10**6):
+        """
+        Description
+        ===========
+        Integrates a batch of geodesics through the positions x0 with velocities u0, both of shape (N, n), over a common tau_span (see integrate_geodesics in geodesics). Every Runge-Kutta stage evaluates all running geodesics in one NumPy call, while each geodesic keeps its own adaptive step size. params values may be scalars or arrays of shape (N,); tau_eval optionally lists affine parameter values at which every geodesic is sampled, and events lists GeodesicEvent objects to stop at or record. Returns a GeodesicBatch.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> batch = black_hole.integrate_geodesics(x0, u0, (0, 1000), params={ "G": 1, "M": 1, "c": 1 })
+        >> batch.positions.shape, batch.status
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        return integrate_geodesics(self.get_geodesic_equations(), x0, u0, tau_span, params, tau_eval, events, rtol, atol, first_step, max_step, max_steps)
+
+    def get_hamiltonian_equations(self):
+        """
+        Description
+        ===========
+        Gets Hamilton's equations of the geodesic Hamiltonian H = g^{mu nu} p_mu p_nu/2 compiled from the inverse metric (see HamiltonianEquations). The compiled equations are kept until the metric changes.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> black_hole.get_hamiltonian_equations().parameters
+        [G, M, c]
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        if self.hamiltonian_equations is None:
+            self.hamiltonian_equations = HamiltonianEquations(self.metric_tensor_uu, self.coordinate_set)
+        return self.hamiltonian_equations
+
+    def integrate_hamiltonian(self, x0, u0, tau_span, step, params = None, order = 4, save_every = 1, tol = 1e-14, max_iterations = 50):
+        """
+        Description
+        ===========
+        Integrates the geodesic through x0 with velocity u0, or a batch of them with shape (N, n), in Hamiltonian form with a symplectic Gauss-Legendre method of order 2 (implicit midpoint), 4 or 6 and fixed steps no longer than step (see integrate_hamiltonian in geodesics). The velocities are lowered to the covariant momenta p_mu = g_{mu nu} u^nu at x0. The Hamiltonian and the norm stay bounded instead of drifting, so long orbit runs can take large steps; save_every keeps every save_every-th step only. Returns a HamiltonianGeodesic.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> orbit = black_hole.integrate_hamiltonian([ 0, 10, np.pi/2, 0 ], [ 1.2, 0, 0, 0.035 ], (0, 1e6), 5.0, params={ "G": 1, "M": 1, "c": 1 }, save_every=1000)
+        >> orbit.norm.min(), orbit.norm.max()
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        x0 = np.asarray(x0, dtype = float)
+        u0 = np.asarray(u0, dtype = float)
+        metric = self.numeric("metric_dd", params)(*np.moveaxis(x0, -1, 0))
+        p0 = np.einsum("...ij,...j->...i", metric, u0)
+        return integrate_hamiltonian(self.get_hamiltonian_equations(), x0, p0, tau_span, step, params, order, save_every, tol, max_iterations)
+
+    def horizon_radius(self, params = None, radial_index = 1):
+        """
+        Description
+        ===========
+        Returns the outermost horizon radius: the largest positive real root of the radial coefficient g^{rr} of the inverse metric, with params binding the remaining symbols by symbol or by name. Raises ValueError when the metric has no horizon.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> black_hole.horizon_radius({ "G": 1, "M": 1, "c": 1 })
+        2.0
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        radius = self.coordinate_set[radial_index]
+        substitutions = { (key if isinstance(key, Symbol) else Symbol(str(key))): value for key, value in (params or {}).items() }
+        numerator = fraction(together(self.metric_tensor_uu[radial_index, radial_index].subs(substitutions)))[0]
+        if numerator.free_symbols - { radius }:
+            raise ValueError("Missing numeric values for %s." % ", ".join(sorted(str(symbol) for symbol in numerator.free_symbols - { radius })))
+        roots = [ complex(root) for root in Poly(numerator, radius).nroots() ] if numerator.is_polynomial(radius) else [ complex(root) for root in solve(numerator, radius) ]
+        roots = [ root.real for root in roots if abs(root.imag) < 1e-12 and root.real > 0 ]
+        if len(roots) == 0:
+            raise ValueError("The metric has no horizon in %s." % radius)
+        return max(roots)
+
+    def horizon_event(self, params = None, margin = 0.01, radial_index = 1):
+        """
+        Description
+        ===========
+        Returns a terminal geodesic event which stops geodesics at (1 + margin) times the outermost horizon radius of the metric (see horizon_radius and horizon_event in geodesics).
+
+        Example
+        =======
+        >> black_hole.integrate_geodesics(x0, u0, (0, 1000), params, events=[ black_hole.horizon_event(params), escape_event(50) ])
+        """
+
+        return horizon_event(self.horizon_radius(params, radial_index), margin, radial_index)
+
+    def render_shadow(self, camera, width, height, fov, params = None, escape_radius = None, margin = 0.01, tau_end = None, workers = None, tile_size = 32, rtol = 1e-8, atol = 1e-10):
+        """
+        Description
+        ===========
+        Renders the shadow and the lensed sky seen by a static camera at camera = (r, theta, phi) with a horizontal field of view fov (see render_shadow in rendering). One null geodesic per pixel is traced backwards until it is captured by the outer horizon (see horizon_radius) or escapes beyond escape_radius. The image is traced in tiles of tile_size x tile_size pixels, on a process pool of the given number of workers writing into shared memory. Returns a ShadowImage with the classification and the final sky angles of every pixel.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> image = black_hole.render_shadow((30, np.pi/2, 0), 1024, 1024, np.pi/4, params={ "G": 1, "M": 1, "c": 1 }, workers=16)
+        >> plt.imsave("shadow.png", image.rgb())
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        metric = self.numeric("metric_dd", params)(0, *camera)
+        return render_shadow(self.get_geodesic_equations(), camera, metric, self.horizon_radius(params), width, height, fov, params, escape_radius, margin, tau_end, workers, tile_size, rtol, atol)
+
+    """
+    Incremental update functions
+    ============================
+    """
+
+    def update_dependent_coefficients(self, changed_metric_dd, changed_metric_uu = None):
+        """
+        Description
+        ===========
+        Brings the object up to date after metric coefficients have been changed in place, given as lists of (mu, nu) pairs. The inverse metric is updated block by block for covariant changes, and the coefficients which depend on a changed metric coefficient (see affected_coefficients) are dropped from evaluated_coefficients together with their cached derivatives. Eager objects recompute them at once, in pipeline order; lazy objects recompute them on first access. Coefficients which were never computed are left alone. Returns the keys of the dropped coefficients.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+        >> black_hole.metric_tensor_dd[1, 1] = -1/(1 - 2*G*M/(c**2*r))**2
+        >> black_hole.update_dependent_coefficients([ (1, 1) ])
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        previous_index = self.dependency_index
+        changed_metric_uu = list(changed_metric_uu or [])
+        self.shared_tensors = {}
+        self.numeric_tensors = {}
+        self.grid_kernels = {}
+        self.geodesic_equations = None
+        self.hamiltonian_equations = None
+        if len(changed_metric_dd) > 0:
+            previous_inverse = self.metric_tensor_uu
+            coordinates = sorted(set(index for pair in changed_metric_dd for index in pair))
+            simplify_metric = lambda expression: self.simplify_coefficient("metric", expression)
+            self.metric_tensor_uu = update_inverse_metric(self.metric_tensor_dd, self.metric_tensor_uu, coordinates, simplify_metric, simplify_metric)
+            self.metric_determinant = None
+            changed_metric_uu = changed_metric_uu + [ (mu, nu) for mu in self.dimensions for nu in self.dimensions if self.metric_tensor_uu[mu, nu] != previous_inverse[mu, nu] ]
+        self.dependency_index = DependencyIndex(self.metric_tensor_dd, self.metric_tensor_uu, self.coordinate_set)
+        affected = affected_coefficients(previous_index, self.dependency_index, changed_metric_dd, changed_metric_uu)
+        self.clear_derivative_cache(changed_metric_dd, affected)
+        stale = [ key for key in self.evaluated_coefficients if key in affected ]
+        self.evaluated_coefficients.difference_update(stale)
+        if(self.lazy == False):
+            self.recompute_coefficients(stale)
+        return stale
+
+    def recompute_coefficients(self, keys):
+        """
+        Description
+        ===========
+        Recomputes and stores the coefficients with the given keys (as in evaluated_coefficients), stage by stage in pipeline order so every coefficient is built from already updated upstream coefficients.
+
+        Example
+        =======
+        >> black_hole.recompute_coefficients([ ("ricci", "dd", 1, 1), ("ricci_scalar", "") ])
+        """
+
+        for stage in stage_order:
+            tensor, index_config, rank = stage_coefficients[stage]
+            index_list = sorted(key[2:] for key in keys if key[:2] == (tensor, index_config))
+            if len(index_list) == 0:
+                continue
+            if(tensor == "connection" and index_config == "udd"):
+                for indices in index_list:
+                    self.set_connection_coefficient(index_config, *indices, self.compute_connection_coefficient(index_config, *indices))
+            elif(tensor == "connection"):
+                for indices, expression in zip(index_list, self.compute_coefficients("connection", self.compute_connection_coefficient, index_config, index_list)):
+                    self.set_connection_coefficient(index_config, *indices, expression)
+            elif(tensor == "riemann"):
+                self.set_independent_riemann_coefficients(index_config, index_list)
+            elif(tensor == "ricci"):
+                for indices, expression in zip(index_list, self.compute_coefficients("ricci", self.compute_ricci_coefficient, index_config, index_list)):
+                    self.set_ricci_coefficient(index_config, *indices, expression)
+            elif(tensor == "schouten"):
+                for indices in index_list:
+                    self.set_schouten_coefficient(index_config, *indices, self.compute_schouten_coefficient(index_config, *indices))
+            elif(tensor == "ricci_scalar"):
+                self.ricci_scalar = self.compute_ricci_scalar()
+                self.mark_evaluated("ricci_scalar", "")
+            elif(tensor == "einstein"):
+                for indices, expression in zip(index_list, self.compute_coefficients("einstein", self.compute_einstein_coefficient, index_config, index_list)):
+                    self.set_einstein_coefficient(index_config, *indices, expression)
+            elif(tensor == "stress_energy"):
+                for indices, expression in zip(index_list, self.compute_coefficients("stress_energy", self.compute_stress_energy_coefficient, index_config, index_list)):
+                    self.set_stress_energy_coefficient(index_config, *indices, expression)
+            elif(tensor == "weyl"):
+                for indices, expression in zip(index_list, self.compute_coefficients("weyl", self.compute_weyl_coefficient, index_config, index_list)):
+                    self.set_weyl_coefficient(index_config, *indices, expression)
+            elif(tensor == "proper_time_geodesic_acceleration"):
+                for (lam,) in index_list:
+                    self.set_proper_time_geodesic_acceleration(lam, self.compute_proper_time_geodesic_acceleration(lam))
+            elif(tensor == "coordinate_time_geodesic_acceleration"):
+                for (lam,) in index_list:
+                    self.set_coordinate_time_geodesic_acceleration(lam, self.compute_coordinate_time_geodesic_acceleration(lam))
+            elif(tensor == "geodesic_deviation_acceleration"):
+                for (lam,) in index_list:
+                    self.set_geodesic_deviation_acceleration(lam, self.compute_geodesic_deviation_acceleration(lam))
+
+    """
+    Stage evaluation functions
+    ==========================
+    """
+
+    def compute_coefficients(self, stage, compute, index_config, index_list):
+        """
+        Description
+        ===========
+        Computes the coefficients of a pipeline stage for every index set in index_list. The unsimplified coefficients are built first and then simplified through the executor according to the simplification policy of the stage, so with workers > 1 the simplification runs in parallel. Only the simplification is parallel: building the unsimplified coefficients reads the coefficients stored on this object, so it runs serially in this process. Returns the coefficients in the order of index_list.
+
+        Example
+        =======
+        >> newtonian = SpaceTime(Solution().weak_field_approximation(), True, workers=4)
+        >> newtonian.compute_coefficients("ricci", newtonian.compute_ricci_coefficient, "dd", [ (0, 0), (1, 1) ])
+        [0, 0]
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        expressions = [ compute(index_config, *indices, simplified = False) for indices in index_list ]
+        # Coefficients which were built as an exact zero are not sent through the simplifier.
+        nonzero = [ position for position, expression in enumerate(expressions) if expression != 0 ]
+        coefficients = list(expressions)
+        for position, (expression, exceeded) in zip(nonzero, self.executor.map(self.simplification_policy.budgeted_simplifier(stage), [ expressions[position] for position in nonzero ])):
+            if exceeded:
+                self.budget_exceeded.append((stage, index_config) + tuple(index_list[position]))
+            coefficients[position] = expression
+        return coefficients
+
+    def simplify_coefficient(self, stage, expression, *key):
+        """
+        Description
+        ===========
+        Simplifies a single coefficient according to the simplification policy of its pipeline stage. When the coefficient exceeds the budget of the policy, the fallback form is returned and (stage, *key) is appended to budget_exceeded.
+
+        Example
+        =======
+        >> newtonian = SpaceTime(Solution().weak_field_approximation(), True, simplification="canonical")
+        >> newtonian.simplify_coefficient("ricci", newtonian.compute_ricci_coefficient("dd", 0, 0, simplified=False), "dd", 0, 0)
+        0
+        """
+
+        expression, exceeded = self.simplification_policy.budgeted_simplifier(stage)(expression)
+        if exceeded:
+            self.budget_exceeded.append((stage,) + key)
+        return expression
+
+    """
+    Derivative functions
+    ====================
+    """
+
+    def get_metric_derivative(self, mu, nu, a):
+        r"""
+        Description
+        ===========
+        Gets the partial derivative of a single covariant metric coefficient with respect to a coordinate. Each derivative is differentiated once and kept in the derivative cache, which the connection, Riemann and geodesic stages share.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> black_hole.get_metric_derivative(0, 0, 1)
+        -2*G*M/(c**2*r**2)
+
+        LaTeX representation
+        ====================
+        \partial_{a} g_{\mu\nu}
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        if self.dependency_index.is_derivative_zero(mu, nu, a):
+            return 0
+        key = ("metric", mu, nu, a)
+        if key not in self.derivative_cache:
+            self.derivative_cache[key] = diff(self.metric_tensor_dd[mu, nu], self.coordinate_set[a])
+        return self.derivative_cache[key]
+
+    def get_metric_second_derivative(self, mu, nu, a, b):
+        r"""
+        Description
+        ===========
+        Gets the second partial derivative of a single covariant metric coefficient. Partial derivatives commute, so (a, b) and (b, a) share a cache entry, and the first derivative is taken from the cache as well.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> black_hole.get_metric_second_derivative(0, 0, 1, 1)
+        4*G*M/(c**2*r**3)
+
+        LaTeX representation
+        ====================
+        \partial_{a}\partial_{b} g_{\mu\nu}
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        if self.dependency_index.is_derivative_zero(mu, nu, a, b):
+            return 0
+        a, b = min(a, b), max(a, b)
+        key = ("metric", mu, nu, a, b)
+        if key not in self.derivative_cache:
+            self.derivative_cache[key] = diff(self.get_metric_derivative(mu, nu, a), self.coordinate_set[b])
+        return self.derivative_cache[key]
+
+    def get_connection_derivative(self, i, k, l, a):
+        r"""
+        Description
+        ===========
+        Gets the partial derivative of a single connection coefficient (udd) with respect to a coordinate. The connection is symmetric in its lower indices, so (k, l) and (l, k) share a cache entry.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> black_hole.get_connection_derivative(1, 0, 0, 1)
+
+        LaTeX representation
+        ====================
+        \partial_{a} \Gamma^{i}_{kl}
+
+        TODOs
+        =====
+        - Link example with test.
+        """
 
-        # Declares the contravariant Schouten tensor class object.
-        self.schouten_tensor_uu = Matrix([
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ]
-                                            ])
+        if self.dependency_index.is_connection_derivative_zero(i, k, l, a):
+            return 0
+        k, l = min(k, l), max(k, l)
+        key = ("connection", i, k, l, a)
+        if key not in self.derivative_cache:
+            self.derivative_cache[key] = diff(self.get_connection_coefficient("udd", i, k, l), self.coordinate_set[a])
+        return self.derivative_cache[key]
 
-        # Declares the covariant Schouten tensor class object.
-        self.schouten_tensor_dd = Matrix([
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ], 
-                                                [ 0, 0, 0, 0 ]
-                                            ])
+    def get_volume_derivative(self, mu, nu = None):
+        r"""
+        Description
+        ===========
+        Gets the first (or with nu given, second) partial derivative of the logarithm of the volume element. For a diagonal metric the first derivative has the closed form sum_i d_mu g_ii/(2 g_ii); for any other metric it is taken from the determinant kept with the inverse metric. Both are kept in the derivative cache.
 
-        # Declares cosmological constant class object.
-        self.cosmological_constant = 0
-        
-        # Acceleration vectors.
-        self.proper_acceleration = [ 0, 0, 0, 0 ]
-        self.coordinate_acceleration = [ 0, 0, 0, 0 ]
-        self.geodesic_deviation_acceleration = [ 0, 0, 0, 0 ]
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> black_hole.get_volume_derivative(2)
+        cos(theta)/sin(theta)
 
-        # Velocity vectors.
-        self.proper_velocity = [ 0, 0, 0, 0 ]
-        self.coordinate_velocity = [ 0, 0, 0, 0 ]
-        self.geodesic_velocity= [ 0, 0, 0, 0 ]
+        LaTeX representation
+        ====================
+        \partial_{\mu} \ln\sqrt{|g|} = \frac{\partial_{\mu} g}{2 g}
+        \partial_{\mu} \ln\sqrt{|g|} = \sum_{i} \frac{\partial_{\mu} g_{ii}}{2 g_{ii}}
 
-        # Position vectors.
-        self.proper_position = [ 0, 0, 0, 0 ]
-        self.coordinate_position = [ 0, 0, 0, 0 ]
-        self.geodesic_deviation_position = [ 0, 0, 0, 0 ]
+        URL Reference
+        =============
+        https://en.wikipedia.org/wiki/Christoffel_symbols#Contractions
 
+        TODOs
+        =====
+        - Link example with test.
         """
-        Initializing object functions
-        =============================
+
+        if nu is not None:
+            key = ("volume", mu, nu)
+            if key not in self.derivative_cache:
+                self.derivative_cache[key] = diff(self.get_volume_derivative(mu), self.coordinate_set[nu])
+            return self.derivative_cache[key]
+        key = ("volume", mu)
+        if key not in self.derivative_cache:
+            volume_derivative = 0
+            if(self.is_diagonal() == True):
+                for lam in self.dimensions:
+                    volume_derivative = volume_derivative + self.get_metric_derivative(lam, lam, mu)/(2*self.metric_tensor_dd[lam, lam])
+            else:
+                volume_derivative = diff(self.get_metric_determinant(), self.coordinate_set[mu])/(2*self.get_metric_determinant())
+            self.derivative_cache[key] = volume_derivative
+        return self.derivative_cache[key]
+
+    def clear_derivative_cache(self, changed_metric_dd = None, affected = None):
         """
+        Description
+        ===========
+        Drops cached derivatives which depend on metric coefficients that have changed. With no arguments the whole cache is dropped. Otherwise the derivatives of the changed covariant coefficients (index pairs), the derivatives of the connection coefficients listed in affected (keys as in evaluated_coefficients) and every volume element derivative are dropped.
 
-        # TODO
-        # finish all of these functions.
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+        >> black_hole.clear_derivative_cache([ (0, 0) ], set())
+        """
+
+        if changed_metric_dd is None:
+            self.derivative_cache = {}
+            return
+        changed_metric_dd = set(frozenset(pair) for pair in changed_metric_dd)
+        retained = {}
+        for key, value in self.derivative_cache.items():
+            if key[0] == "metric" and frozenset(key[1:3]) not in changed_metric_dd:
+                retained[key] = value
+            elif key[0] == "connection" and ("connection", "udd") + key[1:4] not in affected:
+                retained[key] = value
+        self.derivative_cache = retained
 
-        self.set_all_metric_coefficients("dd")
-        #self.set_all_metric_coefficients("uu")
-        self.set_all_connection_coefficients("udd")
-        #self.set_all_connection_coefficients("ddd")
-        self.set_all_riemann_coefficients("uddd")
-        #self.set_all_riemann_coefficients("dddd")
-        self.set_all_ricci_coefficients("dd")
-        #self.set_all_weyl_coefficients("dddd")
-        #self.set_all_weyl_coefficients("uddd")
-        self.set_all_schouten_coefficients("dd")
-        #self.set_all_cotton_coefficients("ddd")
-        #self.set_all_ricci_coefficients("uu")
-        #self.set_all_ricci_coefficients("ud")
-        self.set_ricci_scalar()
-        self.set_all_einstein_coefficients("dd")
-        #self.set_all_einstein_coefficients("uu")
-        #self.set_all_einstein_coefficients("ud")
-        self.set_all_stress_energy_coefficients("dd")
-        #self.set_all_stress_energy_coefficients("uu")
-        #self.set_all_stress_energy_coefficients("ud")
-        #self.set_cosmological_constant(solution[3])
-        self.set_all_proper_time_geodesic_accelerations()
-        self.set_all_coordinate_time_geodesic_accelerations()
-        self.set_all_geodesic_deviation_accelerations()
-        
     """
     Metric coefficient functions
     ============================
@@ -868,8 +970,8 @@ class SpaceTime:
         """
         Description
         ===========
-        Sets a single metric coefficient equal to a given expression.
-        WARNING: This function is used for memory managment purposes and is not reccomended. for regular use since it can easily create contradictions within a solution easily. This may have more uses in the future.
+        Sets a single metric coefficient, and its mirror across the diagonal, equal to a given expression. Every coefficient computed so far which depends on it is updated (see update_dependent_coefficients): for covariant coefficients the inverse metric is updated first, and lazy objects drop the stale coefficients so they are recomputed on first access.
+        WARNING: Setting a contravariant coefficient does not update the covariant metric, so it can easily create contradictions within a solution.
         
         Example
         =======
@@ -893,12 +995,86 @@ class SpaceTime:
 
         if (index_config == "uu"):
             self.metric_tensor_uu[mu,nu] = expression
+            self.metric_tensor_uu[nu,mu] = expression
+            self.update_dependent_coefficients([], [ (mu, nu) ])
         elif(index_config == "dd"):
             self.metric_tensor_dd[mu,nu] = expression
+            self.metric_tensor_dd[nu,mu] = expression
+            self.metric_determinant = None
+            self.update_dependent_coefficients([ (mu, nu) ])
         else:
             print("Invalid index_config string.")
             
             
+    def compute_inverse_metric(self, metric):
+        r"""
+        Description
+        ===========
+        Computes the inverse of a metric solution and the determinant of the solution. The metric is split into its diagonal, block diagonal or permuted blocks (see inverse_metric) and each block is inverted with the adjugate/determinant formula, so a diagonal metric gives the reciprocal diagonal. The block determinants and the coefficients are simplified according to the metric stage of the simplification policy.
+
+        Example
+        =======
+        >> newtonian = SpaceTime(Solution().weak_field_approximation(), True)
+        >> inverse, determinant = newtonian.compute_inverse_metric(newtonian.metric_tensor_dd)
+        >> inverse == newtonian.metric_tensor_uu
+        True
+
+        LaTeX representation
+        ====================
+        g^{ij} g_{jk} = \delta^{i}_{k}
+
+        URL Reference
+        =============
+        https://en.wikipedia.org/wiki/Metric_tensor
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        simplify_metric = lambda expression: self.simplify_coefficient("metric", expression)
+        return inverse_metric(metric, simplify_metric, simplify_metric)
+
+    def get_metric_determinant(self):
+        r"""
+        Description
+        ===========
+        Gets the determinant of the covariant metric. It is computed with the inverse at creation and recomputed on first use after set_metric_coefficient.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+        >> black_hole.get_metric_determinant()
+        -c**2*r**4*sin(theta)**2
+
+        LaTeX representation
+        ====================
+        g = \det g_{ij}
+
+        URL Reference
+        =============
+        https://en.wikipedia.org/wiki/Metric_tensor
+        """
+
+        if self.metric_determinant is None:
+            self.metric_determinant = metric_determinant(self.metric_tensor_dd, lambda expression: self.simplify_coefficient("metric", expression))
+        return self.metric_determinant
+
+    def is_diagonal(self):
+        """
+        Description
+        ===========
+        Returns whether the covariant metric is diagonal. The connection, Ricci and Ricci scalar stages of diagonal metrics use closed forms in terms of the diagonal coefficients.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True)
+        >> black_hole.is_diagonal()
+        True
+        """
+
+        return self.dependency_index.diagonal
+
     def set_all_metric_coefficients(self, index_config):
         """
         Description
@@ -1049,10 +1225,13 @@ class SpaceTime:
         - Need higher quality tests.
         """
 
+        if(index_config == "udd" or index_config == "ddd"):
+            if(self.is_evaluated("connection", index_config, i, k, l) == False):
+                self.set_symmetric_connection_coefficient(index_config, i, k, l, self.compute_connection_coefficient(index_config, i, k, l))
         if(index_config == "udd"):
-            return self.christoffel_symbols_udd[i,k][l]
+            return self.christoffel_symbols_udd[i, k, l]
         elif(index_config == "ddd"):
-            return self.christoffel_symbols_ddd[i,k][l]
+            return self.christoffel_symbols_ddd[i, k, l]
         else:
             print("Invalid index_config string.")     
         
@@ -1084,12 +1263,43 @@ class SpaceTime:
         """
 
         if(index_config == "udd"):
-            self.christoffel_symbols_udd[i,k][l] = expression
+            self.christoffel_symbols_udd[i, k, l] = expression
+            self.mark_evaluated("connection", index_config, i, k, l)
         elif(index_config == "ddd"):
-            self.christoffel_symbols_ddd[i,k][l] = expression
+            self.christoffel_symbols_ddd[i, k, l] = expression
+            self.mark_evaluated("connection", index_config, i, k, l)
         else:
             print("Invalid index_config string.")        
     
+    def set_symmetric_connection_coefficient(self, index_config, i, k, l, expression):
+        r"""
+        Description
+        ===========
+        Sets a connection coefficient and its mirror under exchange of the lower indices to the same expression object. The Levi-Civita connection is torsion free, so only the independent lower index pairs need to be computed.
+
+        Example
+        =======
+        >> newtonian = SpaceTime(Solution().weak_field_approximation(), True)
+        >> newtonian.set_symmetric_connection_coefficient("udd",1,0,1,0) # Sets both Γ¹₀₁ and Γ¹₁₀.
+
+        LaTeX representation
+        ====================
+        \Gamma^{i}_{kl} = \Gamma^{i}_{lk}
+        \Gamma_{ikl} = \Gamma_{ilk}
+
+        URL Reference
+        =============
+        https://en.wikipedia.org/wiki/Christoffel_symbols
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        self.set_connection_coefficient(index_config, i, k, l, expression)
+        if(k != l):
+            self.set_connection_coefficient(index_config, i, l, k, expression)
+
     def set_all_connection_coefficients(self, index_config):
         r"""
         Description
@@ -1126,7 +1336,9 @@ class SpaceTime:
             for i in self.dimensions:
                 for k in self.dimensions:
                     for l in self.dimensions:
-                        self.set_connection_coefficient(index_config, i, k, l, self.compute_connection_coefficient(index_config, i, k, l))
+                        # The connection is symmetric in its lower indices, so only l >= k is computed.
+                        if(l >= k):
+                            self.set_symmetric_connection_coefficient(index_config, i, k, l, self.compute_connection_coefficient(index_config, i, k, l))
                         if(self.suppress_printing == False):
                             self.print_connection_coefficient(index_config, i, k, l )
         elif(index_config == "ddd"):
@@ -1135,16 +1347,16 @@ class SpaceTime:
                 print("")
                 print("Connection coefficients (ddd)")
                 print("=============================")
-            for i in self.dimensions:
-                for k in self.dimensions:
-                    for l in self.dimensions:
-                        self.set_connection_coefficient(index_config, i, k, l, self.compute_connection_coefficient(index_config, i, k, l))
-                        if(self.suppress_printing == False):
-                            self.print_connection_coefficient(index_config, i, k, l )
+            # The connection is symmetric in its lower indices, so only l >= k is computed.
+            index_list = [ (i, k, l) for i in self.dimensions for k in self.dimensions for l in self.dimensions if l >= k ]
+            for (i, k, l), expression in zip(index_list, self.compute_coefficients("connection", self.compute_connection_coefficient, index_config, index_list)):
+                self.set_symmetric_connection_coefficient(index_config, i, k, l, expression)
+            if(self.suppress_printing == False):
+                self.print_all_connection_coefficients(index_config)
         else:
             print("Invalid index_config string.")
 
-    def compute_connection_coefficient(self, index_config, i, k, l):
+    def compute_connection_coefficient(self, index_config, i, k, l, simplified = True):
         r"""
         Description
         ===========
@@ -1171,13 +1383,28 @@ class SpaceTime:
         """
 
         connection = 0
-        if index_config == "udd":
+        if(self.dependency_index.is_connection_zero(index_config, i, k, l) == True):
+            return connection
+        if index_config == "udd" and self.is_diagonal() == True:
+            # Closed form, non-zero only when two of the indices are equal.
+            if(i == k):
+                connection = connection + self.get_metric_derivative(i, i, l)
+            if(i == l):
+                connection = connection + self.get_metric_derivative(i, i, k)
+            if(k == l):
+                connection = connection - self.get_metric_derivative(k, k, i)
+            return connection/(2*self.metric_tensor_dd[i, i])
+        elif index_config == "udd":
             for m in self.dimensions:
-                connection = connection+Rational('1/2')*self.metric_tensor_uu[m,i]*(diff(self.metric_tensor_dd[k,m], self.coordinate_set[l])+diff(self.metric_tensor_dd[l,m], self.coordinate_set[k])-diff(self.metric_tensor_dd[k,l], self.coordinate_set[m]))
+                if(self.dependency_index.is_metric_zero("uu", m, i) == True):
+                    continue
+                connection = connection+Rational('1/2')*self.metric_tensor_uu[m,i]*(self.get_metric_derivative(k, m, l)+self.get_metric_derivative(l, m, k)-self.get_metric_derivative(k, l, m))
             return connection
         elif index_config == "ddd":
-            connection = Rational('1/2')*(diff(self.metric_tensor_dd[i,k], self.coordinate_set[l])+diff(self.metric_tensor_dd[i,l], self.coordinate_set[k])-diff(self.metric_tensor_dd[k,l], self.coordinate_set[i]))
-            return simplify(connection)
+            connection = Rational('1/2')*(self.get_metric_derivative(i, k, l)+self.get_metric_derivative(i, l, k)-self.get_metric_derivative(k, l, i))
+            if(simplified == True):
+                connection = self.simplify_coefficient("connection", connection, index_config, i, k, l)
+            return connection
         else:
             print("Invalid index_config string.")
     
@@ -1302,10 +1529,13 @@ class SpaceTime:
         - Needs functionality for other index configurations.
         """
 
+        if(index_config == "uddd" or index_config == "dddd"):
+            if(self.is_evaluated("riemann", index_config, rho, sig, mu, nu) == False):
+                self.set_riemann_coefficient(index_config, rho, sig, mu, nu, self.compute_independent_riemann_coefficient(index_config, rho, sig, mu, nu))
         if(index_config == "uddd"):
-            return self.riemann_tensor_uddd[int(rho*16/self.dimension_count+sig)][mu][nu]
+            return self.riemann_tensor_uddd[rho, sig, mu, nu]
         elif(index_config == "dddd"):
-            return self.riemann_tensor_dddd[int(rho*16/self.dimension_count+sig)][mu][nu]
+            return self.riemann_tensor_dddd[rho, sig, mu, nu]
         else:
             print("Invalid index_config string.")  
     
@@ -1339,11 +1569,13 @@ class SpaceTime:
         """
 
         if(index_config == "uddd"):
-            self.riemann_tensor_uddd[int(rho*16/self.dimension_count+sig)][mu][nu] = expression
+            self.riemann_tensor_uddd[rho, sig, mu, nu] = expression
+            self.mark_evaluated("riemann", index_config, rho, sig, mu, nu)
         elif(index_config == "dddd"):
             # TODO
             # MUST TEST
-            self.riemann_tensor_dddd[int(rho*16/self.dimension_count+sig)][mu][nu] = expression
+            self.riemann_tensor_dddd[rho, sig, mu, nu] = expression
+            self.mark_evaluated("riemann", index_config, rho, sig, mu, nu)
         else:
             print("Invalid index_config string.")        
     
@@ -1382,32 +1614,114 @@ class SpaceTime:
                 print("")
                 print("Riemann curvature tensor coefficients (uddd)")
                 print("============================================")
-            for rho in self.dimensions:
-                for sig in self.dimensions:
-                    for mu in self.dimensions:
-                        for nu in self.dimensions:
-                            self.set_riemann_coefficient(index_config, rho, sig, mu, nu, self.compute_riemann_coefficient(index_config, rho, sig, mu, nu))
-                            if(self.suppress_printing == False):
-                                self.print_riemann_coefficient(index_config, rho, sig, mu, nu)
+            # The mixed coefficients are raised from the independent covariant coefficients.
+            if(self.is_stage_evaluated("riemann_dddd") == False):
+                self.set_independent_riemann_coefficients("dddd")
+            self.set_independent_riemann_coefficients(index_config)
+            if(self.suppress_printing == False):
+                self.print_all_riemann_coefficients(index_config)
         elif index_config == "dddd":
             if(self.suppress_printing == False):
                 print("")
                 print("")
                 print("Riemann curvature tensor coefficients (dddd)")
                 print("============================================")
-            for rho in self.dimensions:
-                for sig in self.dimensions:
-                    for mu in self.dimensions:
-                        for nu in self.dimensions:
-                            # TODO
-                            # MUST TEST
-                            self.set_riemann_coefficient(index_config, rho, sig, mu, nu, self.compute_riemann_coefficient(index_config, rho, sig, mu, nu))
-                            if(self.suppress_printing == False):
-                                self.print_riemann_coefficient(index_config, rho, sig, mu, nu)
+            self.set_independent_riemann_coefficients(index_config)
+            if(self.suppress_printing == False):
+                self.print_all_riemann_coefficients(index_config)
         else:
             print("Invalid index_config string.")
     
-    def compute_riemann_coefficient(self, index_config, rho, sig, mu, nu):
+    def set_independent_riemann_coefficients(self, index_config, index_list = None):
+        """
+        Description
+        ===========
+        Computes and simplifies only the algebraically independent Riemann coefficients of a given index configuration and fills every other coefficient from them by the Riemann symmetries. In 4D the covariant tensor is reduced from 256 to 20 computed coefficients. With index_list given, only those coefficients are set; the list has to contain the canonical coefficients the others are filled from.
+
+        Example
+        =======
+        >> newtonian = SpaceTime(Solution().weak_field_approximation(), True)
+        >> newtonian.set_independent_riemann_coefficients("dddd")
+
+        LaTeX representation
+        ====================
+        R_{ijkl} = -R_{jikl} = -R_{ijlk} = R_{klij}
+        R_{ijkl} + R_{iklj} + R_{iljk} = 0
+
+        URL Reference
+        =============
+        https://en.wikipedia.org/wiki/Riemann_curvature_tensor#Symmetries_and_identities
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        if index_list is None:
+            index_list = [ (rho, sig, mu, nu) for rho in self.dimensions for sig in self.dimensions for mu in self.dimensions for nu in self.dimensions ]
+        selected_indices = set(index_list)
+        independent_indices = [ indices for indices in independent_riemann_indices(index_config, self.dimension_count) if indices in selected_indices ]
+        for indices, expression in zip(independent_indices, self.compute_coefficients("riemann", self.compute_independent_riemann_coefficient, index_config, independent_indices)):
+            self.set_riemann_coefficient(index_config, *indices, expression)
+        dependent_indices = [ indices for indices in index_list if indices not in independent_indices ]
+        # Coefficients given by the first Bianchi identity are sums which still need simplification. The sum is built once per class, for its ordered index set rho < sig < mu < nu, and every other index set of the class is a sign flip of it, as are the remaining coefficients.
+        combined_indices = [ indices for indices in dependent_indices if len(riemann_symmetry_terms(index_config, *indices)) > 1 ]
+        bianchi_indices = sorted(set(tuple(sorted(indices)) for indices in combined_indices))
+        bianchi_coefficients = dict(zip(bianchi_indices, self.compute_coefficients("riemann", self.compute_independent_riemann_coefficient, index_config, bianchi_indices)))
+        for indices in combined_indices:
+            sign = riemann_symmetry_terms(index_config, *indices)[0][0]
+            self.set_riemann_coefficient(index_config, *indices, sign*bianchi_coefficients[tuple(sorted(indices))])
+        for indices in dependent_indices:
+            if indices not in combined_indices:
+                self.set_riemann_coefficient(index_config, *indices, self.compute_independent_riemann_coefficient(index_config, *indices))
+
+    def compute_independent_riemann_coefficient(self, index_config, rho, sig, mu, nu, simplified = True):
+        """
+        Description
+        ===========
+        Computes a single Riemann coefficient from the independent coefficients. Canonical covariant coefficients are computed from the metric, canonical mixed coefficients are raised from the covariant ones, and every other coefficient is a signed combination of stored canonical coefficients.
+
+        Example
+        =======
+        >> newtonian = SpaceTime(Solution().weak_field_approximation(), True)
+        >> print(newtonian.compute_independent_riemann_coefficient("uddd",0,2,2,0))
+        G*M/(c**2*r)
+
+        LaTeX representation
+        ====================
+        R^{i}_{jkl} = g^{im} R_{mjkl}
+        R_{ijkl} = R_{ikjl} - R_{iljk}
+
+        URL Reference
+        =============
+        https://en.wikipedia.org/wiki/Riemann_curvature_tensor#Symmetries_and_identities
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        if(self.dependency_index.is_riemann_zero(index_config, rho, sig, mu, nu) == True):
+            return 0
+        terms = riemann_symmetry_terms(index_config, rho, sig, mu, nu)
+        if terms == [ (1, (rho, sig, mu, nu)) ]:
+            if index_config == "dddd":
+                return self.compute_riemann_coefficient(index_config, rho, sig, mu, nu, simplified)
+            riemann_coefficient = 0
+            for lam in self.dimensions:
+                if self.dependency_index.is_metric_zero("uu", rho, lam) == False and self.dependency_index.is_riemann_zero("dddd", lam, sig, mu, nu) == False:
+                    riemann_coefficient = riemann_coefficient + self.metric_tensor_uu[rho, lam]*self.get_riemann_coefficient("dddd", lam, sig, mu, nu)
+            if(simplified == True):
+                riemann_coefficient = self.simplify_coefficient("riemann", riemann_coefficient, index_config, rho, sig, mu, nu)
+            return riemann_coefficient
+        riemann_coefficient = 0
+        for sign, indices in terms:
+            riemann_coefficient = riemann_coefficient + sign*self.get_riemann_coefficient(index_config, *indices)
+        if len(terms) > 1 and simplified == True:
+            riemann_coefficient = self.simplify_coefficient("riemann", riemann_coefficient, index_config, rho, sig, mu, nu)
+        return riemann_coefficient
+
+    def compute_riemann_coefficient(self, index_config, rho, sig, mu, nu, simplified = True):
         """
         Description
         ===========
@@ -1437,18 +1751,30 @@ class SpaceTime:
         """
 
         riemann_coefficient = 0
+        if((index_config == "uddd" or index_config == "dddd") and self.dependency_index.is_riemann_zero(index_config, rho, sig, mu, nu) == True):
+            return riemann_coefficient
         if index_config == "uddd":
-            riemann_coefficient = diff(self.get_connection_coefficient("udd", rho, nu, sig), self.coordinate_set[mu]) - diff(self.get_connection_coefficient("udd", rho, mu, sig), self.coordinate_set[nu])    
+            riemann_coefficient = self.get_connection_derivative(rho, nu, sig, mu) - self.get_connection_derivative(rho, mu, sig, nu)
             for lam in self.dimensions:
-                riemann_coefficient = riemann_coefficient + self.get_connection_coefficient("udd", rho, mu, lam)*self.get_connection_coefficient("udd", lam, nu, sig) - self.get_connection_coefficient("udd", rho, nu, lam)*self.get_connection_coefficient("udd", lam, mu, sig)
-            riemann_coefficient = simplify(riemann_coefficient)
+                if(self.dependency_index.is_connection_zero("udd", rho, mu, lam) == False and self.dependency_index.is_connection_zero("udd", lam, nu, sig) == False):
+                    riemann_coefficient = riemann_coefficient + self.get_connection_coefficient("udd", rho, mu, lam)*self.get_connection_coefficient("udd", lam, nu, sig)
+                if(self.dependency_index.is_connection_zero("udd", rho, nu, lam) == False and self.dependency_index.is_connection_zero("udd", lam, mu, sig) == False):
+                    riemann_coefficient = riemann_coefficient - self.get_connection_coefficient("udd", rho, nu, lam)*self.get_connection_coefficient("udd", lam, mu, sig)
+            if(simplified == True):
+                riemann_coefficient = self.simplify_coefficient("riemann", riemann_coefficient, index_config, rho, sig, mu, nu)
             return riemann_coefficient
         elif index_config == "dddd":
-            riemann_coefficient = Rational('1/2')*(self.get_metric_coefficient("dd", rho, nu).diff(self.coordinate_set[sig]).diff(self.coordinate_set[mu]) + self.get_metric_coefficient("dd", sig, mu).diff(self.coordinate_set[rho]).diff(self.coordinate_set[nu])-self.get_metric_coefficient("dd", rho, mu).diff(self.coordinate_set[sig]).diff(self.coordinate_set[nu])-self.get_metric_coefficient("dd", sig, nu).diff(self.coordinate_set[rho]).diff(self.coordinate_set[mu]))
+            riemann_coefficient = Rational('1/2')*(self.get_metric_second_derivative(rho, nu, sig, mu) + self.get_metric_second_derivative(sig, mu, rho, nu)-self.get_metric_second_derivative(rho, mu, sig, nu)-self.get_metric_second_derivative(sig, nu, rho, mu))
             for n in self.dimensions:
                 for p in self.dimensions:
-                    riemann_coefficient = riemann_coefficient + self.get_metric_coefficient("dd", n, p)*(self.get_connection_coefficient("udd", n, sig, mu)*self.get_connection_coefficient("udd", p, rho, nu)-self.get_connection_coefficient("udd", n, sig, nu)*self.get_connection_coefficient("udd", p, rho, mu))
-            riemann_coefficient = simplify(riemann_coefficient)
+                    if(self.dependency_index.is_metric_zero("dd", n, p) == True):
+                        continue
+                    if(self.dependency_index.is_connection_zero("udd", n, sig, mu) == False and self.dependency_index.is_connection_zero("udd", p, rho, nu) == False):
+                        riemann_coefficient = riemann_coefficient + self.get_metric_coefficient("dd", n, p)*self.get_connection_coefficient("udd", n, sig, mu)*self.get_connection_coefficient("udd", p, rho, nu)
+                    if(self.dependency_index.is_connection_zero("udd", n, sig, nu) == False and self.dependency_index.is_connection_zero("udd", p, rho, mu) == False):
+                        riemann_coefficient = riemann_coefficient - self.get_metric_coefficient("dd", n, p)*self.get_connection_coefficient("udd", n, sig, nu)*self.get_connection_coefficient("udd", p, rho, mu)
+            if(simplified == True):
+                riemann_coefficient = self.simplify_coefficient("riemann", riemann_coefficient, index_config, rho, sig, mu, nu)
             return riemann_coefficient
         else:
             print("Invalid index_config string.")
@@ -1580,15 +1906,17 @@ class SpaceTime:
         if(index_config == "uddd"):
             # TODO
             # MUST TEST
-            return self.weyl_tensor_uddd[int(i*16/self.dimension_count+k)][l][m]
+            return self.weyl_tensor_uddd[i, k, l, m]
         elif(index_config == "dduu"):
             # TODO
             # MUST TEST
-            return self.weyl_tensor_dduu[int(i*16/self.dimension_count+k)][l][m]
+            return self.weyl_tensor_dduu[i, k, l, m]
         elif(index_config == "dddd"):
             # TODO
             # MUST TEST
-            return self.weyl_tensor_dddd[int(i*16/self.dimension_count+k)][l][m]
+            if(self.is_evaluated("weyl", index_config, i, k, l, m) == False):
+                self.set_weyl_coefficient(index_config, i, k, l, m, self.compute_weyl_coefficient(index_config, i, k, l, m))
+            return self.weyl_tensor_dddd[i, k, l, m]
         else:
             print("Invalid index_config string.") 
     
@@ -1621,15 +1949,18 @@ class SpaceTime:
         if(index_config == "uddd"):
             # TODO
             # MUST TEST
-            self.weyl_tensor_uddd[int(i*16/self.dimension_count+k)][l][m] = expression
+            self.weyl_tensor_uddd[i, k, l, m] = expression
+            self.mark_evaluated("weyl", index_config, i, k, l, m)
         elif(index_config == "dduu"):
             # TODO
             # MUST TEST
-            self.weyl_tensor_dduu[int(i*16/self.dimension_count+k)][l][m] = expression
+            self.weyl_tensor_dduu[i, k, l, m] = expression
+            self.mark_evaluated("weyl", index_config, i, k, l, m)
         elif(index_config == "dddd"):
             # TODO
             # MUST TEST
-            self.weyl_tensor_dddd[int(i*16/self.dimension_count+k)][l][m] = expression
+            self.weyl_tensor_dddd[i, k, l, m] = expression
+            self.mark_evaluated("weyl", index_config, i, k, l, m)
         else:
             print("Invalid index_config string.") 
     
@@ -1693,19 +2024,17 @@ class SpaceTime:
                 print("")
                 print("Weyl curvature tensor coefficients (dddd)")
                 print("=========================================")
-            for i in self.dimensions:
-                for k in self.dimensions:
-                    for l in self.dimensions:
-                        for m in self.dimensions:
-                            # TODO
-                            # MUST TEST
-                            self.set_weyl_coefficient(index_config, i, k, l, m, self.compute_weyl_coefficient(index_config, i, k, l, m))
-                            if(self.suppress_printing == False):
-                                self.print_weyl_coefficient(index_config, i, k, l, m)
+            # TODO
+            # MUST TEST
+            index_list = [ (i, k, l, m) for i in self.dimensions for k in self.dimensions for l in self.dimensions for m in self.dimensions ]
+            for (i, k, l, m), expression in zip(index_list, self.compute_coefficients("weyl", self.compute_weyl_coefficient, index_config, index_list)):
+                self.set_weyl_coefficient(index_config, i, k, l, m, expression)
+            if(self.suppress_printing == False):
+                self.print_all_weyl_coefficient(index_config)
         else:
             print("Invalid index_config string.")
     
-    def compute_weyl_coefficient(self, index_config, i, k, l, m):
+    def compute_weyl_coefficient(self, index_config, i, k, l, m, simplified = True):
         """
         Description
         ===========
@@ -1744,7 +2073,9 @@ class SpaceTime:
             pass
         elif(index_config == "dddd"):   
             weyl_coefficient = self.get_riemann_coefficient("dddd", i, k, l, m) + Rational('1/'+str(n-2))*(self.get_ricci_coefficient("dd",i,m)*self.get_metric_coefficient("dd",k,l)-self.get_ricci_coefficient("dd",i,l)*self.get_metric_coefficient("dd",k,m)+self.get_ricci_coefficient("dd",k,l)*self.get_metric_coefficient("dd",i,m)-self.get_ricci_coefficient("dd",k,m)*self.get_metric_coefficient("dd",i,l))+Rational('1/'+str(int((n-1)*(n-2))))*self.get_ricci_scalar()*(self.get_metric_coefficient("dd", i, l)*self.get_metric_coefficient("dd", k, m)-self.get_metric_coefficient("dd", i, m)*self.get_metric_coefficient("dd", k, l))
-            return simplify(weyl_coefficient)
+            if(simplified == True):
+                weyl_coefficient = self.simplify_coefficient("weyl", weyl_coefficient, index_config, i, k, l, m)
+            return weyl_coefficient
         else:
             print("Invalid index_config string.") 
     
@@ -1881,6 +2212,8 @@ class SpaceTime:
         if (index_config == "uu"):
             return self.ricci_tensor_uu[mu,nu]
         elif(index_config == "dd"):
+            if(self.is_evaluated("ricci", index_config, mu, nu) == False):
+                self.set_ricci_coefficient(index_config, mu, nu, self.compute_ricci_coefficient(index_config, mu, nu))
             return self.ricci_tensor_dd[mu,nu]
         else:
             print("Invalid index_config string.")
@@ -1914,8 +2247,10 @@ class SpaceTime:
 
         if (index_config == "uu"):
             self.ricci_tensor_uu[mu,nu] = expression
+            self.mark_evaluated("ricci", index_config, mu, nu)
         elif(index_config == "dd"):
             self.ricci_tensor_dd[mu,nu] = expression
+            self.mark_evaluated("ricci", index_config, mu, nu)
         else:
             print("Invalid index_config string.")
     
@@ -1964,13 +2299,13 @@ class SpaceTime:
                 print("")
                 print("Ricci curvature tensor coefficients (dd)")
                 print("========================================")
-            for mu in self.dimensions:
-                for nu in self.dimensions:
-                    self.set_ricci_coefficient(index_config, mu, nu, self.compute_ricci_coefficient(index_config, mu, nu))
-                    if(self.suppress_printing == False):
-                        self.print_ricci_coefficient(index_config, mu, nu)
+            index_list = [ (mu, nu) for mu in self.dimensions for nu in self.dimensions ]
+            for (mu, nu), expression in zip(index_list, self.compute_coefficients("ricci", self.compute_ricci_coefficient, index_config, index_list)):
+                self.set_ricci_coefficient(index_config, mu, nu, expression)
+            if(self.suppress_printing == False):
+                self.print_all_ricci_coefficients(index_config)
     
-    def compute_ricci_coefficient(self, index_config, mu, nu):
+    def compute_ricci_coefficient(self, index_config, mu, nu, simplified = True):
         """
         Description
         ===========
@@ -2000,9 +2335,15 @@ class SpaceTime:
 
         ricci_coefficient = 0
         if index_config == "dd":
-            for lam in self.dimensions:
-                ricci_coefficient = ricci_coefficient + self.get_riemann_coefficient("uddd", lam, mu, lam, nu)
-            ricci_coefficient = simplify(ricci_coefficient)
+            # Contracts the Riemann tensor when it has already been stored and otherwise works from the connection, so the Riemann tensor is never built just for Ricci.
+            if all(self.dependency_index.is_riemann_zero("uddd", lam, mu, lam, nu) or self.is_evaluated("riemann", "uddd", lam, mu, lam, nu) for lam in self.dimensions):
+                for lam in self.dimensions:
+                    if(self.dependency_index.is_riemann_zero("uddd", lam, mu, lam, nu) == False):
+                        ricci_coefficient = ricci_coefficient + self.get_riemann_coefficient("uddd", lam, mu, lam, nu)
+            else:
+                ricci_coefficient = self.compute_connection_ricci_coefficient(mu, nu)
+            if(simplified == True):
+                ricci_coefficient = self.simplify_coefficient("ricci", ricci_coefficient, index_config, mu, nu)
         elif index_config == "uu":
             print("")
         elif index_config == "ud" or index_config == "du":
@@ -2012,6 +2353,40 @@ class SpaceTime:
 
         return ricci_coefficient
     
+    def compute_connection_ricci_coefficient(self, mu, nu):
+        r"""
+        Description
+        ===========
+        Computes a single covariant Ricci coefficient directly from the connection and its derivatives, without building the Riemann tensor. The contracted connection is replaced by the derivatives of ln sqrt|g| (see get_volume_derivative), which come from the diagonal coefficients or the determinant of the metric. Used by compute_ricci_coefficient whenever the Riemann tensor has not been stored.
+
+        Example
+        =======
+        >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        >> simplify(black_hole.compute_connection_ricci_coefficient(1, 1))
+        0
+
+        LaTeX representation
+        ====================
+        R_{\mu\nu} = \partial_{\lambda}\Gamma^{\lambda}_{\mu\nu} - \partial_{\mu}\partial_{\nu}\ln\sqrt{|g|} + \Gamma^{\lambda}_{\mu\nu}\partial_{\lambda}\ln\sqrt{|g|} - \Gamma^{\lambda}_{\mu\sigma}\Gamma^{\sigma}_{\nu\lambda}
+
+        URL Reference
+        =============
+        https://en.wikipedia.org/wiki/Ricci_curvature#Definition_via_local_coordinates_on_a_smooth_manifold
+
+        TODOs
+        =====
+        - Link example with test.
+        """
+
+        ricci_coefficient = -self.get_volume_derivative(mu, nu)
+        for lam in self.dimensions:
+            if(self.dependency_index.is_connection_zero("udd", lam, mu, nu) == False):
+                ricci_coefficient = ricci_coefficient + self.get_connection_derivative(lam, mu, nu, lam) + self.get_connection_coefficient("udd", lam, mu, nu)*self.get_volume_derivative(lam)
+            for sig in self.dimensions:
+                if(self.dependency_index.is_connection_zero("udd", lam, mu, sig) == False and self.dependency_index.is_connection_zero("udd", sig, nu, lam) == False):
+                    ricci_coefficient = ricci_coefficient - self.get_connection_coefficient("udd", lam, mu, sig)*self.get_connection_coefficient("udd", sig, nu, lam)
+        return ricci_coefficient
+
     def print_ricci_coefficient(self, index_config, mu, nu):
         """
         Description
@@ -2117,6 +2492,9 @@ class SpaceTime:
         - Needs functionality for other index configurations.
         """
 
+        if(self.is_evaluated("ricci_scalar", "") == False):
+            self.ricci_scalar = self.compute_ricci_scalar()
+            self.mark_evaluated("ricci_scalar", "")
         return self.ricci_scalar  
     
     def set_ricci_scalar(self):
@@ -2146,6 +2524,7 @@ class SpaceTime:
         """
 
         self.ricci_scalar = self.compute_ricci_scalar()
+        self.mark_evaluated("ricci_scalar", "")
         if(self.suppress_printing == False):
             print("")
             print("")
@@ -2180,10 +2559,16 @@ class SpaceTime:
         """
 
         ricci_scalar = 0
+        if(self.is_diagonal() == True):
+            # R = \sum_{i} R_{ii}/g_{ii}
+            for mu in self.dimensions:
+                ricci_scalar = ricci_scalar + self.get_ricci_coefficient("dd", mu, mu)/self.metric_tensor_dd[mu, mu]
+            return self.simplify_coefficient("ricci_scalar", ricci_scalar)
         for mu in self.dimensions:
             for nu in self.dimensions:
-                ricci_scalar = ricci_scalar + self.metric_tensor_uu[mu, nu] * self.get_ricci_coefficient("dd", mu, nu)
-        ricci_scalar = simplify(ricci_scalar)
+                if(self.dependency_index.is_metric_zero("uu", mu, nu) == False):
+                    ricci_scalar = ricci_scalar + self.metric_tensor_uu[mu, nu] * self.get_ricci_coefficient("dd", mu, nu)
+        ricci_scalar = self.simplify_coefficient("ricci_scalar", ricci_scalar)
         return ricci_scalar
     
     def print_ricci_scalar(self):
@@ -2253,6 +2638,8 @@ class SpaceTime:
             # MUST TEST
             return self.einstein_tensor_uu[mu, nu]
         elif(index_config == "dd"):
+            if(self.is_evaluated("einstein", index_config, mu, nu) == False):
+                self.set_einstein_coefficient(index_config, mu, nu, self.compute_einstein_coefficient(index_config, mu, nu))
             return self.einstein_tensor_dd[mu, nu]
         else:
             print("Invalid index_config string.")
@@ -2287,8 +2674,10 @@ class SpaceTime:
             # TODO
             # MUST TEST
             self.einstein_tensor_uu[mu, nu] = expression 
+            self.mark_evaluated("einstein", index_config, mu, nu)
         elif(index_config == "dd"):
             self.einstein_tensor_dd[mu, nu] = expression 
+            self.mark_evaluated("einstein", index_config, mu, nu)
         else:
             print("Invalid index_config string.")  
     
@@ -2335,15 +2724,15 @@ class SpaceTime:
                 print("")
                 print("Einstein curvature tensor coefficients (dd)")
                 print("===========================================")
-            for mu in self.dimensions:
-                for nu in self.dimensions:
-                    self.set_einstein_coefficient(index_config, mu, nu, self.compute_einstein_coefficient(index_config, mu, nu))
-                    if(self.suppress_printing == False):
-                        self.print_einstein_coefficient(index_config, mu, nu)
+            index_list = [ (mu, nu) for mu in self.dimensions for nu in self.dimensions ]
+            for (mu, nu), expression in zip(index_list, self.compute_coefficients("einstein", self.compute_einstein_coefficient, index_config, index_list)):
+                self.set_einstein_coefficient(index_config, mu, nu, expression)
+            if(self.suppress_printing == False):
+                self.print_all_einstein_coefficients(index_config)
         else:
             print("Invalid index_config string.") 
                     
-    def compute_einstein_coefficient(self, index_config, mu, nu):
+    def compute_einstein_coefficient(self, index_config, mu, nu, simplified = True):
         """
         Description
         ===========
@@ -2373,7 +2762,8 @@ class SpaceTime:
         einstein_coefficient = 0
         if index_config == "dd":
             einstein_coefficient = self.get_ricci_coefficient("dd", mu, nu) - Rational('1/2') * self.get_ricci_scalar() * self.metric_tensor_dd[mu,nu]
-            einstein_coefficient = simplify(einstein_coefficient)
+            if(simplified == True):
+                einstein_coefficient = self.simplify_coefficient("einstein", einstein_coefficient, index_config, mu, nu)
         elif index_config == "uu":
             # TODO
             # MUST TEST
@@ -2506,6 +2896,8 @@ class SpaceTime:
             # MUST TEST
             return self.stress_energy_tensor_uu[mu, nu]
         elif(index_config == "dd"):
+            if(self.is_evaluated("stress_energy", index_config, mu, nu) == False):
+                self.set_stress_energy_coefficient(index_config, mu, nu, self.compute_stress_energy_coefficient(index_config, mu, nu))
             return self.stress_energy_tensor_dd[mu, nu]
         else:
             print("Invalid index_config string.")
@@ -2540,8 +2932,10 @@ class SpaceTime:
             # TODO
             # MUST TEST
             self.stress_energy_tensor_uu[mu, nu] = expression
+            self.mark_evaluated("stress_energy", index_config, mu, nu)
         elif(index_config == "dd"):
             self.stress_energy_tensor_dd[mu, nu] = expression
+            self.mark_evaluated("stress_energy", index_config, mu, nu)
         else:
             print("Invalid index_config string.")
     
@@ -2588,11 +2982,11 @@ class SpaceTime:
                 print("")
                 print("Stress-energy-momentum tensor coefficients (dd)")
                 print("===============================================")
-            for mu in self.dimensions:
-                for nu in self.dimensions:
-                    self.set_stress_energy_coefficient(index_config, mu, nu, self.compute_stress_energy_coefficient(index_config, mu, nu))   
-                    if(self.suppress_printing == False):
-                        self.print_stress_energy_coefficient(index_config, mu, nu)
+            index_list = [ (mu, nu) for mu in self.dimensions for nu in self.dimensions ]
+            for (mu, nu), expression in zip(index_list, self.compute_coefficients("stress_energy", self.compute_stress_energy_coefficient, index_config, index_list)):
+                self.set_stress_energy_coefficient(index_config, mu, nu, expression)
+            if(self.suppress_printing == False):
+                self.print_all_stress_energy_coefficients(index_config)
         else:
             print("Invalid index_config string.")
 
@@ -2600,7 +2994,7 @@ class SpaceTime:
     def set_all_stress_energy_coefficient(self, index_config):
         return self.set_all_stress_energy_coefficients(index_config)
     
-    def compute_stress_energy_coefficient(self, index_config, mu, nu):
+    def compute_stress_energy_coefficient(self, index_config, mu, nu, simplified = True):
         r"""
         Description
         ===========
@@ -2637,7 +3031,9 @@ class SpaceTime:
             pass
         else:
             print("Invalid index_config string.")
-        return simplify(stress_energy_coefficient)
+        if(simplified == True):
+            stress_energy_coefficient = self.simplify_coefficient("stress_energy", stress_energy_coefficient, index_config, mu, nu)
+        return stress_energy_coefficient
 
     def print_stress_energy_coefficient(self, index_config, mu, nu):
         r"""
@@ -2827,10 +3223,13 @@ class SpaceTime:
     """
 
     def get_proper_time_geodesic_acceleration(self, lam):
+        if(self.is_evaluated("proper_time_geodesic_acceleration", "", lam) == False):
+            self.set_proper_time_geodesic_acceleration(lam, self.compute_proper_time_geodesic_acceleration(lam))
         return self.proper_acceleration[lam]
 
     def set_proper_time_geodesic_acceleration(self, lam, expression):
         self.proper_acceleration[lam] = expression
+        self.mark_evaluated("proper_time_geodesic_acceleration", "", lam)
 
     def set_all_proper_time_geodesic_accelerations(self):
         if(self.suppress_printing == False):
@@ -2848,7 +3247,7 @@ class SpaceTime:
         for mu in self.dimensions:
             for nu in self.dimensions:
                 acceleration = acceleration + -1*self.get_connection_coefficient("udd",lam,mu,nu)*Derivative(self.coordinate_set[mu],Symbol('tau'))*Derivative(self.coordinate_set[nu],Symbol('tau'))
-        return simplify(acceleration)
+        return self.simplify_coefficient("geodesic", acceleration, "proper_time", lam)
 
     def print_proper_time_geodesic_acceleration(self, lam):
         pprint(Eq(Derivative(Derivative(self.coordinate_set[lam],Symbol('tau')),Symbol('tau')), self.get_proper_time_geodesic_acceleration(lam)))
@@ -2863,10 +3262,13 @@ class SpaceTime:
     """
 
     def get_coordinate_time_geodesic_acceleration(self, lam):
+        if(self.is_evaluated("coordinate_time_geodesic_acceleration", "", lam) == False):
+            self.set_coordinate_time_geodesic_acceleration(lam, self.compute_coordinate_time_geodesic_acceleration(lam))
         return self.coordinate_acceleration[lam]
 
     def set_coordinate_time_geodesic_acceleration(self, lam, expression):
         self.coordinate_acceleration[lam] = expression
+        self.mark_evaluated("coordinate_time_geodesic_acceleration", "", lam)
 
     def set_all_coordinate_time_geodesic_accelerations(self):
         if(self.suppress_printing == False):
@@ -2884,7 +3286,7 @@ class SpaceTime:
         for mu in self.dimensions:
             for nu in self.dimensions:
                 acceleration = acceleration + -1*self.get_connection_coefficient("udd",lam,mu,nu)*diff(self.coordinate_set[mu],self.coordinate_set[0])*diff(self.coordinate_set[nu],self.coordinate_set[0])+self.get_connection_coefficient("udd",0,mu,nu)*Derivative(self.coordinate_set[mu],self.coordinate_set[0])*Derivative(self.coordinate_set[nu],self.coordinate_set[0])*Derivative(self.coordinate_set[lam],self.coordinate_set[0])
-        return simplify(acceleration)
+        return self.simplify_coefficient("geodesic", acceleration, "coordinate_time", lam)
 
         # Velocity
         #pprint(Eq(Derivative(self.coordinate_set[lam],self.coordinate_set[0]), integrate(acc,Symbol('t'))))
@@ -2902,10 +3304,13 @@ class SpaceTime:
     """
 
     def get_geodesic_deviation_acceleration(self, lam):
+        if(self.is_evaluated("geodesic_deviation_acceleration", "", lam) == False):
+            self.set_geodesic_deviation_acceleration(lam, self.compute_geodesic_deviation_acceleration(lam))
         return self.geodesic_deviation_acceleration[lam]
 
     def set_geodesic_deviation_acceleration(self, lam, expression):
         self.geodesic_deviation_acceleration[lam] = expression
+        self.mark_evaluated("geodesic_deviation_acceleration", "", lam)
 
     def set_all_geodesic_deviation_accelerations(self):
         if(self.suppress_printing == False):
@@ -2926,7 +3331,7 @@ class SpaceTime:
                 for rho in self.dimensions:
                     for sig in self.dimensions:
                         acceleration = acceleration + self.get_riemann_coefficient("uddd", mu, nu, rho, sig)*Derivative(self.coordinate_set[nu],Symbol('tau'))*Derivative(self.coordinate_set[rho],Symbol('tau'))*Symbol('xi_'+str(sig))  
-        return simplify(acceleration)
+        return self.simplify_coefficient("geodesic", acceleration, "deviation", lam)
 
     def print_separation_geodesic_acceleration(self, lam):
         pprint(Eq(Derivative(Derivative(Symbol('xi_'+str(lam)),Symbol('tau')),Symbol('tau')), self.get_geodesic_deviation_acceleration(lam)))
@@ -2972,6 +3377,8 @@ class SpaceTime:
             # MUST TEST
             return self.schouten_tensor_uu[mu, nu]
         elif(index_config == "dd"):
+            if(self.is_evaluated("schouten", index_config, mu, nu) == False):
+                self.set_schouten_coefficient(index_config, mu, nu, self.compute_schouten_coefficient(index_config, mu, nu))
             return self.schouten_tensor_dd[mu, nu]
         else:
             print("Invalid index_config string.")
@@ -3003,8 +3410,10 @@ class SpaceTime:
         """
         if (index_config == "uu"):
             self.schouten_tensor_uu[mu, nu] = expression
+            self.mark_evaluated("schouten", index_config, mu, nu)
         elif(index_config == "dd"):
             self.schouten_tensor_dd[mu, nu] = expression
+            self.mark_evaluated("schouten", index_config, mu, nu)
         else:
             print("Invalid index_config string.")
 
@@ -3038,7 +3447,7 @@ class SpaceTime:
         acceleration = 0
         for lam in self.dimensions:
             acceleration = acceleration + -1*self.get_connection_coefficient("udd",lam,mu,nu)*Derivative(self.coordinate_set[mu],self.coordinate_set[0])*Derivative(self.coordinate_set[nu],self.coordinate_set[0])+self.get_connection_coefficient("udd",0,mu,nu)*Derivative(self.coordinate_set[mu],self.coordinate_set[0])*Derivative(self.coordinate_set[nu],self.coordinate_set[0])*Derivative(self.coordinate_set[lam],self.coordinate_set[0])
-        return simplify(acceleration)
+        return self.simplify_coefficient("schouten", acceleration, index_config, mu, nu)
 
     def print_schouten_coefficient(self, index_config, mu, nu):
         if (index_config == "uu"):
@@ -3053,11 +3462,73 @@ class SpaceTime:
             for nu in self.dimensions:
                 self.print_schouten_coefficient(index_config, mu, nu)
 
+    def evaluate_grid(self, expression, x_index, y_index, x_vals, y_vals,
+                      params=None, fixed=None):
+        """
+        Evaluate an expression of two coordinates on the grid x_vals by y_vals
+        in one broadcast NumPy call. Returns an array of shape
+        (len(y_vals), len(x_vals)); singular or complex points are NaN.
+        params gives the values of the other symbols (G, M, c, ...) and fixed
+        the values of the coordinates which are not plotted, both keyed by
+        symbol or by name. Values may be arrays which broadcast against the
+        grid, e.g. M=np.array([1, 2])[:, None, None] gives shape (2, ny, nx).
+        The expression is compiled once (see NumericTensor) and the kernel is
+        kept until the metric changes.
+        """
+        x_sym = self.coordinate_set[x_index]
+        y_sym = self.coordinate_set[y_index]
+        x_grid, y_grid = np.meshgrid(np.asarray(x_vals, dtype=float), np.asarray(y_vals, dtype=float))
+        expression = sympify(expression)
+        if expression not in self.grid_kernels:
+            self.grid_kernels[expression] = NumericTensor(SharedTensor(expression), self.coordinate_set)
+        kernel = self.grid_kernels[expression]
+        fixed = { str(coordinate): value for coordinate, value in (fixed or {}).items() }
+        missing = [ str(coordinate) for coordinate in self.coordinate_set if coordinate not in (x_sym, y_sym) and str(coordinate) not in fixed and coordinate in expression.free_symbols ]
+        if len(missing) > 0:
+            raise ValueError("Missing fixed values for the coordinates %s." % ", ".join(missing))
+        coordinates = []
+        for coordinate in self.coordinate_set:
+            if coordinate == x_sym:
+                coordinates.append(x_grid)
+            elif coordinate == y_sym:
+                coordinates.append(y_grid)
+            else:
+                # Coordinates the expression does not depend on take any value.
+                coordinates.append(fixed.get(str(coordinate), 0.0))
+        values = kernel(*coordinates, params=params)
+        if np.iscomplexobj(values):
+            values = np.where(values.imag == 0, values.real, np.nan)
+        grid = np.broadcast_to(values, np.broadcast_shapes(values.shape, x_grid.shape)).astype(float)
+        grid[~np.isfinite(grid)] = np.nan
+        return grid
+
+    def downsample_grid(self, x_vals, y_vals, grid, preview=None):
+        """
+        Reduce a grid from evaluate_grid to at most preview points per axis
+        by keeping evenly spaced rows and columns, both ends included. The
+        kept values are the exact samples of the full grid. Returns
+        (x_vals, y_vals, grid) unchanged when preview is None or not smaller.
+        """
+        if preview is None:
+            return x_vals, y_vals, grid
+        if preview < 2:
+            raise ValueError("preview must keep at least 2 points per axis.")
+        x_keep = np.unique(np.linspace(0, len(x_vals) - 1, min(preview, len(x_vals))).round().astype(int))
+        y_keep = np.unique(np.linspace(0, len(y_vals) - 1, min(preview, len(y_vals))).round().astype(int))
+        return x_vals[x_keep], y_vals[y_keep], grid[np.ix_(y_keep, x_keep)]
+
     def plot_ricci_scalar_grid(self, x_range, y_range, x_index=0, y_index=1,
-                               num_points=20, save_path=None, dpi=150):
+                               num_points=20, save_path=None, dpi=150,
+                               annotate=None, annotation_limit=400, preview=None,
+                               params=None, fixed=None):
         """
         Generate a PNG showing Ricci scalar sampled on a 2D grid with each cell
         annotated. x_index,y_index select coordinate symbols from self.coordinate_set.
+        The grid is drawn as a single mesh. Grid lines and cell values are only
+        drawn for at most annotation_limit cells unless annotate forces them on
+        or off; preview renders at most that many points per axis. params and
+        fixed bind the other symbols and coordinates to scalars (see
+        evaluate_grid).
         """
         if save_path is None:
             save_path = os.path.join(os.getcwd(), "ricci_scalar_grid.png")
@@ -3066,20 +3537,14 @@ class SpaceTime:
         x_sym = self.coordinate_set[x_index]
         y_sym = self.coordinate_set[y_index]
 
-        # Numeric function (falls back to constant if expression independent)
-        ricci_expr = self.get_ricci_scalar()
-        f_ricci = lambdify((x_sym, y_sym), ricci_expr, "numpy")
-
         x_vals = np.linspace(x_range[0], x_range[1], num_points)
         y_vals = np.linspace(y_range[0], y_range[1], num_points)
-        ricci_grid = np.zeros((num_points, num_points), dtype=float)
-
-        for i, xv in enumerate(x_vals):
-            for j, yv in enumerate(y_vals):
-                try:
-                    ricci_grid[j, i] = float(f_ricci(xv, yv))
-                except Exception:
-                    ricci_grid[j, i] = np.nan
+        ricci_grid = self.evaluate_grid(self.get_ricci_scalar(), x_index, y_index, x_vals, y_vals, params, fixed)
+        if ricci_grid.ndim != 2:
+            raise ValueError("Plots need scalar params and fixed values.")
+        x_vals, y_vals, ricci_grid = self.downsample_grid(x_vals, y_vals, ricci_grid, preview)
+        if annotate is None:
+            annotate = (len(x_vals) - 1)*(len(y_vals) - 1) <= annotation_limit
 
         vmax = np.nanmax(np.abs(ricci_grid))
         if not np.isfinite(vmax) or vmax == 0:
@@ -3094,21 +3559,24 @@ class SpaceTime:
         ax.set_ylabel(str(y_sym))
         ax.set_title("Spacetime Ricci Scalar Curvature (Grid Squares)\nDiverging Colors Show Curvature")
 
-        # Annotate each cell
-        for i, xv in enumerate(x_vals[:-1]):
-            for j, yv in enumerate(y_vals[:-1]):
-                val = ricci_grid[j, i]
-                if np.isfinite(val):
-                    ax.text(xv + (x_vals[1]-x_vals[0])/2.0,
-                            yv + (y_vals[1]-y_vals[0])/2.0,
-                            f"{val:0.2e}",
-                            ha="center", va="center", fontsize=7, color="black")
-
-        # Draw grid lines
-        for xv in x_vals:
-            ax.axvline(xv, color="black", linewidth=0.5)
-        for yv in y_vals:
-            ax.axhline(yv, color="black", linewidth=0.5)
+        if annotate:
+            # Annotate each cell
+            for i, xv in enumerate(x_vals[:-1]):
+                for j, yv in enumerate(y_vals[:-1]):
+                    val = ricci_grid[j, i]
+                    if np.isfinite(val):
+                        ax.text(xv + (x_vals[1]-x_vals[0])/2.0,
+                                yv + (y_vals[1]-y_vals[0])/2.0,
+                                f"{val:0.2e}",
+                                ha="center", va="center", fontsize=7, color="black")
+
+            # Draw grid lines, one collection per direction
+            x_limits = ax.get_xlim()
+            y_limits = ax.get_ylim()
+            ax.vlines(x_vals, y_limits[0], y_limits[1], color="black", linewidth=0.5)
+            ax.hlines(y_vals, x_limits[0], x_limits[1], color="black", linewidth=0.5)
+            ax.set_xlim(x_limits)
+            ax.set_ylim(y_limits)
 
         cbar = fig.colorbar(mesh, ax=ax)
         cbar.set_label("Ricci Scalar")
@@ -3121,11 +3589,17 @@ class SpaceTime:
     def plot_metric_tensor_grid(self, x_range, y_range, mu=0, nu=0,
                                 x_index=0, y_index=1, num_points=20,
                                 save_path=None, dpi=150, index_config="dd",
-                                x_label=None, y_label=None):
+                                x_label=None, y_label=None, annotate=None,
+                                annotation_limit=400, preview=None,
+                                params=None, fixed=None):
         """
         Plot selected metric component as a grid with numeric values and a very
         light grayscale background per cell, and save as metric_tensor_plot.png
-        unless overridden.
+        unless overridden. The cells are drawn as a single mesh. Cell borders,
+        values and grid ticks are only drawn for at most annotation_limit cells
+        unless annotate forces them on or off; preview renders at most that many
+        points per axis. params and fixed bind the other symbols and coordinates
+        to scalars (see evaluate_grid).
         """
         if save_path is None:
             save_path = os.path.join(os.getcwd(), "metric_tensor_plot.png")
@@ -3141,18 +3615,14 @@ class SpaceTime:
         else:
             raise ValueError("index_config must be 'dd' or 'uu'.")
 
-        f_comp = lambdify((x_sym, y_sym), comp_expr, "numpy")
-
         x_vals = np.linspace(x_range[0], x_range[1], num_points)
         y_vals = np.linspace(y_range[0], y_range[1], num_points)
-        comp_grid = np.zeros((num_points, num_points), dtype=float)
-
-        for i, xv in enumerate(x_vals):
-            for j, yv in enumerate(y_vals):
-                try:
-                    comp_grid[j, i] = float(f_comp(xv, yv))
-                except Exception:
-                    comp_grid[j, i] = np.nan
+        comp_grid = self.evaluate_grid(comp_expr, x_index, y_index, x_vals, y_vals, params, fixed)
+        if comp_grid.ndim != 2:
+            raise ValueError("Plots need scalar params and fixed values.")
+        x_vals, y_vals, comp_grid = self.downsample_grid(x_vals, y_vals, comp_grid, preview)
+        if annotate is None:
+            annotate = (len(x_vals) - 1)*(len(y_vals) - 1) <= annotation_limit
 
         fig, ax = plt.subplots(figsize=(11, 8), dpi=dpi)
         lab = f"g_{mu}{nu}" if index_config == "dd" else f"g^{mu}{nu}"
@@ -3161,7 +3631,6 @@ class SpaceTime:
         ax.set_title(f"Metric Component {lab} (Values + Very Light Grayscale)")
 
         # Draw grid boxes with very light grayscale background
-        from matplotlib.patches import Rectangle
         if len(x_vals) > 1 and len(y_vals) > 1:
             dx = x_vals[1] - x_vals[0]
             dy = y_vals[1] - y_vals[0]
@@ -3169,42 +3638,33 @@ class SpaceTime:
             dx = dy = 1.0
 
         # Determine a symmetric scaling for subtle grayscale shading
-        vmax = np.nanmax(np.abs(comp_grid))
+        vmax = np.nanmax(np.abs(comp_grid)) if np.any(np.isfinite(comp_grid)) else np.nan
         if not np.isfinite(vmax) or vmax == 0:
             vmax = 1.0  # avoid divide by zero; keeps cells very light
 
         shade_max = 0.98  # nearly white
         shade_min = 0.85  # very light gray
 
-        for i, xv in enumerate(x_vals[:-1]):
-            for j, yv in enumerate(y_vals[:-1]):
-                val = comp_grid[j, i]
-                if np.isfinite(val):
-                    norm_abs = min(abs(val) / vmax, 1.0)
-                else:
-                    norm_abs = 0.0
-                shade = shade_max - (shade_max - shade_min) * norm_abs
-                ax.add_patch(
-                    Rectangle(
-                        (xv, yv), dx, dy,
-                        fill=True,
-                        facecolor=(shade, shade, shade, 1.0),
-                        edgecolor="black",
-                        linewidth=0.6
-                    )
-                )
-
-        # Annotate each cell center
-        cx = dx / 2.0
-        cy = dy / 2.0
-        for i, xv in enumerate(x_vals[:-1]):
-            for j, yv in enumerate(y_vals[:-1]):
-                val = comp_grid[j, i]
-                if np.isfinite(val):
-                    ax.text(
-                        xv + cx, yv + cy, f"{val:0.2e}",
-                        ha="center", va="center", fontsize=9, color="black"
-                    )
+        # One mesh for every cell; each cell takes the value at its lower left corner
+        norm_abs = np.nan_to_num(np.minimum(np.abs(comp_grid[:-1, :-1]) / vmax, 1.0), nan=0.0)
+        shade = shade_max - (shade_max - shade_min) * norm_abs
+        ax.pcolormesh(x_vals, y_vals, shade, shading="flat", cmap="gray",
+                      vmin=0.0, vmax=1.0,
+                      edgecolors="black" if annotate else "face",
+                      linewidth=0.6 if annotate else 0.0)
+
+        if annotate:
+            # Annotate each cell center
+            cx = dx / 2.0
+            cy = dy / 2.0
+            for i, xv in enumerate(x_vals[:-1]):
+                for j, yv in enumerate(y_vals[:-1]):
+                    val = comp_grid[j, i]
+                    if np.isfinite(val):
+                        ax.text(
+                            xv + cx, yv + cy, f"{val:0.2e}",
+                            ha="center", va="center", fontsize=9, color="black"
+                        )
 
         # Axis limits
         ax.set_xlim(x_vals[0], x_vals[-1])
@@ -3212,9 +3672,10 @@ class SpaceTime:
         ax.invert_yaxis()  # optional: match matrix orientation; remove if undesired
 
         # Ticks at grid lines
-        ax.set_xticks(x_vals)
-        ax.set_yticks(y_vals)
-        ax.tick_params(axis='both', which='both', length=0)
+        if annotate:
+            ax.set_xticks(x_vals)
+            ax.set_yticks(y_vals)
+            ax.tick_params(axis='both', which='both', length=0)
 
         fig.tight_layout()
         fig.savefig(save_path)
@@ -3308,7 +3769,7 @@ def main():
     pprint(blackhole_spacetime.ricci_scalar)
 
     # Before plotting, for demonstration:
-    blackhole_spacetime.metric_tensor_dd[1, 1] = sin(blackhole_spacetime.coordinate_set[1]) * cos(blackhole_spacetime.coordinate_set[2])
+    blackhole_spacetime.set_metric_coefficient("dd", 1, 1, sin(blackhole_spacetime.coordinate_set[1]) * cos(blackhole_spacetime.coordinate_set[2]))
 
     # Your plot call
     blackhole_spacetime.plot_metric_tensor_grid(
@@ -3328,7 +3789,7 @@ def main():
     # Example usage (adjust Solution / indices as needed)
     st = SpaceTime(Solution().weak_field_approximation(), suppress_printing=True)
     st.plot_ricci_scalar_grid(x_range=(0, 200), y_range=(0, 200), x_index=1, y_index=2, num_points=10)
-    st.plot_metric_tensor_grid(x_range=(0, 200), y_range=(0, 200), mu=0, nu=0, x_index=1, y_index=2, num_points=10)
+    st.plot_metric_tensor_grid(x_range=(0, 200), y_range=(0, 200), mu=0, nu=0, x_index=1, y_index=2, num_points=10, params={"G": 1, "M": 1, "c": 1})
 
 #sys.settrace(trace_calls) # Start tracing function calls
 
@@ -0,0 +1,250 @@
+#!/usr/bin/env python
+from spacetimeengine.src.symmetries import riemann_symmetry_terms
+
+class DependencyIndex:
+
+    """
+    Description
+    ===========
+    Records which metric coefficients are nonzero and which coordinates each of them depends on (through free_symbols), and derives from that which connection, Riemann and derivative terms vanish identically. The pipeline stages consult it to skip such terms before building them.
+
+    Every answer is conservative: a term reported as zero is zero for any values of the metric functions, while a term reported as nonzero may still simplify to zero.
+
+    Example
+    =======
+    >> black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+    >> black_hole.dependency_index.metric_dependencies("dd", 0, 0)
+    frozenset({1})
+    >> black_hole.dependency_index.is_connection_zero("udd", 0, 2, 3)
+    True
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    def __init__(self, metric_tensor_dd, metric_tensor_uu, coordinate_set):
+        self.dimensions = range(len(coordinate_set))
+        coordinate_indices = { coordinate: index for index, coordinate in enumerate(coordinate_set) }
+        # Coordinate indices of every nonzero metric coefficient by index configuration. Zero coefficients are left out.
+        self.metric_index = {}
+        for index_config, metric in [ ("dd", metric_tensor_dd), ("uu", metric_tensor_uu) ]:
+            self.metric_index[index_config] = {}
+            for mu in self.dimensions:
+                for nu in self.dimensions:
+                    if metric[mu, nu] != 0:
+                        self.metric_index[index_config][mu, nu] = frozenset(coordinate_indices[symbol] for symbol in metric[mu, nu].free_symbols if symbol in coordinate_indices)
+        # Whether every off diagonal covariant metric coefficient vanishes.
+        self.diagonal = all(mu == nu for (mu, nu) in self.metric_index["dd"])
+        # Coordinate indices of every connection coefficient (udd) which does not vanish identically.
+        self.connection_index = {}
+        for i in self.dimensions:
+            for k in self.dimensions:
+                for l in self.dimensions:
+                    if l >= k:
+                        dependencies = self.find_connection_dependencies(i, k, l)
+                        if dependencies is not None:
+                            self.connection_index[i, k, l] = dependencies
+                            self.connection_index[i, l, k] = dependencies
+        self.riemann_index = {}
+
+    def is_metric_zero(self, index_config, mu, nu):
+        return (mu, nu) not in self.metric_index[index_config]
+
+    def metric_dependencies(self, index_config, mu, nu):
+        """
+        Description
+        ===========
+        Returns the indices of the coordinates a metric coefficient depends on. Zero and constant coefficients depend on none.
+        """
+
+        return self.metric_index[index_config].get((mu, nu), frozenset())
+
+    def is_derivative_zero(self, mu, nu, *coordinates):
+        """
+        Description
+        ===========
+        Returns whether a partial derivative of the covariant metric coefficient g_{mu nu} with respect to the given coordinate indices vanishes identically.
+
+        Example
+        =======
+        >> black_hole.dependency_index.is_derivative_zero(0, 0, 0)
+        True
+        """
+
+        dependencies = self.metric_dependencies("dd", mu, nu)
+        return any(coordinate not in dependencies for coordinate in coordinates)
+
+    def find_connection_dependencies(self, i, k, l):
+        # \Gamma^{i}_{kl} = g^{im} \Gamma_{mkl}. Returns None when every term vanishes.
+        dependencies = None
+        for m in self.dimensions:
+            if self.is_metric_zero("uu", m, i) or self.is_connection_zero("ddd", m, k, l):
+                continue
+            term_dependencies = self.metric_dependencies("uu", m, i) | self.metric_dependencies("dd", m, k) | self.metric_dependencies("dd", m, l) | self.metric_dependencies("dd", k, l)
+            dependencies = term_dependencies if dependencies is None else dependencies | term_dependencies
+        return dependencies
+
+    def is_connection_zero(self, index_config, i, k, l):
+        """
+        Description
+        ===========
+        Returns whether a connection coefficient vanishes identically.
+
+        Example
+        =======
+        >> black_hole.dependency_index.is_connection_zero("ddd", 0, 0, 1)
+        False
+        """
+
+        if index_config == "udd":
+            return (i, k, l) not in self.connection_index
+        elif index_config == "ddd":
+            return self.is_derivative_zero(i, k, l) and self.is_derivative_zero(i, l, k) and self.is_derivative_zero(k, l, i)
+        else:
+            print("Invalid index_config string.")
+
+    def connection_dependencies(self, i, k, l):
+        return self.connection_index.get((i, k, l), frozenset())
+
+    def is_connection_derivative_zero(self, i, k, l, a):
+        """
+        Description
+        ===========
+        Returns whether the partial derivative of a connection coefficient (udd) with respect to coordinate a vanishes identically.
+        """
+
+        return a not in self.connection_dependencies(i, k, l)
+
+    def is_riemann_zero(self, index_config, rho, sig, mu, nu):
+        """
+        Description
+        ===========
+        Returns whether a Riemann coefficient vanishes identically. Coefficients are mapped onto their canonical index sets first (see riemann_symmetry_terms). A canonical covariant coefficient vanishes when every second derivative and every connection product of its defining formula does. A canonical mixed coefficient vanishes when every covariant coefficient it is raised from does.
+
+        Example
+        =======
+        >> black_hole.dependency_index.is_riemann_zero("uddd", 0, 1, 2, 3)
+        True
+        """
+
+        key = (index_config, rho, sig, mu, nu)
+        if key in self.riemann_index:
+            return self.riemann_index[key]
+        terms = riemann_symmetry_terms(index_config, rho, sig, mu, nu)
+        if terms != [ (1, (rho, sig, mu, nu)) ]:
+            zero = all(self.is_riemann_zero(index_config, *indices) for sign, indices in terms)
+        elif index_config == "dddd":
+            zero = self.is_derivative_zero(rho, nu, sig, mu) and self.is_derivative_zero(sig, mu, rho, nu) and self.is_derivative_zero(rho, mu, sig, nu) and self.is_derivative_zero(sig, nu, rho, mu)
+            for n in self.dimensions:
+                for p in self.dimensions:
+                    if zero and self.is_metric_zero("dd", n, p) == False:
+                        zero = (self.is_connection_zero("udd", n, sig, mu) or self.is_connection_zero("udd", p, rho, nu)) and (self.is_connection_zero("udd", n, sig, nu) or self.is_connection_zero("udd", p, rho, mu))
+        else:
+            zero = all(self.is_metric_zero("uu", rho, lam) or self.is_riemann_zero("dddd", lam, sig, mu, nu) for lam in self.dimensions)
+        self.riemann_index[key] = zero
+        return zero
+
+def close_under_symmetries(index_config, riemann_indices, dimensions):
+    """
+    Description
+    ===========
+    Extends a set of Riemann index sets so it holds the canonical index sets they are stored from and every index set stored from those (see riemann_symmetry_terms). Used so a changed coefficient is never left with stale symmetric partners.
+    """
+
+    canonical = set( indices for rho, sig, mu, nu in riemann_indices for sign, indices in riemann_symmetry_terms(index_config, rho, sig, mu, nu) )
+    closed = set(riemann_indices) | canonical
+    for rho in dimensions:
+        for sig in dimensions:
+            for mu in dimensions:
+                for nu in dimensions:
+                    if any(indices in canonical for sign, indices in riemann_symmetry_terms(index_config, rho, sig, mu, nu)):
+                        closed.add((rho, sig, mu, nu))
+    return closed
+
+def affected_coefficients(previous_index, index, changed_metric_dd, changed_metric_uu):
+    """
+    Description
+    ===========
+    Returns the keys (tensor, index_config, *indices), as used by SpaceTime.evaluated_coefficients, of every coefficient which can change when the given covariant and contravariant metric coefficients change. previous_index and index describe the metric before and after the change; a term only counts when it is nonzero in at least one of them. Coefficients are followed through the connection, Riemann, Ricci, Ricci scalar, Einstein, stress-energy, Schouten, Weyl and geodesic stages.
+
+    Example
+    =======
+    >> affected_coefficients(previous_index, black_hole.dependency_index, [ (1, 1) ], [ (1, 1) ])
+    {('connection', 'udd', 1, 1, 1), ('connection', 'udd', 0, 0, 1), ...}
+
+    TODOs
+    =====
+    - Link example with test.
+    """
+
+    dimensions = index.dimensions
+    changed_dd = set(frozenset(pair) for pair in changed_metric_dd)
+    changed_uu = set(frozenset(pair) for pair in changed_metric_uu)
+    indexes = [ previous_index, index ]
+
+    def metric_nonzero(index_config, mu, nu):
+        return any(dependency_index.is_metric_zero(index_config, mu, nu) == False for dependency_index in indexes)
+    def derivative_changed(mu, nu, *coordinates):
+        return frozenset((mu, nu)) in changed_dd and any(dependency_index.is_derivative_zero(mu, nu, *coordinates) == False for dependency_index in indexes)
+    def connection_nonzero(index_config, i, k, l):
+        return any(dependency_index.is_connection_zero(index_config, i, k, l) == False for dependency_index in indexes)
+    def riemann_nonzero(index_config, rho, sig, mu, nu):
+        return any(dependency_index.is_riemann_zero(index_config, rho, sig, mu, nu) == False for dependency_index in indexes)
+
+    affected = set()
+    # \Gamma_{mkl} = (\partial_l g_{mk} + \partial_k g_{ml} - \partial_m g_{kl})/2
+    connection_ddd = set( (m, k, l) for m in dimensions for k in dimensions for l in dimensions if derivative_changed(m, k, l) or derivative_changed(m, l, k) or derivative_changed(k, l, m) )
+    # \Gamma^{i}_{kl} = g^{im} \Gamma_{mkl}
+    connection_udd = set( (i, k, l) for i in dimensions for k in dimensions for l in dimensions if any((frozenset((m, i)) in changed_uu and connection_nonzero("ddd", m, k, l)) or ((m, k, l) in connection_ddd and metric_nonzero("uu", m, i)) for m in dimensions) )
+    # R_{\rho\sigma\mu\nu} from the second derivatives of the metric and g_{np} \Gamma^{n} \Gamma^{p}
+    riemann_dddd = set()
+    for rho in dimensions:
+        for sig in dimensions:
+            for mu in dimensions:
+                for nu in dimensions:
+                    changed = derivative_changed(rho, nu, sig, mu) or derivative_changed(sig, mu, rho, nu) or derivative_changed(rho, mu, sig, nu) or derivative_changed(sig, nu, rho, mu)
+                    for n in dimensions:
+                        for p in dimensions:
+                            if changed or metric_nonzero("dd", n, p) == False:
+                                continue
+                            for (a, b), (c, d) in [ ((sig, mu), (rho, nu)), ((sig, nu), (rho, mu)) ]:
+                                if connection_nonzero("udd", n, a, b) and connection_nonzero("udd", p, c, d):
+                                    changed = changed or frozenset((n, p)) in changed_dd or (n, a, b) in connection_udd or (p, c, d) in connection_udd
+                    if changed:
+                        riemann_dddd.add((rho, sig, mu, nu))
+    riemann_dddd = close_under_symmetries("dddd", riemann_dddd, dimensions)
+    # R^{\rho}_{\sigma\mu\nu} = g^{\rho\lambda} R_{\lambda\sigma\mu\nu}
+    riemann_uddd = set( (rho, sig, mu, nu) for rho in dimensions for sig in dimensions for mu in dimensions for nu in dimensions if any((frozenset((rho, lam)) in changed_uu and riemann_nonzero("dddd", lam, sig, mu, nu)) or ((lam, sig, mu, nu) in riemann_dddd and metric_nonzero("uu", rho, lam)) for lam in dimensions) )
+    riemann_uddd = close_under_symmetries("uddd", riemann_uddd, dimensions)
+    ricci = set( (mu, nu) for mu in dimensions for nu in dimensions if any((lam, mu, lam, nu) in riemann_uddd for lam in dimensions) )
+    ricci_scalar = len(ricci) > 0 or len(changed_uu) > 0
+    einstein = set( (mu, nu) for mu in dimensions for nu in dimensions if (mu, nu) in ricci or frozenset((mu, nu)) in changed_dd or (ricci_scalar and metric_nonzero("dd", mu, nu)) )
+
+    affected.update(("connection", "ddd") + indices for indices in connection_ddd)
+    affected.update(("connection", "udd") + indices for indices in connection_udd)
+    affected.update(("riemann", "dddd") + indices for indices in riemann_dddd)
+    affected.update(("riemann", "uddd") + indices for indices in riemann_uddd)
+    affected.update(("ricci", "dd") + indices for indices in ricci)
+    if ricci_scalar:
+        affected.add(("ricci_scalar", ""))
+    affected.update(("einstein", "dd") + indices for indices in einstein)
+    affected.update(("stress_energy", "dd") + indices for indices in einstein)
+    for mu in dimensions:
+        for nu in dimensions:
+            if any((lam, mu, nu) in connection_udd for lam in dimensions):
+                affected.add(("schouten", "dd", mu, nu))
+    for i in dimensions:
+        for k in dimensions:
+            for l in dimensions:
+                for m in dimensions:
+                    if (i, k, l, m) in riemann_dddd or ricci_scalar or any(pair in ricci for pair in [ (i, m), (i, l), (k, l), (k, m) ]) or any(frozenset(pair) in changed_dd for pair in [ (i, m), (i, l), (k, l), (k, m) ]):
+                        affected.add(("weyl", "dddd", i, k, l, m))
+    for lam in dimensions:
+        if any((lam, mu, nu) in connection_udd for mu in dimensions for nu in dimensions):
+            affected.add(("proper_time_geodesic_acceleration", "", lam))
+        if any((lam, mu, nu) in connection_udd or (0, mu, nu) in connection_udd for mu in dimensions for nu in dimensions):
+            affected.add(("coordinate_time_geodesic_acceleration", "", lam))
+        if len(riemann_uddd) > 0:
+            affected.add(("geodesic_deviation_acceleration", "", lam))
+    return affected
@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+
+"""
+Index symmetry functions
+========================
+Helpers which map any coefficient of a symmetric tensor onto the algebraically independent coefficients it is built from.
+"""
+
+def independent_riemann_indices(index_config, dimension_count):
+    """
+    Description
+    ===========
+    Returns the canonical index sets of the Riemann coefficients which have to be computed explicitly. Every other coefficient follows from these by the symmetries listed in riemann_symmetry_terms.
+
+    "dddd" : rho < sig, mu < nu, (rho, sig) <= (mu, nu) and not rho < sig < mu < nu. In 4D this leaves the 20 independent components.
+    "uddd" : mu < nu. Only the antisymmetry in the last pair survives raising the first index.
+
+    Example
+    =======
+    >> len(independent_riemann_indices("dddd", 4))
+    20
+
+    LaTeX representation
+    ====================
+    R_{ijkl} = -R_{jikl} = -R_{ijlk} = R_{klij}
+    R_{ijkl} + R_{iklj} + R_{iljk} = 0
+
+    URL Reference
+    =============
+    https://en.wikipedia.org/wiki/Riemann_curvature_tensor#Symmetries_and_identities
+    """
+
+    pairs = [ (a, b) for a in range(dimension_count) for b in range(a + 1, dimension_count) ]
+    indices = []
+    if index_config == "dddd":
+        for p in range(len(pairs)):
+            for q in range(p, len(pairs)):
+                rho, sig = pairs[p]
+                mu, nu = pairs[q]
+                # Follows from the first Bianchi identity.
+                if rho < sig < mu < nu:
+                    continue
+                indices.append((rho, sig, mu, nu))
+    elif index_config == "uddd":
+        for rho in range(dimension_count):
+            for sig in range(dimension_count):
+                for mu, nu in pairs:
+                    indices.append((rho, sig, mu, nu))
+    else:
+        print("Invalid index_config string.")
+    return indices
+
+def riemann_symmetry_terms(index_config, rho, sig, mu, nu):
+    """
+    Description
+    ===========
+    Expresses a single Riemann coefficient as a signed sum of canonical coefficients (see independent_riemann_indices). Returns a list of (sign, (rho, sig, mu, nu)) pairs; an empty list means the coefficient vanishes identically, and a canonical coefficient maps onto itself.
+
+    Example
+    =======
+    >> riemann_symmetry_terms("dddd", 2, 3, 1, 0)
+    [(-1, (0, 1, 2, 3))]
+    >> riemann_symmetry_terms("dddd", 0, 1, 2, 3)
+    [(1, (0, 2, 1, 3)), (-1, (0, 3, 1, 2))]
+
+    LaTeX representation
+    ====================
+    R_{ijkl} = -R_{jikl} = -R_{ijlk} = R_{klij}
+    R_{ijkl} = R_{ikjl} - R_{iljk}
+
+    URL Reference
+    =============
+    https://en.wikipedia.org/wiki/Riemann_curvature_tensor#Symmetries_and_identities
+    """
+
+    if mu == nu:
+        return []
+    sign = 1
+    if mu > nu:
+        mu, nu = nu, mu
+        sign = -sign
+    if index_config == "uddd":
+        return [ (sign, (rho, sig, mu, nu)) ]
+    elif index_config == "dddd":
+        if rho == sig:
+            return []
+        if rho > sig:
+            rho, sig = sig, rho
+            sign = -sign
+        if (rho, sig) > (mu, nu):
+            rho, sig, mu, nu = mu, nu, rho, sig
+        if rho < sig < mu < nu:
+            return [ (sign, (rho, mu, sig, nu)), (-sign, (rho, nu, sig, mu)) ]
+        return [ (sign, (rho, sig, mu, nu)) ]
+    else:
+        print("Invalid index_config string.")
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 from sympy import *
-from src.spacetime import *
-from src.solutions import *
+from spacetimeengine.src.spacetime import *
+from spacetimeengine.src.solutions import *
 import unittest
 
 class Test(unittest.TestCase):
@@ -38,16 +38,14 @@ class Test(unittest.TestCase):
 
     def test_compute_riemann_coefficient(self):
         black_hole = SpaceTime(Solution().schwarzschild(), True)
-        # The ommision of the Matrix object is due to the form in which the riemann tensor was constructed in the SpaceTime class. 
-        # Sympy does not handle multidimensional matricies in a straitforward way.
+        # Higher rank tensors are stored as Components objects; a partial index returns the remaining block as nested lists.
         vacuum_riemann_tensor_uddd = [[ 0, 0, 0, 0 ], [ 0, 0, 0, 0 ], [ 0, 0, 0, 0 ], [ 0, 0, 0, 0 ]]
-        self.assertEqual(black_hole.riemann_tensor_uddd[15], vacuum_riemann_tensor_uddd)
+        self.assertEqual(black_hole.riemann_tensor_uddd[3, 3], vacuum_riemann_tensor_uddd)
 
     def test_compute_connection_coefficient(self):
         flat_spacetime = SpaceTime(Solution().minkowski(), True)
-        # The ommision of the Matrix object is due to the form in which the riemann tensor was constructed in the SpaceTime class. 
-        # Sympy does not handle multidimensional matricies in a straitforward way.
-        vacuum_christoffel_symbols_udd = Matrix([
+        # Higher rank tensors are stored as Components objects, which compare equal to the equivalent nested lists.
+        vacuum_christoffel_symbols_udd = [
                                                     [
                                                         [ 0, 0, 0, 0 ], 
                                                         [ 0, 0, 0, 0 ], 
@@ -72,7 +70,7 @@ class Test(unittest.TestCase):
                                                         [ 0, 0, 0, 0 ], 
                                                         [ 0, 0, 0, 0 ]
                                                     ]
-                                                ])
+                                                ]
         self.assertEqual(flat_spacetime.christoffel_symbols_udd, vacuum_christoffel_symbols_udd)
 
     def test_first_bianchi_identity(self):
@@ -92,4 +90,5 @@ class Test(unittest.TestCase):
         self.assertEqual(a, -1*b)
         self.assertEqual(a, -1*c)
 
-unittest.main()
+if __name__ == "__main__":
+    unittest.main()
@@ -1,8 +1,22 @@
 #!/usr/bin/env python
 from sympy import *
-from spacetimeengine.spacetime import *
-from spacetimeengine.solutions import *
+from spacetimeengine.src.spacetime import *
+from spacetimeengine.src.solutions import *
+from spacetimeengine.src.symmetries import *
+from spacetimeengine.src.simplification import *
+from spacetimeengine.src.sparsity import *
+from spacetimeengine.src.inverse import *
+from spacetimeengine.src.planner import *
+from spacetimeengine.src.shared import *
+from spacetimeengine.src.numeric import *
+from spacetimeengine.src.geodesics import *
+from spacetimeengine.src.rendering import *
+import numpy as np
+import os
+import tempfile
+import time
 import unittest
+import unittest.mock
 
 class Test(unittest.TestCase):
     
@@ -38,16 +52,14 @@ class Test(unittest.TestCase):
 
     def test_compute_riemann_coefficient(self):
         black_hole = SpaceTime(Solution().schwarzschild(), True)
-        # The ommision of the Matrix object is due to the form in which the riemann tensor was constructed in the SpaceTime class. 
-        # Sympy does not handle multidimensional matricies in a straitforward way.
+        # Higher rank tensors are stored as Components objects; a partial index returns the remaining block as nested lists.
         vacuum_riemann_tensor_uddd = [[ 0, 0, 0, 0 ], [ 0, 0, 0, 0 ], [ 0, 0, 0, 0 ], [ 0, 0, 0, 0 ]]
-        self.assertEqual(black_hole.riemann_tensor_uddd[15], vacuum_riemann_tensor_uddd)
+        self.assertEqual(black_hole.riemann_tensor_uddd[3, 3], vacuum_riemann_tensor_uddd)
 
     def test_compute_connection_coefficient(self):
         flat_spacetime = SpaceTime(Solution().minkowski(), True)
-        # The ommision of the Matrix object is due to the form in which the riemann tensor was constructed in the SpaceTime class. 
-        # Sympy does not handle multidimensional matricies in a straitforward way.
-        vacuum_christoffel_symbols_udd = Matrix([
+        # Higher rank tensors are stored as Components objects, which compare equal to the equivalent nested lists.
+        vacuum_christoffel_symbols_udd = [
                                                     [
                                                         [ 0, 0, 0, 0 ], 
                                                         [ 0, 0, 0, 0 ], 
@@ -72,7 +84,7 @@ class Test(unittest.TestCase):
                                                         [ 0, 0, 0, 0 ], 
                                                         [ 0, 0, 0, 0 ]
                                                     ]
-                                                ])
+                                                ]
         self.assertEqual(flat_spacetime.christoffel_symbols_udd, vacuum_christoffel_symbols_udd)
 
     def test_first_bianchi_identity(self):
@@ -92,4 +104,425 @@ class Test(unittest.TestCase):
         self.assertEqual(a, -1*b)
         self.assertEqual(a, -1*c)
 
-unittest.main()
\ No newline at end of file
+    def test_connection_lower_index_symmetry(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True)
+        for i in black_hole.dimensions:
+            for k in black_hole.dimensions:
+                for l in black_hole.dimensions:
+                    self.assertIs(black_hole.get_connection_coefficient("udd", i, k, l), black_hole.get_connection_coefficient("udd", i, l, k))
+        self.assertEqual(simplify(black_hole.get_connection_coefficient("udd", 2, 1, 2) - 1/Symbol('r')), 0)
+
+    def test_independent_riemann_coefficients(self):
+        self.assertEqual(len(independent_riemann_indices("dddd", 4)), 20)
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        black_hole.set_all_riemann_coefficients("dddd")
+        a = black_hole.get_riemann_coefficient("dddd", 0, 1, 0, 1)
+        self.assertEqual(black_hole.get_riemann_coefficient("dddd", 1, 0, 1, 0), a)
+        self.assertEqual(simplify(a - black_hole.compute_riemann_coefficient("dddd", 0, 1, 0, 1)), 0)
+        t, x, y, z = symbols('t x y z')
+        twisted = SpaceTime([ Matrix([ [ 1, 0, x*z, 0 ], [ 0, -1, 0, 0 ], [ x*z, 0, -1, 0 ], [ 0, 0, 0, -1 ] ]), [ t, x, y, z ], "dd", 0 ], True, lazy=True)
+        computed = []
+        compute_independent_riemann_coefficient = twisted.compute_independent_riemann_coefficient
+        def compute_spy(index_config, *indices, **options):
+            computed.append(indices)
+            return compute_independent_riemann_coefficient(index_config, *indices, **options)
+        twisted.compute_independent_riemann_coefficient = compute_spy
+        twisted.set_all_riemann_coefficients("dddd")
+        # The Bianchi sum is built once and the other index sets of its class are sign flips.
+        self.assertEqual([ indices for indices in computed if len(riemann_symmetry_terms("dddd", *indices)) > 1 ], [ (0, 1, 2, 3) ])
+        self.assertNotEqual(twisted.get_riemann_coefficient("dddd", 0, 1, 2, 3), 0)
+        for indices in [ (0, 1, 2, 3), (1, 0, 2, 3), (2, 3, 0, 1), (3, 2, 1, 0) ]:
+            self.assertEqual(simplify(twisted.get_riemann_coefficient("dddd", *indices) - twisted.compute_riemann_coefficient("dddd", *indices)), 0)
+
+    def test_two_sphere_ricci_scalar(self):
+        a, theta, phi = symbols('a theta phi')
+        two_sphere = SpaceTime([ Matrix([ [ a**2, 0 ], [ 0, a**2*sin(theta)**2 ] ]), [ theta, phi ], "dd", 0 ], True)
+        self.assertEqual(two_sphere.christoffel_symbols_udd.shape, (2, 2, 2))
+        self.assertEqual(simplify(two_sphere.get_ricci_scalar() - 2/a**2), 0)
+
+    def test_parallel_simplification(self):
+        a, theta, phi = symbols('a theta phi')
+        two_sphere_solution = [ Matrix([ [ a**2, 0 ], [ 0, a**2*sin(theta)**2 ] ]), [ theta, phi ], "dd", 0 ]
+        pooled = []
+        executor_map = ComponentExecutor.map
+        def map_spy(executor, function, expressions):
+            results = executor_map(executor, function, expressions)
+            pooled.append(executor.pool is not None)
+            return results
+        with unittest.mock.patch.object(ComponentExecutor, "map", map_spy):
+            two_sphere = SpaceTime(two_sphere_solution, True, workers=2)
+        # The pool ran at least one stage and was shut down after construction.
+        self.assertIn(True, pooled)
+        self.assertIsNone(two_sphere.executor.pool)
+        serial = SpaceTime(two_sphere_solution, True)
+        self.assertEqual(two_sphere.christoffel_symbols_udd, serial.christoffel_symbols_udd)
+        self.assertEqual(two_sphere.ricci_tensor_dd, serial.ricci_tensor_dd)
+        self.assertEqual(two_sphere.get_ricci_coefficient("dd", 1, 1), sin(theta)**2)
+        self.assertEqual(simplify(two_sphere.get_ricci_scalar() - 2/a**2), 0)
+
+    def test_tensor_cache(self):
+        a, theta, phi = symbols('a theta phi')
+        two_sphere_solution = [ Matrix([ [ a**2, 0 ], [ 0, a**2*sin(theta)**2 ] ]), [ theta, phi ], "dd", 0 ]
+        with tempfile.TemporaryDirectory() as cache_directory:
+            computed = SpaceTime(two_sphere_solution, True, cache=cache_directory)
+            cached = SpaceTime(two_sphere_solution, True, cache=cache_directory)
+            # A corrupted entry is a cache miss and is computed again.
+            for name in os.listdir(cache_directory):
+                with open(os.path.join(cache_directory, name), "wb") as cache_file:
+                    cache_file.write(b"\x80\x09.")
+            recomputed = SpaceTime(two_sphere_solution, True, cache=cache_directory)
+        self.assertFalse(computed.cache_hit)
+        self.assertTrue(cached.cache_hit)
+        self.assertFalse(recomputed.cache_hit)
+        self.assertEqual(recomputed.christoffel_symbols_udd, computed.christoffel_symbols_udd)
+        self.assertEqual(cached.christoffel_symbols_udd, computed.christoffel_symbols_udd)
+        self.assertEqual(cached.get_ricci_scalar(), computed.get_ricci_scalar())
+
+    def test_simplification_policy(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, simplification=SimplificationPolicy("canonical", riemann="trigonometric"))
+        self.assertEqual(black_hole.simplification_policy.mode("riemann"), "trigonometric")
+        self.assertEqual(black_hole.simplification_policy.mode("einstein"), "canonical")
+        self.assertEqual(black_hole.ricci_tensor_dd, zeros(4))
+        self.assertEqual(SimplificationPolicy(final_only=True).mode("ricci"), "none")
+        self.assertRaises(ValueError, SimplificationPolicy, "fast")
+
+    def test_simplification_budget(self):
+        a, theta, phi = symbols('a theta phi')
+        two_sphere = SpaceTime([ Matrix([ [ a**2, 0 ], [ 0, a**2*sin(theta)**2 ] ]), [ theta, phi ], "dd", 0 ], True, simplification=SimplificationPolicy(complexity_budget=0))
+        self.assertIn(("ricci", "dd", 1, 1), two_sphere.budget_exceeded)
+        self.assertEqual(simplify(two_sphere.get_ricci_scalar() - 2/a**2), 0)
+
+    def test_simplification_time_limit(self):
+        def stalled_simplification(expression):
+            time.sleep(5)
+            return expression
+        budgeted = BudgetedSimplifier(stalled_simplification, canonical_simplification, seconds=0.1)
+        x = Symbol('x')
+        self.assertEqual(budgeted(x/x + x), (x + 1, True))
+
+    def test_derivative_cache(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True)
+        r = Symbol('r')
+        self.assertIs(black_hole.get_metric_second_derivative(0, 0, 1, 2), black_hole.get_metric_second_derivative(0, 0, 2, 1))
+        self.assertEqual(black_hole.get_metric_derivative(1, 1, 1), diff(black_hole.metric_tensor_dd[1, 1], r))
+        self.assertLessEqual(len([ key for key in black_hole.derivative_cache if len(key) == 4 ]), 4**3)
+        self.assertEqual(simplify(black_hole.get_connection_derivative(2, 2, 1, 1) + 1/r**2), 0)
+
+    def test_dependency_index(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True)
+        index = black_hole.dependency_index
+        self.assertEqual(index.metric_dependencies("dd", 0, 0), frozenset([ 1 ]))
+        self.assertTrue(index.is_metric_zero("uu", 0, 1))
+        self.assertTrue(index.is_derivative_zero(0, 0, 0))
+        for i in black_hole.dimensions:
+            for k in black_hole.dimensions:
+                for l in black_hole.dimensions:
+                    if index.is_connection_zero("udd", i, k, l):
+                        self.assertEqual(black_hole.get_connection_coefficient("udd", i, k, l), 0)
+        self.assertTrue(index.is_riemann_zero("uddd", 0, 1, 2, 3))
+        self.assertFalse(index.is_riemann_zero("dddd", 0, 1, 0, 1))
+
+    def test_diagonal_fast_path(self):
+        t, r, theta, phi = symbols('t r theta phi')
+        A, B = Function('A')(r), Function('B')(t, r)
+        static = SpaceTime([ diag(A, -B, -r**2, -r**2*sin(theta)**2), [ t, r, theta, phi ], "dd", 0 ], True, simplification="canonical")
+        self.assertTrue(static.is_diagonal())
+        self.assertEqual(static.metric_tensor_uu, diag(1/A, -1/B, -1/r**2, -1/(r**2*sin(theta)**2)))
+        for mu in static.dimensions:
+            for nu in static.dimensions:
+                contracted = sum(static.get_riemann_coefficient("uddd", lam, mu, lam, nu) for lam in static.dimensions)
+                self.assertEqual(cancel(together(static.get_ricci_coefficient("dd", mu, nu) - contracted)), 0)
+
+    def test_block_inverse_metric(self):
+        t, r, theta, phi = symbols('t r theta phi')
+        A, B, C, D = [ Function(name)(r, theta) for name in "ABCD" ]
+        rotating = Matrix([ [ A, 0, 0, D ], [ 0, -B, 0, 0 ], [ 0, 0, -C, 0 ], [ D, 0, 0, -r**2 ] ])
+        self.assertEqual(metric_blocks(rotating), [ [ 0, 3 ], [ 1 ], [ 2 ] ])
+        inverse, determinant = inverse_metric(rotating)
+        self.assertEqual((inverse*rotating).applyfunc(simplify), eye(4))
+        self.assertEqual(simplify(determinant - rotating.det()), 0)
+        spacetime = SpaceTime([ rotating, [ t, r, theta, phi ], "dd", 0 ], True, lazy=True)
+        self.assertEqual(spacetime.metric_tensor_uu[0, 1], 0)
+        self.assertEqual(simplify(spacetime.get_metric_determinant() - rotating.det()), 0)
+
+    def test_incremental_metric_update(self):
+        t, r, theta, phi = symbols('t r theta phi')
+        A, B, E = Function('A')(r), Function('B')(r), Function('E')(r)
+        metric = diag(A, -B, -r**2, -r**2*sin(theta)**2)
+        updated = SpaceTime([ metric.copy(), [ t, r, theta, phi ], "dd", 0 ], True, simplification="canonical")
+        updated.metric_tensor_dd[0, 0] = E
+        stale = updated.update_dependent_coefficients([ (0, 0) ])
+        self.assertLess(len(stale), len(updated.evaluated_coefficients)/4)
+        self.assertIn(("ricci", "dd", 0, 0), stale)
+        self.assertNotIn(("connection", "udd", 2, 1, 2), stale)
+        metric[0, 0] = E
+        rebuilt = SpaceTime([ metric, [ t, r, theta, phi ], "dd", 0 ], True, simplification="canonical")
+        self.assertEqual(updated.metric_tensor_uu, rebuilt.metric_tensor_uu)
+        self.assertEqual((updated.ricci_tensor_dd - rebuilt.ricci_tensor_dd).applyfunc(lambda expression: cancel(together(expression))), zeros(4))
+        self.assertEqual(cancel(together(updated.ricci_scalar - rebuilt.ricci_scalar)), 0)
+        for expression, expected in zip(updated.riemann_tensor_uddd.values, rebuilt.riemann_tensor_uddd.values):
+            self.assertEqual(cancel(together(expression - expected)), 0)
+
+    def test_ricci_from_connection(self):
+        t, x, y, z = symbols('t x y z')
+        f, h = Function('f')(x, y), Function('h')(x)
+        rotating = SpaceTime([ Matrix([ [ 1, 0, f, 0 ], [ 0, -1, 0, 0 ], [ f, 0, -h, 0 ], [ 0, 0, 0, -1 ] ]), [ t, x, y, z ], "dd", 0 ], True, lazy=True, simplification="canonical")
+        for mu, nu in [ (0, 0), (0, 2), (1, 1) ]:
+            ricci_coefficient = rotating.get_ricci_coefficient("dd", mu, nu)
+            contracted = sum(rotating.compute_riemann_coefficient("uddd", lam, mu, lam, nu, simplified=False) for lam in rotating.dimensions)
+            self.assertEqual(cancel(together(ricci_coefficient - contracted)), 0)
+        self.assertFalse(any(key[0] == "riemann" for key in rotating.evaluated_coefficients))
+
+    def test_query_planner(self):
+        self.assertEqual(plan_stages([ "ricci_scalar" ], 4), [ "connection_udd", "ricci_dd", "ricci_scalar" ])
+        self.assertIn("riemann_uddd", plan_stages([ "ricci_scalar", "geodesic_deviation_acceleration" ], 4))
+        self.assertRaises(ValueError, plan_stages, [ "ricci_uu" ], 4)
+        black_hole = SpaceTime(Solution().schwarzschild(), True, outputs=[ "ricci_scalar", "einstein_dd" ])
+        self.assertEqual(black_hole.ricci_scalar, 0)
+        self.assertEqual(black_hole.einstein_tensor_dd, zeros(4))
+        self.assertFalse(black_hole.is_stage_evaluated("riemann_uddd"))
+        self.assertFalse(black_hole.is_stage_evaluated("proper_time_geodesic_acceleration"))
+        self.assertEqual(black_hole.compute([ "riemann_uddd" ])["riemann_uddd"], black_hole.riemann_tensor_uddd)
+        self.assertEqual(black_hole.evaluated_stages(), [ "connection_udd", "riemann_dddd", "riemann_uddd", "ricci_dd", "ricci_scalar", "einstein_dd" ])
+
+    def test_shared_tensor(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, outputs=[ "riemann_uddd" ])
+        riemann = black_hole.get_shared_tensor("riemann_uddd")
+        self.assertEqual(riemann.shape, (4, 4, 4, 4))
+        self.assertGreater(len(riemann.replacements), 0)
+        self.assertLess(riemann.operation_count(), sum(count_ops(value) for value in black_hole.riemann_tensor_uddd.values))
+        for value, expected in zip(riemann.values(), black_hole.riemann_tensor_uddd.values):
+            self.assertEqual(cancel(value - expected), 0)
+        self.assertEqual(simplify(riemann[0, 1, 0, 1] - black_hole.get_riemann_coefficient("uddd", 0, 1, 0, 1)), 0)
+        self.assertIs(black_hole.get_shared_tensor("riemann_uddd"), riemann)
+        self.assertEqual(SharedTensor(black_hole.metric_tensor_dd).shape, (4, 4))
+
+    def test_numeric_tensor(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, outputs=[ "connection_udd" ])
+        values = { "G": 1, "M": 1, "c": 1 }
+        connection = black_hole.numeric("connection_udd", params=values)
+        r, theta = np.meshgrid(np.linspace(3, 10, 5), np.linspace(0.5, 2.5, 3))
+        result = connection(0, r, theta, 0)
+        self.assertEqual(result.shape, (3, 5, 4, 4, 4))
+        substitutions = { Symbol(name): value for name, value in values.items() }
+        substitutions.update({ Symbol("r"): r[1, 2], Symbol("theta"): theta[1, 2] })
+        for indices in [ (0, 0, 1), (1, 1, 1), (1, 2, 2), (3, 2, 3) ]:
+            expected = float(black_hole.get_connection_coefficient("udd", *indices).subs(substitutions))
+            self.assertAlmostEqual(result[(1, 2) + indices], expected)
+        masses = np.array([ 1.0, 2.0 ])[:, None]
+        metric = black_hole.numeric("metric_dd", params=dict(values, M=masses))(0, np.array([ 3.0, 4.0, 5.0 ]), 1.0, 0)
+        self.assertEqual(metric.shape, (2, 3, 4, 4))
+        self.assertAlmostEqual(metric[1, 0, 0, 0], 1 - 4/3)
+        kernel = black_hole.numeric_tensors["connection_udd"]
+        black_hole.numeric("connection_udd", params=values)
+        self.assertIs(black_hole.numeric_tensors["connection_udd"], kernel)
+        with self.assertRaises(ValueError):
+            black_hole.numeric("metric_dd")(0, 3.0, 1.0, 0)
+
+    def test_evaluate_grid(self):
+        t, r, theta, phi = symbols('t r theta phi')
+        black_hole = SpaceTime([ diag(1 - 2/r, -1/(1 - 2/r), -r**2, -r**2*sin(theta)**2), [ t, r, theta, phi ], "dd", 0 ], True, lazy=True)
+        grid = black_hole.evaluate_grid(black_hole.metric_tensor_dd[0, 0], 1, 2, np.array([ 1.0, 2.0, 4.0 ]), np.array([ 0.0, 1.0 ]))
+        self.assertEqual(grid.shape, (2, 3))
+        self.assertEqual(grid[1, 0], -1.0)
+        self.assertEqual(grid[0, 2], 0.5)
+        self.assertTrue(np.isnan(black_hole.evaluate_grid(black_hole.metric_tensor_dd[1, 1], 1, 2, [ 2.0 ], [ 0.0 ])[0, 0]))
+        self.assertTrue(np.isnan(black_hole.evaluate_grid(sqrt(1 - r), 1, 2, [ 0.0, 4.0 ], [ 0.0 ])[0, 1]))
+        self.assertTrue(np.all(black_hole.evaluate_grid(Integer(3), 1, 2, [ 1.0, 2.0 ], [ 0.0, 1.0 ]) == 3))
+        with tempfile.TemporaryDirectory() as directory:
+            save_path = black_hole.plot_metric_tensor_grid((3, 10), (0.5, 2.5), mu=1, nu=1, x_index=1, y_index=2, num_points=5, save_path=os.path.join(directory, "metric.png"))
+            self.assertTrue(os.path.exists(save_path))
+
+    def test_downsample_grid(self):
+        t, r, theta, phi = symbols('t r theta phi')
+        black_hole = SpaceTime([ diag(1 - 2/r, -1/(1 - 2/r), -r**2, -r**2*sin(theta)**2), [ t, r, theta, phi ], "dd", 0 ], True, lazy=True)
+        x_vals = np.linspace(3, 10, 101)
+        y_vals = np.linspace(0.5, 2.5, 51)
+        grid = black_hole.evaluate_grid(black_hole.metric_tensor_dd[0, 0], 1, 2, x_vals, y_vals)
+        x_preview, y_preview, preview = black_hole.downsample_grid(x_vals, y_vals, grid, 11)
+        self.assertEqual(preview.shape, (11, 11))
+        self.assertEqual((x_preview[0], x_preview[-1], y_preview[0], y_preview[-1]), (3, 10, 0.5, 2.5))
+        self.assertTrue(np.array_equal(preview[:, 1], grid[:, 10][y_vals.searchsorted(y_preview)]))
+        self.assertIs(black_hole.downsample_grid(x_vals, y_vals, grid)[2], grid)
+        with tempfile.TemporaryDirectory() as directory:
+            save_path = black_hole.plot_ricci_scalar_grid((3, 10), (0.5, 2.5), x_index=1, y_index=2, num_points=300, save_path=os.path.join(directory, "ricci.png"))
+            self.assertTrue(os.path.exists(save_path))
+
+    def test_grid_parameters(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        values = { "G": 1, "M": 1, "c": 1 }
+        x_vals = np.array([ 3.0, 4.0, 6.0 ])
+        y_vals = np.array([ 0.5, 1.0 ])
+        grid = black_hole.evaluate_grid(black_hole.metric_tensor_dd[0, 0], 1, 2, x_vals, y_vals, values)
+        self.assertTrue(np.allclose(grid, np.broadcast_to(1 - 2/x_vals, (2, 3))))
+        sweep = black_hole.evaluate_grid(black_hole.metric_tensor_dd[0, 0], 1, 2, x_vals, y_vals, dict(values, M=np.array([ 1.0, 1.5 ])[:, None, None]))
+        self.assertEqual(sweep.shape, (2, 2, 3))
+        self.assertTrue(np.allclose(sweep[1, 0], 1 - 3/x_vals))
+        phi_grid = black_hole.evaluate_grid(black_hole.metric_tensor_dd[3, 3], 1, 3, x_vals, y_vals, values, fixed={ "theta": np.pi/2 })
+        self.assertTrue(np.allclose(phi_grid[0], -x_vals**2))
+        with self.assertRaises(ValueError):
+            black_hole.evaluate_grid(black_hole.metric_tensor_dd[3, 3], 1, 3, x_vals, y_vals, values)
+        with self.assertRaises(ValueError):
+            black_hole.evaluate_grid(black_hole.metric_tensor_dd[0, 0], 1, 2, x_vals, y_vals)
+        self.assertEqual(len(black_hole.grid_kernels), 2)
+
+    def test_integrate_geodesic(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        values = { "G": 1, "M": 1, "c": 1 }
+        # Circular orbit at r = 10M.
+        u_t = 1/np.sqrt(1 - 3/10)
+        u_phi = np.sqrt(1/10**3)*u_t
+        orbit = black_hole.integrate_geodesic([ 0, 10, np.pi/2, 0 ], [ u_t, 0, 0, u_phi ], (0, 2000), params=values)
+        self.assertEqual(orbit.status, "success")
+        self.assertEqual(orbit.tau[-1], 2000)
+        self.assertEqual(orbit.positions.shape, (len(orbit), 4))
+        self.assertTrue(np.allclose(orbit.positions[:, 1], 10, atol=1e-8))
+        self.assertAlmostEqual(orbit.positions[-1, 3], 2000*u_phi, places=6)
+        self.assertTrue(np.allclose(orbit.norm, 1, atol=1e-8))
+        backwards = black_hole.integrate_geodesic([ 0, 10, np.pi/2, 0 ], [ u_t, 0, 0, u_phi ], (0, -100), params=values)
+        self.assertAlmostEqual(backwards.positions[-1, 3], -100*u_phi, places=6)
+        # Radial infall stops at the coordinate singularity of the horizon.
+        infall = black_hole.integrate_geodesic([ 0, 6, np.pi/2, 0 ], [ 1.2, -0.3, 0, 0 ], (0, 100), params=values)
+        self.assertEqual(infall.status, "step_size")
+        self.assertLess(infall.positions[-1, 1], 2.01)
+        with self.assertRaises(ValueError):
+            black_hole.integrate_geodesic([ 0, 10, np.pi/2, 0 ], [ u_t, 0, 0, u_phi ], (0, 1))
+        self.assertIs(black_hole.get_geodesic_equations(), black_hole.geodesic_equations)
+
+    def test_integrate_geodesics(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        values = { "G": 1, "M": 1, "c": 1 }
+        radii = np.linspace(8, 20, 6)
+        u_t = 1/np.sqrt(1 - 3/radii)
+        u_phi = np.sqrt(1/radii**3)*u_t
+        x0 = np.stack([ np.zeros(6), radii, np.full(6, np.pi/2), np.zeros(6) ], axis=-1)
+        u0 = np.stack([ u_t, np.zeros(6), np.zeros(6), u_phi ], axis=-1)
+        tau_eval = np.linspace(0, 500, 6)
+        batch = black_hole.integrate_geodesics(x0, u0, (0, 500), params=values, tau_eval=tau_eval)
+        self.assertEqual(list(batch.status), [ "success" ]*6)
+        self.assertTrue(np.all(batch.tau == 500))
+        self.assertTrue(np.allclose(batch.positions[:, 1], radii, atol=1e-8))
+        self.assertTrue(np.allclose(batch.norm, 1, atol=1e-8))
+        self.assertEqual(batch.sample_positions.shape, (6, 6, 4))
+        self.assertTrue(np.allclose(batch.sample_positions[:, :, 3], tau_eval[None, :]*u_phi[:, None], atol=1e-6))
+        single = black_hole.integrate_geodesic(x0[2], u0[2], (0, 500), params=values)
+        self.assertTrue(np.allclose(single.positions[-1], batch.positions[2], atol=1e-9))
+        self.assertEqual(len(single) - 1, batch.steps[2])
+        # A heavier mass per geodesic makes every other orbit fall through the horizon.
+        masses = np.where(np.arange(6) % 2 == 0, 1.0, 4.0)
+        mixed = black_hole.integrate_geodesics(x0, u0, (0, 500), params=dict(values, M=masses))
+        self.assertEqual(list(mixed.status), [ "success", "step_size" ]*3)
+        self.assertTrue(np.allclose(mixed.positions[1::2, 1], 8, atol=1e-2))
+
+    def test_geodesic_events(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        values = { "G": 1, "M": 1, "c": 1 }
+        self.assertAlmostEqual(black_hole.horizon_radius(values), 2)
+        infall = black_hole.integrate_geodesic([ 0, 6, np.pi/2, 0 ], [ 1.2, -0.3, 0, 0 ], (0, 100), params=values, events=[ black_hole.horizon_event(values) ])
+        self.assertEqual(infall.status, "horizon")
+        self.assertAlmostEqual(infall.positions[-1, 1], 2.02, places=10)
+        self.assertEqual(list(infall.events["horizon"].tau), [ infall.tau[-1] ])
+        # Orbit inclined to the equatorial plane.
+        u_t = 1/np.sqrt(1 - 3/10)
+        u_orbit = np.sqrt(1/10**3)*u_t
+        orbit = black_hole.integrate_geodesic([ 0, 10, np.pi/2, 0 ], [ u_t, 0, u_orbit*np.sin(0.3), u_orbit*np.cos(0.3) ], (0, 2000), params=values, events=[ plane_event(), proper_time_event(500) ])
+        self.assertEqual(orbit.status, "proper_time")
+        self.assertAlmostEqual(orbit.tau[-1], 500)
+        self.assertEqual(len(orbit.events["plane"]), 6)
+        self.assertTrue(np.allclose(orbit.events["plane"].positions[:, 2], np.pi/2, atol=1e-12))
+        self.assertTrue(np.allclose(np.diff(orbit.events["plane"].tau), np.pi/u_orbit, atol=1e-6))
+        x0 = np.array([ [ 0, 6, np.pi/2, 0 ], [ 0, 10, np.pi/2, 0 ], [ 0, 20, np.pi/2, 0 ] ])
+        u0 = np.array([ [ 1.2, -0.3, 0, 0 ], [ u_t, 0, 0, u_orbit ], [ 1.2, 0.5, 0, 0 ] ])
+        batch = black_hole.integrate_geodesics(x0, u0, (0, 500), params=values, events=[ black_hole.horizon_event(values), escape_event(50) ], tau_eval=[ 0, 500 ])
+        self.assertEqual(list(batch.status), [ "horizon", "success", "escape" ])
+        self.assertAlmostEqual(batch.positions[0, 1], 2.02, places=10)
+        self.assertAlmostEqual(batch.positions[2, 1], 50, places=10)
+        self.assertEqual(list(batch.events["escape"].geodesic), [ 2 ])
+        self.assertTrue(np.isnan(batch.sample_positions[0, 1, 1]))
+        self.assertAlmostEqual(batch.sample_positions[1, 1, 1], 10)
+        # Samples inside the step cut short by a terminal event match a run without the event.
+        tau_eval = np.linspace(0, 300, 3001)
+        stopped = black_hole.integrate_geodesics(x0[1:2], u0[1:2], (0, 300), params=values, events=[ proper_time_event(250.05) ], tau_eval=tau_eval)
+        free = black_hole.integrate_geodesics(x0[1:2], u0[1:2], (0, 300), params=values, tau_eval=tau_eval)
+        self.assertEqual(list(stopped.status), [ "proper_time" ])
+        self.assertTrue(np.allclose(stopped.sample_positions[0, :2501], free.sample_positions[0, :2501], rtol=0, atol=1e-9))
+        self.assertTrue(np.all(np.isnan(stopped.sample_positions[0, 2501:])))
+
+    def test_render_shadow(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        values = { "G": 1, "M": 1, "c": 1 }
+        metric = black_hole.numeric("metric_dd", values)(0, 30, np.pi/2, 0)
+        frame = camera_frame(metric)
+        self.assertTrue(np.allclose(frame @ metric @ frame.T, np.diag([ 1, -1, -1, -1 ])))
+        image = black_hole.render_shadow((30, np.pi/2, 0), 12, 12, np.pi/3, params=values, tile_size=5)
+        self.assertEqual(image.classification.shape, (12, 12))
+        # Shadow radius seen from r = 30M: sin(alpha) = 3 sqrt(3) M/r sqrt(1 - 2M/r).
+        alpha = np.arcsin(3*np.sqrt(3)/30*np.sqrt(1 - 2/30))
+        x = (2*(np.arange(12) + 0.5)/12 - 1)*np.tan(np.pi/6)
+        inside = np.arctan(np.sqrt(x[:, None]**2 + x[None, :]**2)) < alpha
+        self.assertTrue(np.array_equal(image.classification == ray_classes["captured"], inside))
+        self.assertTrue(np.all(image.classification[~inside] == ray_classes["escaped"]))
+        self.assertTrue(np.all(np.isnan(image.theta[inside])))
+        self.assertTrue(np.all((image.theta[~inside] >= 0) & (image.theta[~inside] <= np.pi)))
+        self.assertEqual(image.rgb().shape, (12, 12, 3))
+        pooled = black_hole.render_shadow((30, np.pi/2, 0), 12, 12, np.pi/3, params=values, tile_size=5, workers=2)
+        self.assertTrue(np.array_equal(pooled.classification, image.classification))
+        self.assertTrue(np.allclose(pooled.phi, image.phi, equal_nan=True))
+
+    def test_integrate_hamiltonian(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        values = { "G": 1, "M": 1, "c": 1 }
+        # Eccentric bound orbit from r = 20 with 0.95 times the circular angular velocity.
+        up = 0.95*np.sqrt(1/20**3)/np.sqrt(1 - 3/20)
+        ut = np.sqrt((1 + 20**2*up**2)/(1 - 2/20))
+        x0 = [ 0, 20, np.pi/2, 0 ]
+        u0 = [ ut, 0, 0, up ]
+        spreads = {}
+        for order in (2, 6):
+            orbit = black_hole.integrate_hamiltonian(x0, u0, (0, 2000), 2.0, params=values, order=order, save_every=50)
+            self.assertEqual(orbit.status, "success")
+            self.assertEqual(orbit.positions.shape, (21, 4))
+            self.assertTrue(np.allclose(orbit.hamiltonian, orbit.norm/2))
+            spreads[order] = np.ptp(orbit.norm)
+        self.assertTrue(abs(orbit.norm[0] - 1) < 1e-12)
+        self.assertTrue(spreads[6] < 1e-13 < spreads[2])
+        self.assertTrue(orbit.positions[:, 1].min() < 19 and orbit.positions[:, 1].max() < 20 + 1e-9)
+        batch = black_hole.integrate_hamiltonian(np.array([ x0 ]*3), np.array([ u0 ]*3), (0, 200), 2.0, params=dict(values, M=np.array([ 1, 1, 0.5 ])), save_every=20)
+        self.assertEqual(batch.positions.shape, (3, 6, 4))
+        self.assertTrue(np.all(batch.status == "success"))
+        self.assertTrue(np.allclose(batch.positions[0], batch.positions[1]))
+        self.assertFalse(np.allclose(batch.positions[0], batch.positions[2]))
+        with self.assertRaises(ValueError):
+            black_hole.integrate_hamiltonian(x0, u0, (0, 10), 1.0, params=values, order=3)
+        for step in (0, -1.0, np.inf, np.nan):
+            with self.assertRaises(ValueError):
+                black_hole.integrate_hamiltonian(x0, u0, (0, 10), step, params=values)
+        for save_every in (0, -2):
+            with self.assertRaises(ValueError):
+                black_hole.integrate_hamiltonian(x0, u0, (0, 10), 1.0, params=values, save_every=save_every)
+        empty = black_hole.integrate_hamiltonian(x0, u0, (0, 0), 1.0, params=values)
+        self.assertEqual(list(empty.tau), [ 0 ])
+        self.assertTrue(np.allclose(empty.positions, [ x0 ]))
+
+    def test_five_dimensional_flat_spacetime(self):
+        t, x, y, z, w = symbols('t x y z w')
+        kaluza_klein = SpaceTime([ diag(1, -1, -1, -1, -1), [ t, x, y, z, w ], "dd", 0 ], True)
+        self.assertEqual(kaluza_klein.get_riemann_coefficient("uddd", 4, 3, 4, 3), 0)
+        self.assertEqual(kaluza_klein.einstein_tensor_dd, zeros(5))
+
+    def test_lazy_ricci_scalar(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        self.assertFalse(black_hole.is_evaluated("connection", "udd", 1, 1, 1))
+        self.assertEqual(simplify(black_hole.get_ricci_scalar()), 0)
+        self.assertTrue(black_hole.is_evaluated("connection", "udd", 1, 1, 1))
+        self.assertFalse(black_hole.is_evaluated("einstein", "dd", 0, 0))
+        self.assertFalse(black_hole.is_evaluated("proper_time_geodesic_acceleration", "", 0))
+
+    def test_lazy_connection_coefficient(self):
+        black_hole = SpaceTime(Solution().schwarzschild(), True, lazy=True)
+        expected = black_hole.compute_connection_coefficient("udd", 1, 1, 1)
+        self.assertEqual(black_hole.get_connection_coefficient("udd", 1, 1, 1), expected)
+        self.assertEqual(len(black_hole.evaluated_coefficients), 1)
+
+if __name__ == "__main__":
+    unittest.main()